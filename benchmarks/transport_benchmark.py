@@ -0,0 +1,91 @@
+"""
+Compares the python-obd and native ELM327 transports against the bundled
+ELM327-emulator in network mode.
+
+    python benchmarks/transport_benchmark.py [--seconds 10] [--sensors RPM,SPEED,...]
+"""
+import argparse
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from elm import Elm
+from obd_handler import OBDHandler, TRANSPORTS
+
+DEFAULT_SENSORS = "RPM,SPEED,COOLANT_TEMP,ENGINE_LOAD,THROTTLE_POS,INTAKE_PRESSURE"
+
+
+def _free_port():
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+    finally:
+        s.close()
+
+
+def run(transport, sensors, seconds, batch, delay=None):
+    # The emulator serves a single client, so every transport gets its own.
+    net_port = _free_port()
+    sim = Elm(net_port=net_port)
+    threading.Thread(target=sim.run, daemon=True).start()
+    time.sleep(0.5)
+
+    handler = OBDHandler(simulation=False, log_callback=lambda msg: None)
+    if delay is not None:
+        handler.pacing.adaptive = False
+        handler.pacing.initial_gap = delay
+    try:
+        start = time.perf_counter()
+        if not handler.connect(f"127.0.0.1:{net_port}", baudrate=38400, transport=transport):
+            print(f"{transport}: connection failed")
+            return
+        connect_time = time.perf_counter() - start
+
+        latencies = []
+        values = 0
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            t = time.perf_counter()
+            if batch:
+                values += sum(v is not None for v in handler.query_sensors(sensors).values())
+            else:
+                for key in sensors:
+                    values += handler.query_sensor(key) is not None
+            latencies.append(time.perf_counter() - t)
+
+        latencies.sort()
+        elapsed = sum(latencies)
+        print(f"{transport:>10}: connect {connect_time:6.2f}s | {len(latencies) / elapsed:7.1f} cycles/s | "
+              f"{values / elapsed:7.1f} values/s | p50 {latencies[len(latencies) // 2] * 1000:6.2f}ms | "
+              f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.2f}ms")
+        for key, m in sorted(handler.metrics.report()["sensors"].items()):
+            print(f"{'':>12}{key:<20} ok {m['successes']:>6} fail {m['failures']:>5} "
+                  f"p50 {m['p50']}ms p95 {m['p95']}ms {m['last_error'] or ''}")
+    finally:
+        handler.disconnect()
+        sim.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--sensors", default=DEFAULT_SENSORS)
+    parser.add_argument("--single", action="store_true", help="one request per PID instead of multi-PID batches")
+    parser.add_argument("--delay", type=float, default=None,
+                        help="fixed inter-command gap in seconds (default: adaptive pacing)")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    sensors = [s.strip() for s in args.sensors.split(",") if s.strip()]
+    for transport in TRANSPORTS:
+        run(transport, sensors, args.seconds, batch=not args.single, delay=args.delay)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+import threading
+import time
+
+from obd_handler import MAX_PIDS_PER_REQUEST
+from pid_scheduler import PIDScheduler
+
+
+class Snapshot:
+    """
+    One completed poll cycle. `values` holds the last known reading of every
+    scheduled sensor, `updated` the keys that were actually read this cycle.
+    """
+
+    def __init__(self, seq, timestamp, wall_time, values, updated, cycle_time, timestamp_ns=None):
+        self.seq = seq
+        self.timestamp = timestamp      # time.monotonic() at the end of the cycle
+        self.timestamp_ns = timestamp_ns if timestamp_ns is not None else int(timestamp * 1e9)
+        self.wall_time = wall_time      # time.time() at the end of the cycle
+        self.values = values
+        self.updated = updated
+        self.cycle_time = cycle_time    # seconds spent on the bus for this cycle
+
+
+class AcquisitionEngine:
+    """
+    Owns the OBDHandler and polls it from a background thread, so the Tk
+    main loop never waits on the adapter. The UI tells the engine which
+    sensors it needs and reads back the most recent Snapshot whenever it
+    redraws. Which sensors are read on each cycle is decided by a
+    PIDScheduler, so fast-moving values are refreshed more often than slow ones.
+    """
+
+    def __init__(self, obd_handler, scheduler=None, idle_interval=0.1, max_batch=MAX_PIDS_PER_REQUEST):
+        self.obd = obd_handler
+        self.scheduler = scheduler or PIDScheduler()
+        self.idle_interval = idle_interval
+        self.max_batch = max_batch
+
+        # Serialises every conversation with the adapter. Anything outside the
+        # poll loop (DTC scans, clears, backups) must hold it via exclusive().
+        self.lock = threading.RLock()
+
+        self._sensors = ()
+        self._sensors_changed = False
+        self._sensor_lock = threading.Lock()
+        self._values = {}
+        # key -> (seq, timestamp) of the snapshot that last read it, see updates_since().
+        self._key_updates = {}
+
+        self._latest = None
+        self._seq = 0
+        self._cond = threading.Condition()
+
+        self._running = False
+        self._thread = None
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """
+        Calls callback(snapshot) from the acquisition thread for every cycle,
+        e.g. for logging every sample rather than only those the UI draws.
+        Keep it quick; it runs between bus requests.
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="obd-acquisition", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def is_running(self):
+        return self._running
+
+    def exclusive(self):
+        """Context manager that pauses polling while the caller talks to the adapter."""
+        return self.lock
+
+    def connect(self, port_name=None, baudrate=115200, transport=None):
+        with self.lock:
+            connected = self.obd.connect(port_name, baudrate=baudrate, transport=transport)
+            self._reset_snapshots()
+        return connected
+
+    def disconnect(self):
+        with self.lock:
+            self.obd.disconnect()
+            self._reset_snapshots()
+
+    def set_sensors(self, sensor_keys):
+        keys = tuple(sorted(sensor_keys))
+        with self._sensor_lock:
+            if keys != self._sensors:
+                self._sensors = keys
+                self._sensors_changed = True
+
+    def get_sensors(self):
+        with self._sensor_lock:
+            return self._sensors
+
+    def get_rate_report(self):
+        """{key: (target_hz, achieved_hz)} for the sensors currently being polled."""
+        with self._sensor_lock:
+            return self.scheduler.get_rate_report()
+
+    def latest(self):
+        with self._cond:
+            return self._latest
+
+    def updates_since(self, after_seq):
+        """
+        (latest snapshot, {key: timestamp}) for every key read by any snapshot
+        newer than after_seq, with the timestamp of its latest read. Several
+        batches are published between two UI frames; the newest snapshot's
+        `updated` only covers the last of them.
+        """
+        with self._cond:
+            updated = {key: timestamp for key, (seq, timestamp) in self._key_updates.items() if seq > after_seq}
+            return self._latest, updated
+
+    def wait_for_snapshot(self, after_seq=0, timeout=None):
+        """Blocks until a snapshot newer than after_seq exists, or the timeout expires."""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: not self._running or (self._latest is not None and self._latest.seq > after_seq),
+                timeout
+            )
+            if self._latest is not None and self._latest.seq > after_seq:
+                return self._latest
+            return None
+
+    def _reset_snapshots(self):
+        with self._cond:
+            self._latest = None
+            self._values = {}
+            self._key_updates = {}
+        with self._sensor_lock:
+            # Force every sensor to be due again on the next cycle.
+            self.scheduler.set_sensors(())
+            self._sensors_changed = True
+
+    def _publish(self, fresh, cycle_time):
+        with self._cond:
+            self._values.update(fresh)
+            self._seq += 1
+            now_ns = time.monotonic_ns()
+            snapshot = Snapshot(self._seq, now_ns / 1e9, time.time(),
+                                dict(self._values), tuple(fresh), cycle_time, now_ns)
+            for key in fresh:
+                self._key_updates[key] = (self._seq, snapshot.timestamp)
+            self._latest = snapshot
+            self._cond.notify_all()
+
+        for callback in list(self._listeners):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                self.obd.log(f"Snapshot listener error: {e}")
+
+    def _next_batch(self):
+        with self._sensor_lock:
+            if self._sensors_changed:
+                self.scheduler.set_sensors(self._sensors)
+                with self._cond:
+                    self._values = {k: v for k, v in self._values.items() if k in self._sensors}
+                    self._key_updates = {k: v for k, v in self._key_updates.items() if k in self._sensors}
+                self._sensors_changed = False
+            batch = self.scheduler.due(limit=self.max_batch)
+            if batch:
+                return batch, 0
+            deadline = self.scheduler.next_deadline()
+        if deadline is None:
+            return [], self.idle_interval
+        return [], min(self.idle_interval, max(0.0, deadline - time.monotonic()))
+
+    def _poll_batch(self, batch):
+        with self.lock:
+            if not self.obd.is_connected():
+                return {}
+            values = self.obd.query_sensors(batch)
+        now = time.monotonic()
+        with self._sensor_lock:
+            for cmd in batch:
+                self.scheduler.record(cmd, now)
+        return values
+
+    def _run(self):
+        while self._running:
+            if not self.obd.is_connected():
+                time.sleep(self.idle_interval)
+                continue
+
+            batch, wait = self._next_batch()
+            if not batch:
+                time.sleep(wait)
+                continue
+
+            cycle_start = time.monotonic()
+            try:
+                values = self._poll_batch(batch)
+            except Exception as e:
+                self.obd.log(f"Acquisition Error: {e}")
+                time.sleep(self.idle_interval)
+                continue
+
+            cycle_time = time.monotonic() - cycle_start
+            with self.lock:
+                # A disconnect may have raced the end of the cycle; drop stale data.
+                if self._running and self.obd.is_connected():
+                    self._publish(values, cycle_time)
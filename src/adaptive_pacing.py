@@ -0,0 +1,133 @@
+import collections
+import time
+
+# Replies that mean the adapter or bus couldn't keep up, as opposed to a PID
+# the car simply doesn't have.
+PACING_ERRORS = ("STOPPED", "BUFFER FULL", "CAN ERROR", "BUS BUSY", "BUS ERROR", "TIMEOUT")
+NO_DATA = "NO DATA"
+
+# AT ST takes the timeout in 4 ms units, 0x01..0xFF.
+AT_ST_UNIT_MS = 4
+MIN_TIMEOUT_MS = 48
+MAX_TIMEOUT_MS = 0xFF * AT_ST_UNIT_MS
+DEFAULT_TIMEOUT_MS = 200
+
+DEFAULT_GAP = 0.01
+MAX_GAP = 0.1
+GAP_STEP = 0.001
+
+ERROR_WINDOW = 20
+ERROR_BURST = 3
+STABLE_STREAK = 25
+TIMEOUT_FACTOR = 4
+
+
+class PacingController:
+    """
+    Tunes the pause between requests and the adapter timeout (AT ST) from what
+    the connection actually does. Every request reports its round-trip time
+    and error, if any. A burst of STOPPED / NO DATA errors doubles the gap and
+    stretches the timeout. A long run of clean replies shaves the gap back one
+    step at a time, but never below a gap that has already failed. The
+    timeout follows the measured latency.
+    """
+
+    def __init__(self, gap=DEFAULT_GAP, timeout_ms=DEFAULT_TIMEOUT_MS, adaptive=True):
+        self.initial_gap = gap
+        self.initial_timeout_ms = timeout_ms
+        self.adaptive = adaptive
+        self.reset()
+
+    def reset(self):
+        self.gap = self.initial_gap
+        self.timeout_ms = self.initial_timeout_ms
+        self.min_gap = 0.0
+        self.min_timeout_ms = MIN_TIMEOUT_MS
+        self.rtt = None
+        self.recent = collections.deque(maxlen=ERROR_WINDOW)
+        self.streak = 0
+        self.requests = 0
+        self.errors = 0
+        self.backoffs = 0
+        self.last_reply = 0.0
+
+    def wait(self):
+        """Sleeps whatever is left of the gap since the previous reply."""
+        remaining = self.gap - (time.perf_counter() - self.last_reply)
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def is_pacing_error(self, error, expected):
+        if not error:
+            return False
+        if error == NO_DATA:
+            # NO DATA from a PID that has answered before means we asked too fast.
+            return expected
+        return error in PACING_ERRORS
+
+    def record(self, rtt, error=None, expected=True):
+        """
+        Feeds one request's outcome in. Returns True when timeout_ms changed
+        and should be sent to the adapter.
+        """
+        self.last_reply = time.perf_counter()
+        self.requests += 1
+        failed = self.is_pacing_error(error, expected)
+        self.recent.append(failed)
+
+        if failed:
+            self.errors += 1
+            self.streak = 0
+        elif not error:
+            self.streak += 1
+            self.rtt = rtt if self.rtt is None else self.rtt * 0.8 + rtt * 0.2
+
+        if not self.adaptive:
+            return False
+
+        if failed and sum(self.recent) >= ERROR_BURST:
+            return self._back_off()
+        if self.streak >= STABLE_STREAK:
+            self.streak = 0
+            return self._speed_up()
+        return False
+
+    def _back_off(self):
+        self.backoffs += 1
+        self.recent.clear()
+        # This cadence wasn't stable; don't come back to it.
+        self.min_gap = min(MAX_GAP, self.gap + GAP_STEP)
+        self.gap = min(MAX_GAP, max(self.gap * 2, self.min_gap))
+
+        old = self.timeout_ms
+        self.timeout_ms = min(MAX_TIMEOUT_MS, int(self.timeout_ms * 1.5))
+        self.min_timeout_ms = max(self.min_timeout_ms, old)
+        return self.timeout_ms != old
+
+    def _speed_up(self):
+        self.gap = max(self.min_gap, self.gap - GAP_STEP)
+        if self.rtt is None:
+            return False
+
+        target = self.rtt * 1000 * TIMEOUT_FACTOR
+        target = max(self.min_timeout_ms, min(MAX_TIMEOUT_MS, target))
+        target = int(round(target / AT_ST_UNIT_MS)) * AT_ST_UNIT_MS
+        if abs(target - self.timeout_ms) < 2 * AT_ST_UNIT_MS:
+            return False
+        self.timeout_ms = target
+        return True
+
+    def at_st_command(self):
+        """The AT ST request for the current timeout, e.g. b"AT ST 32"."""
+        units = max(1, min(0xFF, self.timeout_ms // AT_ST_UNIT_MS))
+        return b"AT ST %02X" % units
+
+    def report(self):
+        return {
+            "gap_ms": round(self.gap * 1000, 1),
+            "timeout_ms": self.timeout_ms,
+            "rtt_ms": round(self.rtt * 1000, 1) if self.rtt is not None else None,
+            "error_rate": round(self.errors / self.requests, 3) if self.requests else 0.0,
+            "backoffs": self.backoffs,
+            "adaptive": self.adaptive,
+        }
@@ -0,0 +1,39 @@
+"""
+Y axis limits for the live graphs: round numbers with some headroom, kept
+steady while the data fits so the axes (and the graph's cached background)
+don't change on every sample.
+"""
+import math
+
+
+def nice_ceiling(value):
+    """value rounded up to 1, 2 or 5 times a power of ten."""
+    scale = 10 ** math.floor(math.log10(value))
+    for step in (1, 2, 5, 10):
+        if step * scale >= value:
+            return step * scale
+
+
+def axis_range(values, current):
+    """
+    y limits: 20% beyond the data, rounded to 1, 2 or 5 times a power of
+    ten, from 0 unless the data goes negative. The current limits are kept
+    while the data fits and still uses more than a third of them.
+    """
+    if not len(values):
+        return current
+    low, high = float(values.min()), float(values.max())
+    cur_low, cur_high = current
+    if high <= 0:
+        top = 100 if low >= 0 else 0
+    elif high <= cur_high and high * 3 >= cur_high:
+        top = cur_high
+    else:
+        top = nice_ceiling(high * 1.2)
+    if low >= 0:
+        bottom = 0
+    elif low >= cur_low and low * 3 <= cur_low:
+        bottom = cur_low
+    else:
+        bottom = -nice_ceiling(-low * 1.2)
+    return bottom, top
@@ -1,24 +1,136 @@
+import atexit
+import copy
 import json
 import os
+import threading
+import time
 
-CONFIG_FILE = "config.json"
+from constants import CONFIG_FILE
 
-class ConfigManager:
-    @staticmethod
-    def load_config():
-        if not os.path.exists(CONFIG_FILE):
+# Where the config used to live: the working directory the app was started from.
+LEGACY_CONFIG_FILE = "config.json"
+# Saves closer together than this (seconds) are written to disk once.
+SAVE_DELAY = 1.0
+
+
+class ConfigStore:
+    """
+    Writes the config from a background thread. save() only takes a copy and
+    returns; a save equal to the last one is dropped, and saves arriving
+    within `delay` of each other are coalesced into one write. Files are
+    written to a temp file, synced and swapped in with os.replace, so a power
+    cut leaves either the old or the new config, never a truncated one.
+    flush() writes whatever is still pending right away.
+    """
+
+    def __init__(self, path=CONFIG_FILE, delay=SAVE_DELAY):
+        self.path = path
+        self.delay = delay
+        self.cond = threading.Condition()
+        self.write_lock = threading.Lock()
+        self._latest = None      # last config loaded or saved
+        self._pending = None     # (seq, config) not written yet
+        self._in_flight = None   # seq the background thread took and is writing
+        self._deadline = 0.0
+        self._seq = 0
+        self._written_seq = 0
+        self._thread = None
+        self.write_count = 0
+
+    def load(self):
+        path = self.path
+        if not os.path.exists(path) and os.path.exists(LEGACY_CONFIG_FILE):
+            path = LEGACY_CONFIG_FILE
+        if not os.path.exists(path):
             return {}
         try:
-            with open(CONFIG_FILE, 'r') as f:
-                return json.load(f)
+            with open(path, 'r') as f:
+                data = json.load(f)
         except Exception as e:
             print(f"Error loading config: {e}")
             return {}
+        with self.cond:
+            if path == self.path:
+                self._latest = copy.deepcopy(data)
+        return data
+
+    def save(self, data):
+        """Schedules data to be written; returns False if it matches what was saved last."""
+        with self.cond:
+            if data == self._latest:
+                return False
+            self._latest = copy.deepcopy(data)
+            self._seq += 1
+            self._pending = (self._seq, self._latest)
+            self._deadline = time.monotonic() + self.delay
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="config-writer", daemon=True)
+                self._thread.start()
+            self.cond.notify_all()
+        return True
+
+    def flush(self):
+        with self.cond:
+            pending, self._pending = self._pending, None
+        if pending is not None:
+            self._write(*pending)
+        # The background thread may have taken a save before we looked; wait it out.
+        with self.cond:
+            while self._in_flight is not None:
+                self.cond.wait()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self._pending is None or time.monotonic() < self._deadline:
+                    self.cond.wait(None if self._pending is None else self._deadline - time.monotonic())
+                pending, self._pending = self._pending, None
+                self._in_flight = pending[0]
+            try:
+                self._write(*pending)
+            finally:
+                with self.cond:
+                    self._in_flight = None
+                    self.cond.notify_all()
+
+    def _write(self, seq, data):
+        with self.write_lock:
+            # A flush() may already have written something newer.
+            if seq <= self._written_seq:
+                return
+            try:
+                folder = os.path.dirname(self.path)
+                if folder and not os.path.exists(folder):
+                    os.makedirs(folder)
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(data, f, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+                self._written_seq = seq
+                self.write_count += 1
+            except Exception as e:
+                print(f"Error saving config: {e}")
+                with self.cond:
+                    # So the next save() tries again even if it brings the same config.
+                    self._latest = None
+
+
+class ConfigManager:
+    store = ConfigStore()
+
+    @staticmethod
+    def load_config():
+        return ConfigManager.store.load()
 
     @staticmethod
     def save_config(data):
-        try:
-            with open(CONFIG_FILE, 'w') as f:
-                json.dump(data, f, indent=4)
-        except Exception as e:
-            print(f"Error saving config: {e}")
\ No newline at end of file
+        ConfigManager.store.save(data)
+
+    @staticmethod
+    def flush():
+        ConfigManager.store.flush()
+
+
+atexit.register(ConfigManager.flush)
@@ -3,6 +3,12 @@ import os
 SRC_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(SRC_DIR)
 PRO_PACK_DIR = os.path.join(PROJECT_ROOT, "pro_packs")
+CONFIG_FILE = os.path.join(PROJECT_ROOT, "config.json")
+CACHE_DIR = os.path.join(PROJECT_ROOT, "cache")
+PACK_CACHE_DIR = os.path.join(CACHE_DIR, "packs")
+LOCALE_DIR = os.path.join(SRC_DIR, "locale")
+TRANSLATION_CACHE_DIR = os.path.join(CACHE_DIR, "locale")
+VEHICLE_CACHE_FILE = os.path.join(CACHE_DIR, "vehicle_profiles.json")
 
 STANDARD_SENSORS = {
     "RPM": (
@@ -66,4 +72,31 @@ HIGH_PRIORITY_SENSORS = [
     "BMW_RAIL_PRESSURE",
     "F150L_HV_BATTERY_CURRENT",
     "VW_HV_BATTERY_CURRENT"
-]
\ No newline at end of file
+]
+
+# How often the UI picks up the latest acquisition snapshot and redraws.
+UI_FRAME_INTERVAL_MS = 50
+# Most widget updates applied in one frame; the rest carry over to the next.
+UI_MAX_UPDATES_PER_FRAME = 40
+
+# Upper bound on Live Graph redraws per second, whatever the acquisition rate.
+GRAPH_MAX_FPS = 20
+
+# Upper bound on redraws per second of each dashboard gauge.
+GAUGE_MAX_FPS = 15
+
+# Target poll rates (Hz) used by the acquisition scheduler. Sensors in
+# HIGH_PRIORITY_SENSORS default to HIGH_PRIORITY_RATE_HZ, anything not listed
+# anywhere falls back to DEFAULT_POLL_RATE_HZ.
+HIGH_PRIORITY_RATE_HZ = 20
+DEFAULT_POLL_RATE_HZ = 2
+
+SENSOR_POLL_RATES = {
+    "COOLANT_TEMP": 1,
+    "INTAKE_TEMP": 1,
+    "MAF": 10,
+    "TIMING_ADVANCE": 10,
+    "RUN_TIME": 1,
+    "FUEL_LEVEL": 0.2,
+    "BAROMETRIC_PRESSURE": 0.1,
+}
@@ -1,47 +1,325 @@
 import csv
+import io
+import queue
+import threading
 import time
 import os
 
+from trip_log import BinaryTripWriter, BINARY_EXTENSION
+from trip_index import TripIndexWriter, INDEX_SUFFIX, format_timestamp
+from log_rotation import BackgroundCompressor, COMPRESSIONS, segment_path
+
+# Rows waiting for the writer thread; beyond this they are dropped rather than
+# stalling the UI thread.
+LOG_QUEUE_SIZE = 4096
+# The writer flushes after this many rows or this many seconds, whichever comes first.
+FLUSH_ROWS = 200
+FLUSH_INTERVAL = 1.0
+# Seconds between fsync() calls; None leaves it to the OS, 0 syncs on every flush.
+FSYNC_INTERVAL = 5.0
+
+LOG_FORMATS = ("csv", "binary")
+
+# Defaults for starting a new segment of the same trip; None means no limit.
+ROTATE_BYTES = None
+ROTATE_SECONDS = None
+
+
+class _CSVSink:
+    """
+    Writes CSV lines as bytes so it always knows the byte offset of the next
+    row, and records it in the sidecar time index (see trip_index.py).
+    """
+
+    def __init__(self, path, header, start_wall_time):
+        self.path = path
+        self.file = open(path, mode='wb')
+        self.index = TripIndexWriter(path + INDEX_SUFFIX, start_wall_time)
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.position = 0
+        self.rows = 0
+        self.file.write(self._encode(header))
+
+    @property
+    def size(self):
+        return self.position
+
+    def _encode(self, row):
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        self.writer.writerow(row)
+        line = self.buffer.getvalue().encode("utf-8")
+        self.position += len(line)
+        return line
+
+    def write_rows(self, rows):
+        lines = []
+        for wall_time, row in rows:
+            self.index.add(wall_time, self.position, self.rows)
+            lines.append(self._encode(row))
+            self.rows += 1
+        self.file.write(b"".join(lines))
+
+    def flush(self, sync):
+        # Data before index, so the index never points past what is on disk.
+        self.file.flush()
+        if sync:
+            os.fsync(self.file.fileno())
+        self.index.flush(sync)
+
+    def close(self):
+        self.file.close()
+        self.index.close()
+
+
+class _BinarySink:
+    def __init__(self, path, keys, units, start_wall_time, start_monotonic_ns):
+        self.path = path
+        self.file = open(path, mode='wb')
+        self.writer = BinaryTripWriter(self.file, keys, units, start_wall_time=start_wall_time,
+                                       start_monotonic_ns=start_monotonic_ns)
+
+    @property
+    def size(self):
+        return self.file.tell()
+
+    def write_rows(self, rows):
+        self.writer.write_many(rows)
+
+    def flush(self, sync):
+        self.file.flush()
+        if sync:
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
 
 class DataLogger:
-    def __init__(self):
+    """
+    Trip logger writing CSV or the binary format from trip_log.py (log_format).
+    write_row() only formats the row and puts it on a bounded queue; a writer
+    thread keeps the file open, writes rows in batches and flushes them on the
+    thresholds above. close() drains the queue and syncs the file to disk.
+
+    With rotate_bytes / rotate_seconds set, a trip is split into segments
+    (see log_rotation.py); each finished segment is handed to a background
+    compressor when compression is "gzip" or "zstd".
+    """
+
+    def __init__(self, flush_rows=FLUSH_ROWS, flush_interval=FLUSH_INTERVAL, fsync_interval=FSYNC_INTERVAL,
+                 queue_size=LOG_QUEUE_SIZE, log_format="csv", rotate_bytes=ROTATE_BYTES,
+                 rotate_seconds=ROTATE_SECONDS, compression="none"):
         self.enabled = True
+        self.log_format = log_format if log_format in LOG_FORMATS else "csv"
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.compression = compression if compression in COMPRESSIONS else "none"
+        self.compressor = BackgroundCompressor()
         self.log_dir = os.path.join(os.getcwd(), "logs")
         self.current_filepath = None
         self.active_headers = []
 
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped_rows = 0
+        self.writer_thread = None
+        # (log number, binary?, keys) swapped as one so a row is never built for half-switched logs.
+        self._target = (0, False, [])
+
         if not os.path.exists(self.log_dir):
             os.makedirs(self.log_dir)
 
-    def start_new_log(self, sensor_keys):
+    def start_new_log(self, sensor_keys, units=None):
+        """units: optional {key: unit}, stored in the binary header."""
         if not sensor_keys:
             return
 
-        self.active_headers = sensor_keys
-        filename = f"trip_log_{int(time.time())}.csv"
-        self.current_filepath = os.path.join(self.log_dir, filename)
+        headers = list(sensor_keys)
+        binary = self.log_format == "binary"
+        extension = BINARY_EXTENSION if binary else ".csv"
+        path = os.path.join(self.log_dir, f"trip_log_{int(time.time())}{extension}")
+        generation = self._target[0] + 1
+        if binary:
+            unit_list = [(units or {}).get(key, "") for key in headers]
+            self._send(("open", generation, path, "binary", headers, unit_list, time.time(), time.monotonic_ns()))
+        else:
+            self._send(("open", generation, path, "csv", ["Timestamp"] + headers, time.time()))
 
-        try:
-            with open(self.current_filepath, mode='w', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow(["Timestamp"] + sensor_keys)
-        except Exception as e:
-            print(f"Logging Init Error: {e}")
+        self.active_headers = headers
+        self.current_filepath = path
+        self._target = (generation, binary, headers)
 
-    def write_row(self, data_dict):
+    def write_row(self, data_dict, timestamp_ns=None, wall_time=None):
+        """
+        Queues one sample. timestamp_ns is time.monotonic_ns() and wall_time
+        time.time() of when the values were read; both default to now.
+        """
         if not self.enabled or not self.current_filepath:
             return
 
+        generation, binary, headers = self._target
+        if binary:
+            if timestamp_ns is None: timestamp_ns = time.monotonic_ns()
+            row_data = (timestamp_ns, [data_dict.get(key) for key in headers])
+        else:
+            if wall_time is None: wall_time = time.time()
+            row = [format_timestamp(wall_time)]
+            for key in headers:
+                row.append(data_dict.get(key, ""))
+            row_data = (wall_time, row)
+
         try:
-            row_data = [time.strftime("%H:%M:%S")]
-            for key in self.active_headers:
-                row_data.append(data_dict.get(key, ""))
+            self.queue.put_nowait(("row", generation, row_data))
+        except queue.Full:
+            self.dropped_rows += 1
 
-            with open(self.current_filepath, mode='a', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow(row_data)
-        except Exception:
-            pass
+    def flush(self, timeout=5.0):
+        """Blocks until everything queued so far is written and flushed."""
+        done = threading.Event()
+        self._send(("flush", done))
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """
+        Writes out the queue, syncs and closes the file, and stops the writer
+        thread, then gives the compressor the rest of timeout to finish.
+        """
+        if self.writer_thread is None or not self.writer_thread.is_alive():
+            return self.compressor.wait(timeout)
+        deadline = time.monotonic() + timeout
+        done = threading.Event()
+        self._send(("close", done))
+        finished = done.wait(timeout)
+        self.writer_thread.join(max(0.0, deadline - time.monotonic()))
+        self.writer_thread = None
+        return self.compressor.wait(max(0.0, deadline - time.monotonic())) and finished
+
+    def _send(self, message):
+        # Control messages must not be dropped; wait for room instead.
+        if self.writer_thread is None or not self.writer_thread.is_alive():
+            self.writer_thread = threading.Thread(target=self._writer_loop, name="DataLogger", daemon=True)
+            self.writer_thread.start()
+        self.queue.put(message)
+
+    def _writer_loop(self):
+        sink = None
+        generation = None
+        # (first segment path, format, sink arguments, segment number, monotonic time it was opened)
+        segment = None
+        pending = 0
+        last_flush = time.monotonic()
+        last_sync = last_flush
+
+        def flush_file(sync):
+            nonlocal pending, last_flush, last_sync
+            if sink is None:
+                return
+            try:
+                now = time.monotonic()
+                sync = sync or (self.fsync_interval is not None and now - last_sync >= self.fsync_interval)
+                sink.flush(sync)
+                if sync:
+                    last_sync = now
+            except Exception as e:
+                print(f"Logging Flush Error: {e}")
+            pending = 0
+            last_flush = time.monotonic()
+
+        def close_file():
+            nonlocal sink
+            if sink is None:
+                return
+            flush_file(sync=True)
+            try:
+                sink.close()
+                self.compressor.submit(sink.path, self.compression)
+            except Exception:
+                pass
+            sink = None
+
+        def open_file(number):
+            nonlocal sink, segment
+            first_path, fmt, sink_args = segment[:3]
+            segment = (first_path, fmt, sink_args, number, time.monotonic())
+            path = segment_path(first_path, number)
+            try:
+                if fmt == "binary":
+                    sink = _BinarySink(path, *sink_args)
+                else:
+                    sink = _CSVSink(path, *sink_args)
+            except Exception as e:
+                print(f"Logging Init Error: {e}")
+                sink = None
+
+        def write(rows):
+            nonlocal pending
+            if not rows or sink is None:
+                return
+            self._write_rows(sink, rows)
+            pending += len(rows)
+            if self._segment_full(sink, segment[4]):
+                close_file()
+                open_file(segment[3] + 1)
+
+        while True:
+            try:
+                message = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if pending:
+                    flush_file(sync=False)
+                continue
+
+            # Take whatever else is already waiting so rows go out in one batch.
+            batch = [message]
+            while len(batch) < self.flush_rows:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            rows = []
+            for kind, *args in batch:
+                if kind == "row":
+                    # Rows built just before a new log was started belong to the old one, which is closed.
+                    if args[0] == generation:
+                        rows.append(args[1])
+                    continue
+
+                write(rows)
+                rows = []
+
+                if kind == "open":
+                    close_file()
+                    generation, path, fmt = args[:3]
+                    segment = (path, fmt, args[3:])
+                    open_file(1)
+                elif kind == "flush":
+                    flush_file(sync=False)
+                    args[0].set()
+                elif kind == "close":
+                    close_file()
+                    args[0].set()
+                    return
+
+            write(rows)
+
+            if pending >= self.flush_rows or (pending and time.monotonic() - last_flush >= self.flush_interval):
+                flush_file(sync=False)
+
+    def _segment_full(self, sink, opened):
+        if self.rotate_bytes and sink.size >= self.rotate_bytes:
+            return True
+        return bool(self.rotate_seconds) and time.monotonic() - opened >= self.rotate_seconds
+
+    def _write_rows(self, sink, rows):
+        try:
+            sink.write_rows(rows)
+        except Exception as e:
+            print(f"Logging Write Error: {e}")
 
     def set_directory(self, new_path):
         if os.path.isdir(new_path):
@@ -49,5 +327,19 @@ class DataLogger:
             return True
         return False
 
+    def set_format(self, log_format):
+        """Takes effect from the next start_new_log()."""
+        if log_format in LOG_FORMATS:
+            self.log_format = log_format
+            return True
+        return False
+
+    def set_rotation(self, rotate_bytes=None, rotate_seconds=None, compression=None):
+        """Limits per segment (None or 0 = no limit); applies to the log being written too."""
+        self.rotate_bytes = rotate_bytes or None
+        self.rotate_seconds = rotate_seconds or None
+        if compression in COMPRESSIONS:
+            self.compression = compression
+
     def toggle_logging(self, is_enabled):
-        self.enabled = is_enabled
\ No newline at end of file
+        self.enabled = is_enabled
@@ -0,0 +1,203 @@
+"""
+Reducing a time series to about as many points as there are pixels to draw
+it on, before it reaches matplotlib.
+
+    lttb     Largest-Triangle-Three-Buckets: keeps the points that carry the
+             visual shape of the line, one per bucket.
+    minmax   the lowest and highest point of every bucket, in time order;
+             cheaper, and never loses a spike.
+
+Both keep the first and last point, drop NaN samples, and return the input
+unchanged when it is already small enough. StreamingDecimator applies the
+same rules to a live series without redoing the whole window every frame.
+"""
+import bisect
+import math
+
+import numpy as np
+
+DECIMATION_METHODS = ("lttb", "minmax")
+
+
+def _finite(x, y):
+    keep = np.isfinite(y)
+    if keep.all():
+        return x, y
+    return x[keep], y[keep]
+
+
+def _bucket_edges(n, buckets):
+    # Interior points 1 .. n-2 split into `buckets` ranges; the first and last points stand alone.
+    return np.linspace(1, n - 1, buckets + 1).astype(np.intp)
+
+
+def lttb(x, y, threshold):
+    """Indices are chosen per bucket; returns the decimated (x, y) arrays."""
+    x, y = _finite(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    buckets = threshold - 2
+    edges = _bucket_edges(n, buckets)
+    starts, ends = edges[:-1], edges[1:]
+
+    # Averages of every bucket, computed in one pass; the last "next bucket" is the final point.
+    counts = ends - starts
+    avg_x = np.add.reduceat(x[1:n - 1], starts - 1) / counts
+    avg_y = np.add.reduceat(y[1:n - 1], starts - 1) / counts
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    # The anchor of each bucket is the point picked in the one before, so this
+    # part is a loop; scalars are plain floats to keep each step cheap.
+    chosen = [0]
+    a = 0
+    xs, ys = x.tolist(), y.tolist()
+    for lo, hi, cx, cy in zip(starts.tolist(), ends.tolist(), next_x.tolist(), next_y.tolist()):
+        ax, ay = xs[a], ys[a]
+        # Twice the triangle area is |alpha * x + beta * y + k| for each candidate.
+        alpha, beta = cy - ay, ax - cx
+        area = alpha * x[lo:hi] + beta * y[lo:hi]
+        area -= alpha * ax + beta * ay
+        a = lo + int(np.abs(area, out=area).argmax())
+        chosen.append(a)
+    chosen.append(n - 1)
+    return x[chosen], y[chosen]
+
+
+def minmax(x, y, threshold):
+    """About `threshold` points: the extremes of threshold / 2 buckets, in time order."""
+    x, y = _finite(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+    n = len(x)
+    buckets = (threshold - 2) // 2
+    if threshold >= n or buckets < 1:
+        return x, y
+
+    edges = _bucket_edges(n, buckets)
+    starts, sizes = edges[:-1], np.diff(edges)
+    lows = np.minimum.reduceat(y[1:n - 1], starts - 1)
+    highs = np.maximum.reduceat(y[1:n - 1], starts - 1)
+
+    # Positions of the extremes: the first point in each bucket equal to the bucket's min / max.
+    bucket_of = np.repeat(np.arange(buckets), sizes)
+    segment = y[1:n - 1]
+    low_at = _first_match(segment == lows[bucket_of], bucket_of, buckets) + 1
+    high_at = _first_match(segment == highs[bucket_of], bucket_of, buckets) + 1
+
+    picks = np.sort(np.stack([low_at, high_at], axis=1), axis=1).ravel()
+    chosen = np.concatenate(([0], picks, [n - 1]))
+    # A flat bucket has min == max at the same point; keep it once.
+    chosen = chosen[np.concatenate(([True], np.diff(chosen) != 0))]
+    return x[chosen], y[chosen]
+
+
+def _first_match(mask, bucket_of, buckets):
+    index = np.flatnonzero(mask)
+    found, first = np.unique(bucket_of[index], return_index=True)
+    positions = np.zeros(buckets, dtype=np.intp)
+    positions[found] = index[first]
+    return positions
+
+
+def decimate(x, y, threshold, method="lttb"):
+    if method == "minmax":
+        return minmax(x, y, threshold)
+    return lttb(x, y, threshold)
+
+
+class StreamingDecimator:
+    """
+    Decimates a growing series incrementally, for live plots. Buckets are
+    bucket_seconds wide and aligned to multiples of it, so a bucket's pick
+    is final once the buckets after it are complete (for LTTB, the one after
+    next: its anchor and the next bucket's average must both be known).
+    Each update() only works through buckets completed since the last call
+    and returns the cached picks plus the raw samples of the open tail, so
+    the cost per frame does not grow with the window.
+    """
+
+    def __init__(self, bucket_seconds, method="lttb"):
+        self.bucket_seconds = bucket_seconds
+        self.method = method if method in DECIMATION_METHODS else "lttb"
+        self.reset()
+
+    def reset(self):
+        self.xs = []
+        self.ys = []
+        self.done = None    # last bucket whose picks are final
+
+    def resume_time(self):
+        """Samples older than this are already folded into final picks; update() can skip them."""
+        return -math.inf if self.done is None else (self.done + 1) * self.bucket_seconds
+
+    def trim(self, before):
+        """Forgets picks older than `before`."""
+        cut = bisect.bisect_left(self.xs, before)
+        if cut:
+            del self.xs[:cut]
+            del self.ys[:cut]
+
+    def update(self, t, y):
+        """
+        t, y: the series, oldest first; it only needs to reach back to the
+        last bucket that was still open on the previous call. Returns (x, y)
+        arrays: final picks followed by the raw open tail.
+        """
+        t, y = _finite(np.asarray(t, dtype=np.float64), np.asarray(y, dtype=np.float64))
+        if not len(t):
+            return np.array(self.xs), np.array(self.ys)
+
+        width = self.bucket_seconds
+        newest = math.floor(t[-1] / width)
+        last_final = newest - (2 if self.method == "lttb" else 1)
+        first = math.floor(t[0] / width) if self.done is None else max(self.done + 1, math.floor(t[0] / width))
+
+        if last_final >= first:
+            # Sample ranges of buckets first .. last_final + 1 (the extra one is LTTB's "next" bucket).
+            edges = np.searchsorted(t, np.arange(first, last_final + 3) * width).tolist()
+            if self.method == "lttb":
+                self._lttb_buckets(t, y, edges)
+            else:
+                self._minmax_buckets(t, y, edges)
+            self.done = last_final
+
+        tail = int(np.searchsorted(t, (self.done + 1) * width)) if self.done is not None else 0
+        return (np.concatenate((self.xs, t[tail:])),
+                np.concatenate((self.ys, y[tail:])))
+
+    def _lttb_buckets(self, t, y, edges):
+        for i in range(len(edges) - 2):
+            lo, hi = edges[i], edges[i + 1]
+            if lo == hi:
+                continue
+            if not self.xs:
+                # The very first point of the series is kept as is, like lttb() does.
+                self.xs.append(float(t[lo]))
+                self.ys.append(float(y[lo]))
+                lo += 1
+                if lo == hi:
+                    continue
+            n_lo, n_hi = edges[i + 1], edges[i + 2]
+            if n_hi > n_lo:
+                cx, cy = float(t[n_lo:n_hi].mean()), float(y[n_lo:n_hi].mean())
+            else:
+                # Empty next bucket: aim at the first sample after it.
+                cx, cy = float(t[min(n_hi, len(t) - 1)]), float(y[min(n_hi, len(t) - 1)])
+            ax, ay = self.xs[-1], self.ys[-1]
+            alpha, beta = cy - ay, ax - cx
+            area = alpha * t[lo:hi] + beta * y[lo:hi]
+            area -= alpha * ax + beta * ay
+            pick = lo + int(np.abs(area, out=area).argmax())
+            self.xs.append(float(t[pick]))
+            self.ys.append(float(y[pick]))
+
+    def _minmax_buckets(self, t, y, edges):
+        for i in range(len(edges) - 2):
+            lo, hi = edges[i], edges[i + 1]
+            if lo == hi:
+                continue
+            low, high = lo + int(y[lo:hi].argmin()), lo + int(y[lo:hi].argmax())
+            for pick in sorted({low, high}):
+                self.xs.append(float(t[pick]))
+                self.ys.append(float(y[pick]))
@@ -0,0 +1,291 @@
+import binascii
+import time
+
+import serial
+import obd
+from obd import OBDStatus
+from obd.OBDResponse import OBDResponse
+from obd.elm327 import ELM327
+from obd.protocols import ECU
+from obd.protocols.protocol import Message
+
+PROMPT = b">"
+RX_BUFFER_SIZE = 4096
+
+# Echo off, linefeeds off, no spaces, headers on, aggressive adaptive timing.
+INIT_COMMANDS = (b"ATE0", b"ATL0", b"ATS0", b"ATH1", b"ATAT2")
+
+CAN_PROTOCOLS = ("6", "7", "8", "9")
+CAN_29BIT_PROTOCOLS = ("7", "9")
+
+ERROR_REPLIES = (
+    b"NO DATA", b"STOPPED", b"?", b"CAN ERROR", b"BUS ERROR", b"BUS BUSY", b"BUFFER FULL",
+    b"DATA ERROR", b"FB ERROR", b"LV RESET", b"UNABLE TO CONNECT", b"ERR", b"ACT ALERT",
+)
+IGNORED_LINES = (b"SEARCHING", b"OK", b"BUS INIT")
+
+ENGINE_IDS = (0x7E8, 0x18DAF110, 0x10)
+TRANSMISSION_IDS = (0x7E9, 0x18DAF118, 0x18)
+
+# The ELM327 accepts a single hex digit as the expected-response hint.
+MAX_RESPONSE_HINT = 0xF
+
+
+class ELM327Error(Exception):
+    pass
+
+
+class NativeELM327:
+    """
+    Minimal ELM327 client that talks to the adapter directly over pyserial
+    (serial ports and socket:// URLs alike) and exposes the part of python-obd's
+    OBD object that OBDHandler uses: query(), supported_commands, is_connected(),
+    protocol_name()/protocol_id(), port_name() and close().
+
+    Compared to python-obd it keeps headers on so replies can be split per ECU,
+    learns how many frames each request returns and appends that count to the
+    request (e.g. "010C1") so the adapter answers as soon as the ECU has, and
+    reads every reply into one reusable buffer.
+    """
+
+    def __init__(self, portstr, baudrate=38400, protocol=None, timeout=5, supported=None):
+        self.portstr = portstr
+        self.timeout = timeout
+        self._status = OBDStatus.NOT_CONNECTED
+        self._protocol_id = ""
+        self._rx = bytearray(RX_BUFFER_SIZE)
+        self._response_counts = {}
+        self.supported_commands = set()
+        self.last_error = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+        self.port = serial.serial_for_url(portstr, baudrate=baudrate, timeout=timeout, write_timeout=timeout)
+        try:
+            self._initialise(protocol, supported)
+        except Exception:
+            self.close()
+            raise
+
+    def _initialise(self, protocol, supported):
+        self.port.reset_input_buffer()
+        self._exchange(b"ATZ", timeout=max(self.timeout, 2))
+        for cmd in INIT_COMMANDS:
+            if not self._is_ok(self._exchange(cmd)):
+                raise ELM327Error(f"Adapter rejected {cmd.decode()}")
+        self._status = OBDStatus.ELM_CONNECTED
+
+        if not self._is_ok(self._exchange(b"ATSP" + (protocol or "0").encode())):
+            raise ELM327Error(f"Adapter rejected protocol {protocol}")
+
+        # The first request makes the adapter search for (or confirm) the protocol.
+        messages, _ = self._parse(self._exchange(b"0100", timeout=max(self.timeout, 10)))
+        if not messages:
+            return
+
+        n = self._exchange(b"ATDPN")
+        self._protocol_id = bytes(self._rx[:n]).strip(b"\r\n >").lstrip(b"A").decode(errors="ignore")
+        self._status = OBDStatus.CAR_CONNECTED
+
+        if supported is not None:
+            self.supported_commands = set(supported)
+        else:
+            self._load_commands()
+
+    def _load_commands(self):
+        self.supported_commands = set(obd.commands.base_commands())
+        for getter in obd.commands.pid_getters():
+            if getter not in self.supported_commands:
+                continue
+            response = self.query(getter)
+            if response.is_null():
+                continue
+            for i, bit in enumerate(response.value):
+                if not bit:
+                    continue
+                pid = getter.pid + i + 1
+                if obd.commands.has_pid(getter.mode, pid):
+                    self.supported_commands.add(obd.commands[getter.mode][pid])
+                if getter.mode == 1 and obd.commands.has_pid(2, pid):
+                    self.supported_commands.add(obd.commands[2][pid])
+
+    # --- python-obd compatible surface ---
+
+    def status(self):
+        return self._status
+
+    def is_connected(self):
+        return self._status == OBDStatus.CAR_CONNECTED
+
+    def protocol_id(self):
+        return self._protocol_id
+
+    def protocol_name(self):
+        protocol = ELM327._SUPPORTED_PROTOCOLS.get(self._protocol_id)
+        return protocol.ELM_NAME if protocol else ""
+
+    def port_name(self):
+        return self.portstr
+
+    def supports(self, cmd):
+        return cmd in self.supported_commands
+
+    def close(self):
+        self._status = OBDStatus.NOT_CONNECTED
+        self.supported_commands = set()
+        try:
+            self.port.close()
+        except Exception:
+            pass
+
+    def query(self, cmd, force=False):
+        if self._status == OBDStatus.NOT_CONNECTED:
+            return OBDResponse()
+        if not force and cmd not in self.supported_commands:
+            return OBDResponse()
+
+        request = cmd.command.replace(b" ", b"")
+        if request[:2].upper() == b"AT":
+            self._exchange(request)
+            return OBDResponse()
+
+        hint = self._response_counts.get(request)
+        wire = request + (b"%X" % hint if hint else b"")
+
+        messages, frame_count = self._parse(self._exchange(wire))
+        if hint and self.last_error == "?":
+            # Not every adapter takes a hint on every request (e.g. multi-PID); stop sending it.
+            self._response_counts[request] = 0
+            messages, frame_count = self._parse(self._exchange(request))
+        if not messages:
+            return OBDResponse()
+
+        # The hint counts responses, so only learn it when each ECU answered in a single frame.
+        if hint is None and frame_count == len(messages) <= MAX_RESPONSE_HINT:
+            self._response_counts[request] = frame_count
+
+        return cmd(messages)
+
+    # --- wire level ---
+
+    def _exchange(self, request, timeout=None):
+        """Sends one request and reads the reply into self._rx. Returns the reply length."""
+        if self.port.in_waiting:
+            # Leftovers from a reply we gave up on would be mistaken for this one.
+            self.port.reset_input_buffer()
+        self.last_error = None
+        self.port.write(request + b"\r")
+        self.bytes_sent += len(request) + 1
+        return self._read_reply(timeout or self.timeout)
+
+    def _read_reply(self, timeout):
+        n = 0
+        deadline = time.monotonic() + timeout
+        while True:
+            if n == len(self._rx):
+                self._rx.extend(bytes(len(self._rx)))
+
+            with memoryview(self._rx) as view:
+                want = max(1, min(self.port.in_waiting, len(self._rx) - n))
+                got = self.port.readinto(view[n:n + want]) or 0
+
+            if got:
+                found = self._rx.find(PROMPT, n, n + got)
+                n += got
+                if found >= 0:
+                    self.bytes_received += n
+                    return found
+            elif time.monotonic() > deadline:
+                self.bytes_received += n
+                self.last_error = "TIMEOUT"
+                return n
+
+    def _is_ok(self, n):
+        return self._rx.find(b"OK", 0, n) >= 0
+
+    def _lines(self, n):
+        """Yields (start, end) of every non-empty line in the first n bytes of the buffer."""
+        buf = self._rx
+        start = 0
+        while start < n:
+            end = buf.find(b"\r", start, n)
+            if end < 0:
+                end = n
+            s, e = start, end
+            while s < e and buf[s] in b" \n>":
+                s += 1
+            while e > s and buf[e - 1] in b" \n>":
+                e -= 1
+            if e > s:
+                yield s, e
+            start = end + 1
+
+    def _parse(self, n):
+        """Turns the reply in the buffer into python-obd Messages. Returns (messages, frame_count)."""
+        buf = self._rx
+        is_can = self._protocol_id in CAN_PROTOCOLS or not self._protocol_id
+        header_len = 8 if self._protocol_id in CAN_29BIT_PROTOCOLS else 3
+
+        frame_count = 0
+        order = []
+        assembled = {}
+        expected = {}
+
+        with memoryview(buf) as view:
+            for s, e in self._lines(n):
+                if any(buf.startswith(marker, s, e) for marker in IGNORED_LINES):
+                    continue
+                if any(buf.startswith(marker, s, e) for marker in ERROR_REPLIES):
+                    self.last_error = bytes(buf[s:e]).decode(errors="ignore")
+                    continue
+
+                try:
+                    if is_can:
+                        tx_id = int(buf[s:s + header_len], 16)
+                        data = binascii.unhexlify(view[s + header_len:e])
+                    else:
+                        raw = binascii.unhexlify(view[s:e])
+                        tx_id, data = raw[2], raw[3:-1]
+                except (ValueError, binascii.Error):
+                    continue
+
+                frame_count += 1
+                if tx_id not in assembled:
+                    order.append(tx_id)
+                    assembled[tx_id] = bytearray()
+
+                if not is_can:
+                    # Legacy multi-line replies repeat mode + PID (+ sequence) on every line.
+                    assembled[tx_id] += data if not assembled[tx_id] else data[3:]
+                    continue
+
+                if not data:
+                    continue
+                pci = data[0] >> 4
+                if pci == 0:
+                    assembled[tx_id] += data[1:1 + (data[0] & 0x0F)]
+                elif pci == 1 and len(data) > 1:
+                    expected[tx_id] = ((data[0] & 0x0F) << 8) | data[1]
+                    assembled[tx_id] += data[2:]
+                elif pci == 2:
+                    assembled[tx_id] += data[1:]
+
+        messages = []
+        for tx_id in order:
+            payload = assembled[tx_id]
+            if tx_id in expected:
+                del payload[expected[tx_id]:]
+            if not payload:
+                continue
+            if is_can and payload[0] == 0x43:
+                # Same trimming python-obd does: 43 <count> then two bytes per DTC.
+                del payload[2 + payload[1] * 2:]
+            message = Message([])
+            message.data = payload
+            if tx_id in ENGINE_IDS:
+                message.ecu = ECU.ENGINE
+            elif tx_id in TRANSMISSION_IDS:
+                message.ecu = ECU.TRANSMISSION
+            messages.append(message)
+
+        return messages, frame_count
@@ -0,0 +1,121 @@
+import ast
+import functools
+import string
+import struct
+
+# Response bytes are exposed to pack formulas as A, B, C ... Z.
+BYTE_NAMES = string.ascii_uppercase
+
+
+def signed(val):
+    if val > 127: return val - 256
+    return val
+
+
+FORMULA_FUNCTIONS = {"min": min, "max": max, "abs": abs, "signed": signed}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.Constant, ast.Name, ast.Load, ast.Call,
+    ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.LShift, ast.RShift, ast.BitAnd, ast.BitOr, ast.BitXor,
+    ast.UAdd, ast.USub, ast.Invert, ast.Not, ast.And, ast.Or,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)
+
+
+class FormulaError(ValueError):
+    pass
+
+
+@functools.lru_cache(maxsize=None)
+def _byte_unpackers(count):
+    return struct.Struct(f"{count}B").unpack_from
+
+
+class CompiledFormula:
+    """
+    A pack formula turned into a plain Python function of its byte arguments,
+    e.g. "((A*256)+B)/100" becomes `lambda A, B: ((A*256)+B)/100`. Calling it
+    with the raw response bytes costs one function call, no parsing and no dict.
+    """
+
+    __slots__ = ("source", "arity", "_fn", "_unpack")
+
+    def __init__(self, source, arity, fn):
+        self.source = source
+        self.arity = arity
+        self._fn = fn
+        # Unpacking the bytes the formula reads in one C call beats slicing them out.
+        self._unpack = _byte_unpackers(arity)
+
+    def __call__(self, data_bytes):
+        if len(data_bytes) < self.arity:
+            return None
+        try:
+            return float(self._fn(*self._unpack(data_bytes)))
+        except (ArithmeticError, TypeError, ValueError):
+            return None
+
+    def __repr__(self):
+        return f"CompiledFormula({self.source!r})"
+
+
+def check_formula(source):
+    """Validates a formula string; returns how many response bytes it reads. Raises FormulaError."""
+    if not isinstance(source, str) or not source.strip():
+        raise FormulaError("empty formula")
+
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as e:
+        raise FormulaError(f"syntax error: {e.msg}")
+
+    arity = 0
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise FormulaError(f"'{type(node).__name__}' is not allowed")
+
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FORMULA_FUNCTIONS or node.keywords:
+                raise FormulaError("only min(), max(), abs() and signed() may be called")
+
+        if isinstance(node, ast.Name):
+            if node.id in FORMULA_FUNCTIONS:
+                continue
+            if len(node.id) != 1 or node.id not in BYTE_NAMES:
+                raise FormulaError(f"unknown name '{node.id}'")
+            arity = max(arity, BYTE_NAMES.index(node.id) + 1)
+
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise FormulaError(f"constant {node.value!r} is not a number")
+
+    return arity
+
+
+def lambda_source(source, arity):
+    """Python source of the function for a checked formula."""
+    # The body gets lines of its own, so a trailing comment can't swallow the closing parenthesis.
+    return f"lambda {', '.join(BYTE_NAMES[:arity])}: (\n{source.strip()}\n)"
+
+
+def compile_formulas(formulas):
+    """
+    Compiles checked [(source, arity), ...] in a single compile() call and
+    returns the code object; eval_formulas() turns it into CompiledFormulas.
+    """
+    body = "".join(f"{lambda_source(source, arity)},\n" for source, arity in formulas)
+    return compile(f"(\n{body})", "<formula>", "eval")
+
+
+def eval_formulas(code, formulas):
+    fns = eval(code, {"__builtins__": {}, **FORMULA_FUNCTIONS})
+    return [CompiledFormula(source, arity, fn) for (source, arity), fn in zip(formulas, fns)]
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_formula(source):
+    """Validates and compiles a formula string. Raises FormulaError if it isn't usable."""
+    arity = check_formula(source)
+    formulas = [(source, arity)]
+    return eval_formulas(compile_formulas(formulas), formulas)[0]
@@ -0,0 +1,149 @@
+"""
+Log segments and their compression.
+
+A trip may be split into segments when it grows past a size or age limit:
+
+    trip_log_1700000000.csv        first segment (the name the trip always had)
+    trip_log_1700000000-002.csv    later segments
+    trip_log_1700000000-002.csv.gz the same segment once compressed
+
+Finished segments are compressed in the background; their .idx sidecar stays
+uncompressed and keeps the offsets of the uncompressed data.
+"""
+import glob
+import gzip
+import io
+import os
+import queue
+import re
+import shutil
+import threading
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIONS = ("none", "gzip", "zstd")
+COMPRESSED_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+CHUNK_SIZE = 1 << 20
+
+_SEGMENT = re.compile(r"^(trip_log_\d+)(?:-(\d+))?(\.[A-Za-z]+)(\.gz|\.zst)?$")
+
+
+def available_compressions():
+    return [name for name in COMPRESSIONS if name != "zstd" or zstandard is not None]
+
+
+def segment_path(first_path, number):
+    """Path of segment number (1 = the first) of the trip started at first_path."""
+    if number <= 1:
+        return first_path
+    root, extension = os.path.splitext(first_path)
+    return f"{root}-{number:03d}{extension}"
+
+
+def strip_compression(path):
+    for suffix in COMPRESSED_SUFFIXES.values():
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+
+def is_compressed(path):
+    return strip_compression(path) != path
+
+
+def segment_paths(path):
+    """
+    All segments of the trip that path (any of its segments, compressed or not)
+    belongs to, in order. A path that isn't a trip log name comes back alone.
+    """
+    directory, name = os.path.split(path)
+    match = _SEGMENT.match(name)
+    if not match:
+        return [path]
+    trip, extension = match.group(1), match.group(3)
+
+    segments = {}
+    for candidate in glob.glob(os.path.join(glob.escape(directory), glob.escape(trip) + "*")):
+        found = _SEGMENT.match(os.path.basename(candidate))
+        if not found or found.group(1) != trip or found.group(3) != extension:
+            continue
+        number = int(found.group(2) or 1)
+        # While a segment is being compressed both files exist; the plain one is complete.
+        if number not in segments or not found.group(4):
+            segments[number] = candidate
+    return [segments[n] for n in sorted(segments)] or [path]
+
+
+def open_segment(path):
+    """Opens a segment for reading as bytes, decompressing on the fly."""
+    if path.endswith(COMPRESSED_SUFFIXES["gzip"]):
+        return gzip.open(path, "rb")
+    if path.endswith(COMPRESSED_SUFFIXES["zstd"]):
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd-compressed but the 'zstandard' package is not installed")
+        # Buffered so it offers readline() and line iteration like the other two.
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True))
+    return open(path, "rb")
+
+
+def compress_file(path, compression):
+    """
+    Compresses path to path + suffix and removes the original. The compressed
+    file only appears under its final name once it is complete.
+    """
+    target = path + COMPRESSED_SUFFIXES[compression]
+    partial = target + ".part"
+    with open(path, "rb") as source, open(partial, "wb") as raw:
+        if compression == "zstd":
+            with zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=False) as out:
+                shutil.copyfileobj(source, out, CHUNK_SIZE)
+        else:
+            with gzip.GzipFile(filename=os.path.basename(path), mode="wb", fileobj=raw, compresslevel=6) as out:
+                shutil.copyfileobj(source, out, CHUNK_SIZE)
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(partial, target)
+    os.remove(path)
+    return target
+
+
+class BackgroundCompressor:
+    """Compresses finished segments one at a time on its own thread."""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.thread = None
+        self.failed = []
+
+    def submit(self, path, compression):
+        if compression not in COMPRESSED_SUFFIXES:
+            return
+        if compression == "zstd" and zstandard is None:
+            compression = "gzip"
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name="LogCompressor", daemon=True)
+            self.thread.start()
+        self.queue.put((path, compression))
+
+    def wait(self, timeout=None):
+        """Blocks until everything submitted so far is compressed; False on timeout."""
+        if self.thread is None or not self.thread.is_alive():
+            return True
+        done = threading.Event()
+        self.queue.put((None, done))
+        return done.wait(timeout)
+
+    def _run(self):
+        while True:
+            path, compression = self.queue.get()
+            if path is None:
+                compression.set()
+                continue
+            try:
+                compress_file(path, compression)
+            except Exception as e:
+                self.failed.append(path)
+                print(f"Log Compression Error ({os.path.basename(path)}): {e}")
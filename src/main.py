@@ -1,9 +1,16 @@
+from startup_timer import StartupTimer
+
+# Created before the heavy imports below, so the startup report covers them.
+startup = StartupTimer()
+
 from obd_handler import OBDHandler
+from vehicle_cache import VehicleProfileCache
 from ui.main_window import DashboardApp
 
 SIMULATION_MODE = False
 
 if __name__ == "__main__":
-    handler = OBDHandler(simulation=SIMULATION_MODE)
-    app = DashboardApp(handler)
-    app.mainloop()
\ No newline at end of file
+    startup.mark("imports")
+    handler = OBDHandler(simulation=SIMULATION_MODE, profile_cache=VehicleProfileCache())
+    app = DashboardApp(handler, startup=startup)
+    app.mainloop()
@@ -1,21 +1,110 @@
 import obd
 from obd import OBDCommand
+from obd.protocols import ECU
+from obd.protocols.protocol import Message
 from obd.utils import bytes_to_int
 import random
 import time
 import re
 
+from formula_engine import compile_formula, FormulaError
+from pack_compiler import compile_pack, load_bundle, normalize_header, FORMULA_FIELD
+from vehicle_cache import VehicleProfileCache, encode_supported, decode_supported
+from elm327_driver import NativeELM327
+from adaptive_pacing import PacingController, PACING_ERRORS, NO_DATA
+from pid_metrics import PIDMetrics
+
+# ISO 15765-4 (CAN) protocol IDs as reported by the ELM327. Only these accept
+# several Mode 01 PIDs in a single request.
+BATCH_PROTOCOLS = ("6", "7", "8", "9")
+MAX_PIDS_PER_REQUEST = 6
+# Consecutive failed multi-PID requests before we stop trying on this connection.
+MAX_BATCH_FAILURES = 3
+
+# Functional (broadcast) CAN header the ELM327 uses for standard OBD requests.
+DEFAULT_HEADER = "7DF"
+# The ELM327's power-on header per protocol (ATDPN numbering); an AT SH
+# overrides it until it's set back.
+PROTOCOL_HEADERS = {
+    "1": "616AF1", "2": "686AF1", "3": "686AF1", "4": "C133F1", "5": "C133F1",
+    "6": DEFAULT_HEADER, "7": "18DB33F1", "8": DEFAULT_HEADER, "9": "18DB33F1",
+}
+# 29-bit CAN addresses of the engine and transmission modules the DTC scan
+# talks to, for the 11-bit headers used everywhere else.
+EXTENDED_MODULE_HEADERS = {"7E0": "18DA10F1", "7E1": "18DA18F1"}
+EXTENDED_CAN_PROTOCOLS = ("7", "9")
+# Marker for "we don't know what the adapter has set", e.g. after a failed AT SH.
+HEADER_UNKNOWN = "?"
+
+# Serial timeout when the protocol is already known from a cached vehicle profile.
+PROFILE_TIMEOUT = 5
+
+# Unanswered requests in a row before a pack PID is skipped for the rest of the connection.
+PRO_MISSES_PER_SESSION = 3
+# Connections in a row where a pack PID never answered before the profile marks it unsupported.
+PRO_MISSED_SESSIONS = 3
+
+# How OBDHandler talks to the adapter: through python-obd, or through our own
+# lightweight ELM327 driver (needs an explicit port, no auto-scan).
+TRANSPORT_PYTHON_OBD = "python-obd"
+TRANSPORT_NATIVE = "native"
+TRANSPORTS = (TRANSPORT_PYTHON_OBD, TRANSPORT_NATIVE)
+
+
+class _ProfiledOBD(obd.OBD):
+    """
+    python-obd connection that takes its supported PIDs from a cached profile
+    instead of asking the car. python-obd has no public hook for this, so it
+    overrides the private __load_commands; requirements.txt pins the version
+    this was written against and PROFILED_OBD_SUPPORTED guards the rest.
+    """
+
+    def __init__(self, supported, **kwargs):
+        self._preloaded = supported
+        obd.OBD.__init__(self, **kwargs)
+
+    def _OBD__load_commands(self):
+        self.supported_commands = set(self._preloaded)
+
+
+# Without the private method to override, profiles still skip protocol detection but not PID discovery.
+PROFILED_OBD_SUPPORTED = hasattr(obd.OBD, "_OBD__load_commands")
+
+
 class OBDHandler:
-    def __init__(self, simulation=False, log_callback=None):
+    def __init__(self, simulation=False, log_callback=None, profile_cache=None):
         self.simulation = simulation
         self.connection = None
         self.status = "Disconnected"
         self.log_callback = log_callback
-        self.inter_command_delay = 0.01
+        self.pacing = PacingController()
+        self.metrics = PIDMetrics()
+        # Round trip and adapter error of the last paced request, for the metrics.
+        self.last_rtt = None
+        self.last_error = None
+        self.transport = TRANSPORT_PYTHON_OBD
+
+        self.profile_cache = profile_cache
+        self.vehicle_profile = None
+        # Pack PID key -> True once it answered on this car, else the number of
+        # connections in a row it didn't (see _note_pro_support).
+        self.pro_support = {}
+        self.pro_misses = {}
 
         self.pro_defs = {}
+        self.pro_pids = {}
+        self.pro_formulas = {}
+        self.formula_errors = {}
         self.supported_commands = set()
 
+        self.batching_enabled = True
+        self.batch_failures = 0
+
+        # None means the adapter still has its power-on header, default_header.
+        self.active_header = None
+        self.default_header = DEFAULT_HEADER
+        self.stats = {"header_switches": 0, "header_switches_skipped": 0}
+
         self.sim_start_time = time.time()
         self.sim_speed = 0
     
@@ -36,13 +125,47 @@ class OBDHandler:
             self.log_callback(message)
         print(message)
 
-    def set_pro_definitions(self, defs):
+    def set_pro_definitions(self, defs, bundles=()):
+        """
+        Stores the pack definitions along with their compiled sensors. bundles
+        are the packs' compile_pack() results in the order defs was merged;
+        definitions that didn't come with one are compiled here.
+        """
+        pids = {}
+        errors = {}
+
+        def merge(bundle):
+            compiled, failed = load_bundle(bundle)
+            for key in compiled:
+                errors.pop(key, None)
+            for key in failed:
+                pids.pop(key, None)
+            pids.update(compiled)
+            errors.update(failed)
+
+        for bundle in bundles:
+            merge(bundle)
+        missing = {key: definition for key, definition in defs.items() if key not in pids and key not in errors}
+        if missing:
+            merge(compile_pack(missing))
+
+        for key, error in errors.items():
+            definition = defs.get(key, ())
+            formula = definition[FORMULA_FIELD] if len(definition) > FORMULA_FIELD else None
+            self.log(f"Invalid formula for {key} ({formula!r}): {error}")
+        if errors:
+            self.log(f"{len(errors)} pack sensor(s) disabled due to invalid formulas.")
+
+        # Swap in whole dicts so a poll running on the acquisition thread never sees a half-built set.
         self.pro_defs = defs
+        self.pro_pids = pids
+        self.pro_formulas = {key: pid.formula for key, pid in pids.items()}
+        self.formula_errors = errors
 
     def is_connected(self):
         return self.status == "Connected" or self.status == "Connected (SIMULATION)"
 
-    def connect(self, port_name=None, baudrate=115200):
+    def connect(self, port_name=None, baudrate=115200, transport=None):
         if self.simulation:
             self.log("Attempting connection (SIMULATION)...")
             self.status = "Connected (SIMULATION)"
@@ -59,20 +182,42 @@ class OBDHandler:
             if hp is not None:
                 host, port = hp
                 portstr = f"socket://{host}:{port}"
-                self.connection = obd.OBD(portstr=portstr, fast=False, timeout=30, baudrate=baudrate)
+            elif port_name and port_name != "Auto":
+                portstr = port_name
             else:
-                if port_name and port_name != "Auto":
-                    self.connection = obd.OBD(portstr=port_name, fast=False, timeout=30, baudrate=baudrate)
-                else:
-                    self.connection = obd.OBD(fast=False, timeout=30, baudrate=baudrate)
+                portstr = None
+            port_key = portstr or "Auto"
+
+            self.transport = transport if transport in TRANSPORTS else TRANSPORT_PYTHON_OBD
+            if self.transport == TRANSPORT_NATIVE and portstr is None:
+                self.log("Native driver needs an explicit port, using python-obd for Auto-Scan.")
+                self.transport = TRANSPORT_PYTHON_OBD
+
+            self.vehicle_profile = None
+            self.pro_support = {}
+            self.pro_misses = {}
+            if self.profile_cache is not None:
+                self.connection = self._connect_from_profile(portstr, port_key)
+
+            if self.vehicle_profile is None:
+                self.connection = self._open_connection(portstr, baudrate)
 
             if self.connection.is_connected():
                 self.status = "Connected"
-                self.log(f"SUCCESS: Connected to {self.connection.port_name}")
+                self.log(f"SUCCESS: Connected to {port_key} ({self.transport})")
                 self.log(f"Protocol: {self.connection.protocol_name()}")
 
                 self.supported_commands = self.connection.supported_commands
                 self.log(f"Auto-Detected {len(self.supported_commands)} supported sensors.")
+                if self.profile_cache is not None and self.vehicle_profile is None:
+                    self._remember_vehicle(port_key, baudrate)
+                self.batch_failures = 0
+                self.active_header = None
+                self.default_header = PROTOCOL_HEADERS.get(self._protocol_id(), DEFAULT_HEADER)
+                self.pacing.reset()
+                self.metrics.reset()
+                if self.supports_batching():
+                    self.log(f"Multi-PID requests enabled (up to {MAX_PIDS_PER_REQUEST} per request).")
                 return True
             else:
                 self.status = "Failed"
@@ -83,13 +228,141 @@ class OBDHandler:
             self.log(f"CRITICAL ERROR: {e}")
             return False
 
+    def _open_connection(self, portstr, baudrate, protocol=None, supported=None, timeout=30):
+        if self.transport == TRANSPORT_NATIVE:
+            return NativeELM327(portstr, baudrate=baudrate, protocol=protocol,
+                                timeout=min(timeout, PROFILE_TIMEOUT), supported=supported)
+        if supported is not None and PROFILED_OBD_SUPPORTED:
+            return _ProfiledOBD(supported, portstr=portstr, baudrate=baudrate,
+                                protocol=protocol, fast=False, timeout=timeout)
+        return obd.OBD(portstr=portstr, fast=False, timeout=timeout, baudrate=baudrate, protocol=protocol)
+
+    def _connect_from_profile(self, portstr, port_key):
+        """
+        Reconnects with the protocol, baud rate and PID list cached for this
+        adapter. PIDS_A has to match, and then the VIN if the profile has one,
+        or else every other Mode 01 support bitmap (PIDS_B, PIDS_C), before
+        the cache is trusted; on any mismatch the caller falls back to full
+        discovery.
+        """
+        profile = self.profile_cache.lookup_port(port_key)
+        if profile is None:
+            return None
+
+        self.log(f"Using cached vehicle profile ({profile['key']}, protocol {profile['protocol_id']}).")
+        conn = None
+        try:
+            supported = decode_supported(profile["supported"], obd.commands)
+            conn = self._open_connection(portstr, profile["baudrate"], protocol=profile["protocol_id"],
+                                         supported=supported, timeout=PROFILE_TIMEOUT)
+            if conn.is_connected() and self._pids_match(conn, obd.commands.PIDS_A, supported):
+                if profile.get("vin"):
+                    same_car = self._read_vin(conn) == profile["vin"]
+                else:
+                    getters = [g for g in obd.commands.pid_getters()
+                               if g.mode == 1 and g != obd.commands.PIDS_A and g in supported]
+                    same_car = all(self._pids_match(conn, getter, supported) for getter in getters)
+                if same_car:
+                    self.vehicle_profile = profile
+                    self.pro_support = dict(profile.get("pro_support", {}))
+                    return conn
+        except Exception as e:
+            self.log(f"Cached profile failed: {e}")
+
+        self.log("Cached vehicle profile did not match, running full detection...")
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        return None
+
+    @staticmethod
+    def _pids_match(conn, getter, supported):
+        """Whether the car reports the same PIDs for one support bitmap (PIDS_A: 01-20, ...) as the profile."""
+        response = conn.query(getter, force=True)
+        if response.is_null():
+            return False
+        first = getter.pid + 1
+        expected = {c for c in supported if c.mode == getter.mode and c.pid is not None and first <= c.pid < first + 32}
+        actual = {obd.commands[getter.mode][first + i] for i, bit in enumerate(response.value)
+                  if bit and obd.commands.has_pid(getter.mode, first + i)}
+        return actual == expected
+
+    def _read_vin(self, conn=None):
+        try:
+            response = (conn or self.connection).query(obd.commands.VIN, force=True)
+            if response.is_null() or not response.value:
+                return None
+            vin = response.value
+            if isinstance(vin, (bytes, bytearray)):
+                vin = vin.decode("ascii", errors="ignore")
+            vin = "".join(ch for ch in str(vin) if ch.isalnum()).upper()
+            return vin if len(vin) == 17 else None
+        except Exception:
+            return None
+
+    def _remember_vehicle(self, port_key, baudrate):
+        vin = self._read_vin()
+        protocol_id = self.connection.protocol_id()
+        key = VehicleProfileCache.make_key(vin, port_key, protocol_id)
+
+        previous = self.profile_cache.get(key) or {}
+        profile = {
+            "key": key,
+            "vin": vin,
+            "port": port_key,
+            "protocol_id": protocol_id,
+            "protocol_name": self.connection.protocol_name(),
+            "baudrate": self._connected_baudrate(baudrate),
+            "supported": encode_supported(self.supported_commands),
+            "pro_support": previous.get("pro_support", {}),
+        }
+        self.profile_cache.store(port_key, profile)
+        self.vehicle_profile = profile
+        self.pro_support = dict(profile["pro_support"])
+        self.log(f"Saved vehicle profile {key}.")
+
+    def _connected_baudrate(self, requested):
+        """The baud rate the adapter answered on, which python-obd may have picked itself."""
+        conn = self.connection
+        port = getattr(conn, "port", None)
+        if port is None:
+            port = getattr(getattr(conn, "interface", None), "_ELM327__port", None)
+        return getattr(port, "baudrate", None) or requested
+
+    def _note_pro_support(self, key, answered):
+        # Once a pack PID has answered it counts as supported for this car.
+        if answered:
+            self.pro_support[key] = True
+            self.pro_misses.pop(key, None)
+        elif self.pro_support.get(key) is not True:
+            self.pro_misses[key] = self.pro_misses.get(key, 0) + 1
+
+    def _session_pro_support(self):
+        """
+        pro_support with this connection's results folded in: a PID that kept
+        missing adds one to its count, so a single bad session (ignition off,
+        a busy gateway) doesn't disable it for good.
+        """
+        support = dict(self.pro_support)
+        for key, misses in self.pro_misses.items():
+            previous = support.get(key)
+            if previous is not True and misses >= PRO_MISSES_PER_SESSION:
+                support[key] = int(previous or 0) + 1
+        return support
+
     def disconnect(self):
         self.log("Disconnecting...")
+        if self.profile_cache is not None and self.vehicle_profile is not None:
+            self.profile_cache.update_pro_support(self.vehicle_profile["key"], self._session_pro_support())
+        self.vehicle_profile = None
         if self.connection:
             self.connection.close()
             self.connection = None
         self.status = "Disconnected"
         self.supported_commands = set()
+        self.active_header = None
         self.log("Disconnected.")
 
     def check_supported(self, command_key):
@@ -100,94 +373,335 @@ class OBDHandler:
             cmd = getattr(obd.commands, command_key)
             return cmd in self.supported_commands
 
-        if command_key in self.pro_defs:
-            return True
+        if command_key in self.pro_formulas:
+            # Pack PIDs count as supported unless this car keeps ignoring them.
+            support = self.pro_support.get(command_key)
+            if support is True:
+                return True
+            if self.pro_misses.get(command_key, 0) >= PRO_MISSES_PER_SESSION:
+                return False
+            return int(support or 0) < PRO_MISSED_SESSIONS
 
         return False
 
+    def _protocol_id(self):
+        try:
+            return self.connection.protocol_id()
+        except Exception:
+            return None
+
+    def _module_header(self, header):
+        """A module's 11-bit header, translated when the car talks 29-bit CAN."""
+        if self._protocol_id() in EXTENDED_CAN_PROTOCOLS:
+            return EXTENDED_MODULE_HEADERS.get(header, header)
+        return header
+
+    def supports_batching(self):
+        if self.simulation or not self.batching_enabled or not self.connection:
+            return False
+        if self.batch_failures >= MAX_BATCH_FAILURES:
+            return False
+        return self._protocol_id() in BATCH_PROTOCOLS
+
+    def _format_value(self, value):
+        val = value.magnitude if hasattr(value, "magnitude") else value
+        if isinstance(val, float):
+            return round(val, 2)
+        return val
+
+    def _normalize_header(self, header_hex):
+        return normalize_header(header_hex)
+
     def _set_header(self, header_hex):
-        if not header_hex: return
+        """Points the adapter at header_hex. Returns True only if an AT SH was actually sent."""
+        header = self._normalize_header(header_hex)
+        if not header: return False
+
+        current = self.active_header or self.default_header
+        if header == current:
+            self.stats["header_switches_skipped"] += 1
+            return False
+
         try:
-            cmd = OBDCommand("SET_HEADER", "AT SH " + header_hex, b"", lambda m: m)
+            cmd = OBDCommand("SET_HEADER", "Set request header", b"AT SH " + header.encode(), 0, lambda m: m)
+            start = time.perf_counter()
             self.connection.query(cmd, force=True)
+            self.metrics.record_header_switch(time.perf_counter() - start)
+            self.active_header = header
+            self.stats["header_switches"] += 1
+            return True
         except Exception:
-            pass
+            self.active_header = HEADER_UNKNOWN
+            return False
+
+    def _ensure_default_header(self):
+        """Standard PIDs need the protocol's own header back if a pack PID or a DTC scan moved it."""
+        if self.active_header is not None and self.active_header != self.default_header:
+            self._set_header(self.default_header)
+
+    def _header_for(self, command_key):
+        """Header a sensor must be queried with; None if it doesn't care."""
+        if hasattr(obd.commands, command_key):
+            return self.default_header
+        pid = self.pro_pids.get(command_key)
+        if pid is not None:
+            return pid.header
+        return None
+
+    def group_by_header(self, command_keys):
+        """
+        Splits sensors into [(header, keys), ...] starting with the group the
+        adapter is already addressing, so a cycle costs at most one AT SH per header.
+        """
+        current = self.active_header or self.default_header
+        groups = {}
+        for key in command_keys:
+            header = self._header_for(key) or current
+            groups.setdefault(header, []).append(key)
+
+        ordered = []
+        if current in groups:
+            ordered.append((current, groups.pop(current)))
+        for header in sorted(groups):
+            ordered.append((header, groups[header]))
+        return ordered
 
     def query_sensor(self, command_key):
         if not self.is_connected(): return None
         if self.simulation: return self._simulate_data(command_key)
 
+        self.last_rtt = None
+        self.last_error = None
+        value = self._query_single(command_key)
+        if self.last_rtt is not None:
+            self.metrics.record(command_key, self.last_rtt, value is not None, self.last_error)
+        return value
+
+    def _query_single(self, command_key):
         if hasattr(obd.commands, command_key):
             cmd = getattr(obd.commands, command_key)
 
             if cmd not in self.supported_commands:
                 return None
 
-            time.sleep(self.inter_command_delay)
             try:
-                response = self.connection.query(cmd)
+                self._ensure_default_header()
+                response = self._paced_query(cmd)
                 if response.is_null(): return None
 
-                val = response.value.magnitude
-                if isinstance(val, float):
-                    return round(val, 2)
-                return val
-            except:
+                return self._format_value(response.value)
+            except Exception as e:
+                self.last_error = type(e).__name__
                 return None
 
-        elif command_key in self.pro_defs:
+        elif command_key in self.pro_formulas:
             return self._query_custom_pid(command_key)
 
         return None
 
-    def _query_custom_pid(self, key):
-        definition = self.pro_defs[key]
-        if len(definition) < 8: return None
+    def query_sensors(self, command_keys):
+        """
+        Reads several sensors at once and returns {key: value} for the ones that
+        answered. Sensors are grouped by request header, and on CAN vehicles the
+        supported Mode 01 PIDs are packed up to MAX_PIDS_PER_REQUEST per request.
+        Everything else is queried one by one.
+        """
+        results = {}
+        if not self.is_connected(): return results
+
+        if self.simulation:
+            for key in command_keys:
+                results[key] = self._simulate_data(key)
+            return results
+
+        for header, keys in self.group_by_header(command_keys):
+            if header == self.default_header and self.supports_batching():
+                keys = self._query_batchable(keys, results)
 
-        pid_hex = definition[5]
-        header_hex = definition[6]
-        formula = definition[7]
+            for key in keys:
+                val = self.query_sensor(key)
+                if val is not None:
+                    results[key] = val
+
+        return results
+
+    def _query_batchable(self, command_keys, results):
+        """Sends the batchable keys as multi-PID requests. Returns the keys left for single queries."""
+        singles = []
+        batchable = []
+        for key in command_keys:
+            cmd = getattr(obd.commands, key, None)
+            if cmd is not None and cmd.mode == 1 and cmd.bytes > 2 and cmd in self.supported_commands:
+                batchable.append((key, cmd))
+            else:
+                singles.append(key)
+
+        for i in range(0, len(batchable), MAX_PIDS_PER_REQUEST):
+            chunk = batchable[i:i + MAX_PIDS_PER_REQUEST]
+            if len(chunk) == 1:
+                singles.append(chunk[0][0])
+                continue
+
+            decoded = self._query_pid_batch(chunk)
+            if decoded is None:
+                singles.extend(key for key, cmd in chunk)
+                continue
+
+            for key, cmd in chunk:
+                if key in decoded:
+                    results[key] = decoded[key]
+                    self.metrics.record(key, self.last_rtt, True)
+                else:
+                    # Left out of the combined reply; ask for it on its own.
+                    singles.append(key)
 
-        time.sleep(self.inter_command_delay)
+        return singles
+
+    def _query_pid_batch(self, chunk):
+        """Sends one multi-PID Mode 01 request. Returns None if the ECU rejected it."""
+        by_pid = {cmd.pid: (key, cmd) for key, cmd in chunk}
+        request = b"01" + b"".join(b"%02X" % pid for pid in by_pid)
 
         try:
-            if header_hex:
-                self._set_header(header_hex)
+            self._ensure_default_header()
+            batch_cmd = OBDCommand("MULTI_PID", "Batched Mode 01 request", request, 0, lambda messages: messages)
+            # The ECU may not take multi-PID requests at all, so NO DATA here says nothing about pacing.
+            response = self._paced_query(batch_cmd, force=True, expected=False)
+        except Exception:
+            response = None
+
+        results = {}
+        if response is not None:
+            # Prefer the engine ECU when several modules answer the same PID.
+            messages = sorted(response.messages, key=lambda m: m.ecu != ECU.ENGINE)
+            for message in messages:
+                for key, value in self._split_batch_response(message.data, by_pid):
+                    if key not in results:
+                        results[key] = value
+
+        # python-obd wraps NO DATA and negative replies in a message too, so
+        # only a reply that actually decoded counts as the ECU taking the batch.
+        if not results:
+            self.batch_failures += 1
+            if self.batch_failures == MAX_BATCH_FAILURES:
+                self.log("Multi-PID requests keep failing, falling back to single queries.")
+            return None
 
-            mode = pid_hex[:2]
-            pid = pid_hex[2:]
+        self.batch_failures = 0
+        return results
+
+    def _split_batch_response(self, data, by_pid):
+        """Walks a '41 <pid> <data...> <pid> <data...>' payload and decodes each PID."""
+        if len(data) < 2 or data[0] != 0x41:
+            return
+
+        i = 1
+        while i < len(data):
+            entry = by_pid.get(data[i])
+            if entry is None:
+                # Unknown PID: we can't know its length, so the rest is unreadable.
+                return
+
+            key, cmd = entry
+            size = cmd.bytes - 2
+            payload = data[i + 1:i + 1 + size]
+            if len(payload) < size:
+                return
+
+            single = Message([])
+            single.data = bytearray([0x41, data[i]]) + payload
+            try:
+                value = cmd.decode([single])
+                if value is not None:
+                    yield key, self._format_value(value)
+            except Exception:
+                pass
+            i += 1 + size
+
+    def _paced_query(self, cmd, force=False, expected=True):
+        """Sends one request at the cadence the pacing controller allows and reports back how it went."""
+        self.pacing.wait()
+        conn = self.connection
+        sent_before = getattr(conn, "bytes_sent", None)
+        received_before = getattr(conn, "bytes_received", None)
+
+        start = time.perf_counter()
+        try:
+            response = conn.query(cmd, force=force)
+        except Exception as e:
+            self.last_rtt = time.perf_counter() - start
+            self.last_error = type(e).__name__
+            self.pacing.record(self.last_rtt, "ERROR", expected)
+            raise
+        self.last_rtt = time.perf_counter() - start
+        self.last_error = self._response_error(response)
+
+        if isinstance(sent_before, int) and isinstance(received_before, int):
+            # The native driver counts what actually went over the wire.
+            self.metrics.record_bytes(conn.bytes_sent - sent_before, conn.bytes_received - received_before)
+        else:
+            # python-obd doesn't, so estimate: request + CR, reply lines + CRs + prompt.
+            raw_lines = [m.raw() for m in response.messages]
+            received = sum(len(raw) + 1 for raw in raw_lines if isinstance(raw, str)) + 1
+            self.metrics.record_bytes(len(cmd.command) + 1, received)
+
+        if self.pacing.record(self.last_rtt, self.last_error, expected):
+            self._apply_adapter_timeout()
+        return response
+
+    def _response_error(self, response):
+        """The adapter's error reply behind a response (e.g. "NO DATA"), or None if it answered."""
+        error = getattr(self.connection, "last_error", None)
+        if isinstance(error, str):
+            # The native driver keeps the adapter's reply for us.
+            return error
+
+        for message in response.messages:
+            raw = message.raw()
+            if isinstance(raw, str):
+                for marker in PACING_ERRORS + (NO_DATA,):
+                    if marker in raw:
+                        return marker
+        if response.is_null() is True:
+            return NO_DATA
+        return None
 
-            cmd = OBDCommand("CUSTOM_PID", mode + pid, b"", lambda m: m)
-            raw_response = self.connection.query(cmd, force=True)
+    def _apply_adapter_timeout(self):
+        try:
+            cmd = OBDCommand("SET_TIMEOUT", "Set adapter timeout", self.pacing.at_st_command(), 0, lambda m: m)
+            self.connection.query(cmd, force=True)
+            self.log(f"Pacing: adapter timeout {self.pacing.timeout_ms} ms, gap {self.pacing.gap * 1000:.1f} ms")
+        except Exception:
+            pass
+
+    def _query_custom_pid(self, key):
+        pid = self.pro_pids.get(key)
+        if pid is None: return None
+
+        try:
+            if pid.header:
+                self._set_header(pid.header)
 
-            if raw_response.is_null(): return None
-            if not raw_response.messages: return None
-            data_bytes = raw_response.messages[0].data
+            raw_response = self._paced_query(pid.command, force=True, expected=self.pro_support.get(key) is True)
 
-            return self._calculate_formula(formula, data_bytes)
+            # python-obd turns NO DATA into a message too, just an empty one.
+            data = raw_response.messages[0].data if raw_response.messages else b""
+            answered = self.last_error is None and len(data) > 0 and data[0] != 0x7F
+            self._note_pro_support(key, answered)
+            if not answered: return None
+
+            return pid.formula(raw_response.messages[0].data)
 
         except Exception as e:
+            self.last_error = type(e).__name__
             return None
 
     def _calculate_formula(self, formula, data_bytes):
-        variables = {}
-        for i, byte_val in enumerate(data_bytes):
-            char_code = 65 + i
-            if char_code > 90: break
-            variables[chr(char_code)] = byte_val
-
         try:
-            allowed_names = {"min": min, "max": max, "abs": abs, "signed": self._signed}
-            allowed_names.update(variables)
-            result = eval(formula, {"__builtins__": {}}, allowed_names)
-            return float(result)
-        except:
+            return compile_formula(formula)(data_bytes)
+        except FormulaError:
             return None
 
-    def _signed(self, val):
-        if val > 127: return val - 256
-        return val
-
     def _decode_uds_dtc(self, byte1, byte2, byte3):
         """Converts 3-byte UDS hex to standard P/U/B/C code"""
 
@@ -206,8 +720,8 @@ class OBDHandler:
         codes = []
         try:
             self.log(f"Attempting UDS (Service 19) Scan on {target_header}...")
-            self._set_header(target_header)
-            time.sleep(0.1)
+            if self._set_header(self._module_header(target_header)):
+                time.sleep(0.1)
 
             cmd = OBDCommand("UDS_SCAN", "19 02 FF", b"", lambda m: m)
             response = self.connection.query(cmd, force=True)
@@ -258,7 +772,7 @@ class OBDHandler:
         try:
 
             self.log("Scanning Engine (Standard)...")
-            self._set_header("7E0")
+            self._set_header(self._module_header("7E0"))
 
             res_conf = self.connection.query(obd.commands.GET_DTC, force=True)
             if not res_conf.is_null() and res_conf.value:
@@ -276,7 +790,7 @@ class OBDHandler:
                     dtc_groups["UDS / EXTENDED (Experimental)"].append(c)
 
             self.log("Scanning Trans (Standard)...")
-            self._set_header("7E1")
+            self._set_header(self._module_header("7E1"))
             res_tcu = self.connection.query(obd.commands.GET_DTC, force=True)
             if not res_tcu.is_null() and res_tcu.value:
                 for c in res_tcu.value: dtc_groups["TRANSMISSION"].append(c)
@@ -284,7 +798,7 @@ class OBDHandler:
         except Exception as e:
             self.log(f"Scan Critical Error: {e}")
         finally:
-            self._set_header("7E0")
+            self._ensure_default_header()
 
         self.log("Scan Complete.")
         return dtc_groups
@@ -312,12 +826,14 @@ class OBDHandler:
         if self.connection and self.connection.is_connected():
             try:
 
-                self._set_header("7E0")
-                self.connection.query(obd.commands.CLEAR_DTC)
+                # Start with whichever module the adapter is already addressing.
+                targets = [self._module_header("7E0"), self._module_header("7E1")]
+                if self.active_header == targets[1]:
+                    targets.reverse()
 
-                self._set_header("7E1")
-                self.connection.query(obd.commands.CLEAR_DTC)
-                self._set_header("7E0")
+                for header in targets:
+                    self._set_header(header)
+                    self.connection.query(obd.commands.CLEAR_DTC)
                 self.log("Command Sent: CLEAR_DTC")
                 return True
             except Exception as e:
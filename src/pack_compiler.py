@@ -0,0 +1,98 @@
+from obd import OBDCommand
+
+from formula_engine import FormulaError, check_formula, compile_formulas, eval_formulas
+
+# Bumped whenever the bundle layout changes, so stale cached bundles are rebuilt.
+BUNDLE_VERSION = 2
+
+# Where things sit in a pack definition list.
+PID_FIELD = 5
+HEADER_FIELD = 6
+FORMULA_FIELD = 7
+
+
+def normalize_header(header_hex):
+    if not header_hex: return None
+    return header_hex.replace(" ", "").upper()
+
+
+class CompiledPID:
+    """A pack sensor ready to poll: request command, header and decoder are built once, at load."""
+
+    __slots__ = ("key", "command", "header", "formula")
+
+    def __init__(self, key, command, header, formula):
+        self.key = key
+        self.command = command
+        self.header = header
+        self.formula = formula
+
+    @property
+    def response_length(self):
+        """Response bytes the decoder needs; shorter answers decode to None."""
+        return self.formula.arity
+
+
+def compile_pack(definitions):
+    """
+    Turns one pack's {key: definition} into a bundle: a dict of plain values
+    that marshal can store, holding the request bytes, header and formula
+    source of every usable sensor. The pack loader caches bundles, so a
+    pack's JSON is only decrypted and parsed when it changes.
+
+    Bundles hold formula sources, never code: the cache isn't authenticated
+    for plain .json packs, so load_bundle() validates every formula again
+    before compiling it.
+    """
+    keys, formulas, requests, errors = [], [], [], {}
+    for key, definition in definitions.items():
+        if len(definition) <= FORMULA_FIELD:
+            continue
+        try:
+            check_formula(definition[FORMULA_FIELD])
+            request = definition[PID_FIELD].encode()
+            header = normalize_header(definition[HEADER_FIELD])
+        except FormulaError as e:
+            errors[key] = str(e)
+            continue
+        except (AttributeError, TypeError):
+            errors[key] = "PID and header must be hex strings"
+            continue
+        keys.append(key)
+        formulas.append(definition[FORMULA_FIELD])
+        requests.append((request, header))
+
+    return {
+        "version": BUNDLE_VERSION,
+        "definitions": definitions,
+        "keys": keys,
+        "formulas": formulas,
+        "requests": requests,
+        "errors": errors,
+    }
+
+
+def load_bundle(bundle):
+    """
+    ({key: CompiledPID}, {key: error}) for a bundle from compile_pack().
+    Each distinct formula is checked and compiled once, all of them in a
+    single compile() call; packs tend to reuse a handful of formulas.
+    """
+    errors = dict(bundle["errors"])
+    checked = []
+    rejected = {}
+    for source in dict.fromkeys(bundle["formulas"]):
+        try:
+            checked.append((source, check_formula(source)))
+        except FormulaError as e:
+            rejected[source] = str(e)
+    decoders = dict(zip((source for source, _ in checked), eval_formulas(compile_formulas(checked), checked)))
+
+    compiled = {}
+    for key, (request, header), source in zip(bundle["keys"], bundle["requests"], bundle["formulas"]):
+        if source in rejected:
+            errors[key] = rejected[source]
+            continue
+        command = OBDCommand("CUSTOM_PID", "Custom PID " + key, request, 0, lambda m: m)
+        compiled[key] = CompiledPID(key, command, header, decoders[source])
+    return compiled, errors
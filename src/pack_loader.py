@@ -0,0 +1,223 @@
+import hashlib
+import json
+import marshal
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from constants import PRO_PACK_DIR, PACK_CACHE_DIR
+from pack_compiler import BUNDLE_VERSION, compile_pack
+
+PACK_EXTENSIONS = (".json", ".obd")
+INDEX_FILE = "index.json"
+# marshal's format follows the interpreter, so a different Python discards the cache.
+CACHE_FORMAT = f"{BUNDLE_VERSION}-{marshal.version}-{sys.version_info[0]}.{sys.version_info[1]}"
+
+
+def pack_key(rel):
+    """How a pack path from the config or a scan is compared."""
+    return os.path.normpath(rel)
+
+
+class PackLoader:
+    """
+    Loads pro packs (plain .json, Fernet-encrypted .obd) through a cache.
+
+    An index keyed by relative path remembers each pack's mtime, size and
+    SHA-256, and each pack's bundle (see pack_compiler.compile_pack) is kept
+    in cache_dir as a marshal blob named by that hash. A pack is only
+    decrypted and parsed when its contents actually changed; touched but
+    identical files are recognised by their hash. Packs that do need parsing
+    are handled in parallel on a thread pool, and everything loaded stays in
+    memory, so enabling or disabling one pack only costs a stat() per
+    enabled pack.
+
+    Blobs of encrypted packs are stored encrypted with the same key, so the
+    cache doesn't leave a plaintext copy of a pack on disk. With a key rather
+    than a cipher, cryptography is only imported once an encrypted pack is
+    actually read.
+    """
+
+    def __init__(self, pack_dir=PRO_PACK_DIR, cache_dir=PACK_CACHE_DIR, cipher=None, max_workers=None, key=None):
+        self.pack_dir = pack_dir
+        self.cache_dir = cache_dir
+        self.cipher = cipher
+        self.key = key
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self.lock = threading.Lock()
+        self._index = None
+        self._memo = {}          # pack key -> (mtime_ns, size, bundle)
+        self.parsed_count = 0    # packs decrypted and parsed from source
+        self.cached_count = 0    # packs read back from a cache blob
+
+    def available(self):
+        """Relative paths of every pack file under pack_dir, sorted."""
+        found = []
+        pending = [self.pack_dir]
+        while pending:
+            folder = pending.pop()
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            pending.append(entry.path)
+                        elif entry.name.endswith(PACK_EXTENSIONS):
+                            found.append(os.path.relpath(entry.path, self.pack_dir))
+            except FileNotFoundError:
+                continue
+        return sorted(found)
+
+    def load(self, enabled):
+        """
+        [(rel, bundle)] for the enabled packs that exist, in sorted path
+        order, so a key defined by two packs always resolves the same way.
+        Packs that fail to load are reported and left out.
+        """
+        index = self._load_index()
+        wanted = sorted({pack_key(rel) for rel in enabled if rel.endswith(PACK_EXTENSIONS)})
+
+        results = {}
+        jobs = []
+        for rel in wanted:
+            try:
+                st = os.stat(os.path.join(self.pack_dir, rel))
+            except OSError:
+                print(f"Pack not found: {rel}")
+                continue
+            memo = self._memo.get(rel)
+            if memo is not None and memo[:2] == (st.st_mtime_ns, st.st_size):
+                results[rel] = memo[2]
+                continue
+            entry = index["packs"].get(rel)
+            fresh = entry is not None and (entry["mtime_ns"], entry["size"]) == (st.st_mtime_ns, st.st_size)
+            jobs.append((rel, st, entry["sha256"] if fresh else None))
+
+        index_changed = False
+        if jobs:
+            workers = min(self.max_workers, len(jobs))
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    done = list(pool.map(lambda job: self._load_one(*job), jobs))
+            else:
+                done = [self._load_one(*job) for job in jobs]
+
+            for (rel, st, _), (sha, bundle) in zip(jobs, done):
+                if bundle is None:
+                    continue
+                results[rel] = bundle
+                self._memo[rel] = (st.st_mtime_ns, st.st_size, bundle)
+                entry = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": sha}
+                if index["packs"].get(rel) != entry:
+                    index["packs"][rel] = entry
+                    index_changed = True
+        if index_changed:
+            self._save_index()
+
+        return [(rel, results[rel]) for rel in wanted if rel in results]
+
+    def _load_one(self, rel, st, known_sha):
+        """(sha256, bundle) for one pack, or (None, None) if it can't be loaded."""
+        full = os.path.join(self.pack_dir, rel)
+        encrypted = rel.endswith(".obd")
+        try:
+            if known_sha is not None:
+                bundle = self._read_blob(known_sha, encrypted)
+                if bundle is not None:
+                    return known_sha, bundle
+
+            with open(full, 'rb') as f:
+                raw = f.read()
+            sha = hashlib.sha256(raw).hexdigest()
+            bundle = self._read_blob(sha, encrypted)
+            if bundle is not None:
+                return sha, bundle
+
+            if encrypted:
+                raw = self._cipher().decrypt(raw)
+            bundle = compile_pack(json.loads(raw.decode('utf-8')))
+            with self.lock:
+                self.parsed_count += 1
+            self._write_blob(sha, bundle, encrypted)
+            print(f"Loaded Pack: {rel}")
+            return sha, bundle
+        except Exception as e:
+            print(f"Error loading {rel}: {e}")
+            return None, None
+
+    def _cipher(self):
+        if self.cipher is None:
+            if self.key is None:
+                raise ValueError("no key for encrypted packs")
+            from cryptography.fernet import Fernet
+            self.cipher = Fernet(self.key)
+        return self.cipher
+
+    def _blob_path(self, sha):
+        return os.path.join(self.cache_dir, sha + ".bin")
+
+    def _read_blob(self, sha, encrypted):
+        try:
+            with open(self._blob_path(sha), 'rb') as f:
+                data = f.read()
+            if encrypted:
+                data = self._cipher().decrypt(data)
+            cache_format, bundle = marshal.loads(data)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Discarding pack cache {sha[:12]}: {e}")
+            return None
+        if cache_format != CACHE_FORMAT:
+            return None
+        with self.lock:
+            self.cached_count += 1
+        return bundle
+
+    def _write_blob(self, sha, bundle, encrypted):
+        try:
+            data = marshal.dumps((CACHE_FORMAT, bundle))
+            if encrypted:
+                data = self._cipher().encrypt(data)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._blob_path(sha)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error caching pack: {e}")
+
+    def _load_index(self):
+        if self._index is not None:
+            return self._index
+        self._index = {"format": CACHE_FORMAT, "packs": {}}
+        try:
+            with open(os.path.join(self.cache_dir, INDEX_FILE), 'r') as f:
+                loaded = json.load(f)
+            if loaded.get("format") == CACHE_FORMAT:
+                self._index["packs"].update(loaded.get("packs", {}))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error loading pack index: {e}")
+        return self._index
+
+    def _save_index(self):
+        packs = self._index["packs"]
+        for rel in [rel for rel in packs if not os.path.exists(os.path.join(self.pack_dir, rel))]:
+            del packs[rel]
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Blobs no pack refers to any more, e.g. earlier versions of an updated pack.
+            referenced = {entry["sha256"] + ".bin" for entry in packs.values()}
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".bin") and name not in referenced:
+                    os.remove(os.path.join(self.cache_dir, name))
+            path = os.path.join(self.cache_dir, INDEX_FILE)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._index, f, indent=2)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error saving pack index: {e}")
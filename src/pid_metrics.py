@@ -0,0 +1,137 @@
+import bisect
+import threading
+import time
+from collections import deque
+
+# Geometric latency buckets from 0.1 ms up to ~11 s; each bucket is 20% wider than the previous one.
+LATENCY_BOUNDS_MS = tuple(0.1 * 1.2 ** i for i in range(64))
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram; percentiles are accurate to one bucket (about 20%)."""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BOUNDS_MS) + 1)
+        self.total = 0
+
+    def add(self, latency_ms):
+        self.counts[bisect.bisect_left(LATENCY_BOUNDS_MS, latency_ms)] += 1
+        self.total += 1
+
+    def percentile(self, p):
+        if not self.total:
+            return None
+        target = self.total * p / 100.0
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return round(LATENCY_BOUNDS_MS[min(i, len(LATENCY_BOUNDS_MS) - 1)], 2)
+        return round(LATENCY_BOUNDS_MS[-1], 2)
+
+
+class _KeyStats:
+    def __init__(self):
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.errors = {}
+        self.last_error = None
+        self.latency = LatencyHistogram()
+
+
+class PIDMetrics:
+    """
+    Per-sensor request counters and latency histograms, plus connection-wide
+    totals: bytes on the wire, header switches and samples per second.
+    Written by the acquisition thread, read by the UI, hence the lock.
+    """
+
+    def __init__(self, window=5.0):
+        self.window = window
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.keys = {}
+            self.bytes_sent = 0
+            self.bytes_received = 0
+            self.header_switches = 0
+            self.header_switch_time = 0.0
+            self.samples = deque()
+            self.started = time.monotonic()
+
+    def record(self, key, latency, ok, error=None, now=None):
+        """One request for one sensor; latency in seconds."""
+        if now is None: now = time.monotonic()
+        with self.lock:
+            stats = self.keys.get(key)
+            if stats is None:
+                stats = self.keys[key] = _KeyStats()
+            stats.requests += 1
+            stats.latency.add(latency * 1000)
+            if ok:
+                stats.successes += 1
+                self.samples.append(now)
+            else:
+                stats.failures += 1
+                error = error or "NO VALUE"
+                stats.errors[error] = stats.errors.get(error, 0) + 1
+                stats.last_error = error
+            self._trim(now)
+
+    def record_bytes(self, sent, received):
+        with self.lock:
+            self.bytes_sent += sent
+            self.bytes_received += received
+
+    def record_header_switch(self, duration):
+        with self.lock:
+            self.header_switches += 1
+            self.header_switch_time += duration
+
+    def _trim(self, now):
+        cutoff = now - self.window
+        while self.samples and self.samples[0] < cutoff:
+            self.samples.popleft()
+
+    def samples_per_second(self, now=None):
+        if now is None: now = time.monotonic()
+        with self.lock:
+            self._trim(now)
+            span = min(self.window, now - self.started)
+            return len(self.samples) / span if span > 0 else 0.0
+
+    def get(self, key):
+        """{requests, successes, failures, p50, p95, p99, errors, last_error} for one sensor, or None."""
+        with self.lock:
+            stats = self.keys.get(key)
+            if stats is None:
+                return None
+            return {
+                "requests": stats.requests,
+                "successes": stats.successes,
+                "failures": stats.failures,
+                "p50": stats.latency.percentile(50),
+                "p95": stats.latency.percentile(95),
+                "p99": stats.latency.percentile(99),
+                "errors": dict(stats.errors),
+                "last_error": stats.last_error,
+            }
+
+    def report(self):
+        """Everything at once: {"sensors": {key: get(key)}, "totals": {...}}."""
+        with self.lock:
+            keys = list(self.keys)
+        sensors = {key: self.get(key) for key in keys}
+        rate = self.samples_per_second()
+        with self.lock:
+            totals = {
+                "bytes_sent": self.bytes_sent,
+                "bytes_received": self.bytes_received,
+                "header_switches": self.header_switches,
+                "header_switch_time": round(self.header_switch_time, 4),
+                "samples_per_sec": round(rate, 1),
+            }
+        return {"sensors": sensors, "totals": totals}
@@ -0,0 +1,97 @@
+import time
+from collections import deque
+
+from constants import HIGH_PRIORITY_SENSORS, SENSOR_POLL_RATES, HIGH_PRIORITY_RATE_HZ, DEFAULT_POLL_RATE_HZ
+
+
+class _SensorSlot:
+    def __init__(self, rate_hz, now):
+        self.rate_hz = rate_hz
+        self.period = 1.0 / rate_hz
+        self.next_due = now
+        self.samples = deque(maxlen=64)
+
+
+class PIDScheduler:
+    """
+    Earliest-deadline-first scheduler for sensor polling.
+
+    Every sensor has a target rate; after it is sampled its next deadline is
+    pushed out by one period. When the bus can't keep up, the sensors with
+    short periods keep winning the race to the front of the queue while slow
+    ones still get their turn once they are overdue, so the adapter's bandwidth
+    is shared roughly in proportion to the target rates.
+    """
+
+    def __init__(self, rates=None, default_rate=DEFAULT_POLL_RATE_HZ, window=5.0):
+        self.default_rate = default_rate
+        self.window = window
+        self.rates = {k: HIGH_PRIORITY_RATE_HZ for k in HIGH_PRIORITY_SENSORS}
+        self.rates.update(SENSOR_POLL_RATES)
+        if rates:
+            self.rates.update(rates)
+        self.slots = {}
+
+    def target_rate(self, key):
+        return self.rates.get(key, self.default_rate)
+
+    def set_rate(self, key, rate_hz):
+        if rate_hz <= 0:
+            raise ValueError(f"Poll rate for {key} must be positive, got {rate_hz}")
+        self.rates[key] = rate_hz
+        slot = self.slots.get(key)
+        if slot:
+            slot.rate_hz = rate_hz
+            slot.period = 1.0 / rate_hz
+            slot.next_due = min(slot.next_due, time.monotonic() + slot.period)
+
+    def set_sensors(self, keys, now=None):
+        if now is None: now = time.monotonic()
+        keys = set(keys)
+        for key in list(self.slots):
+            if key not in keys:
+                del self.slots[key]
+        for key in keys:
+            if key not in self.slots:
+                self.slots[key] = _SensorSlot(self.target_rate(key), now)
+
+    def due(self, now=None, limit=None):
+        """Returns the sensors whose deadline has passed, most overdue first."""
+        if now is None: now = time.monotonic()
+        ready = [(slot.next_due, key) for key, slot in self.slots.items() if slot.next_due <= now]
+        ready.sort()
+        if limit is not None:
+            ready = ready[:limit]
+        return [key for _, key in ready]
+
+    def next_deadline(self):
+        if not self.slots:
+            return None
+        return min(slot.next_due for slot in self.slots.values())
+
+    def record(self, key, now=None):
+        """Marks a sensor as polled (successfully or not) and schedules its next turn."""
+        slot = self.slots.get(key)
+        if slot is None:
+            return
+        if now is None: now = time.monotonic()
+        slot.next_due = now + slot.period
+        slot.samples.append(now)
+
+    def achieved_rate(self, key, now=None):
+        slot = self.slots.get(key)
+        if slot is None:
+            return 0.0
+        if now is None: now = time.monotonic()
+        recent = [t for t in slot.samples if now - t <= self.window]
+        if len(recent) < 2:
+            return 0.0
+        span = recent[-1] - recent[0]
+        if span <= 0:
+            return 0.0
+        return (len(recent) - 1) / span
+
+    def get_rate_report(self, now=None):
+        """{key: (target_hz, achieved_hz)} for every scheduled sensor."""
+        if now is None: now = time.monotonic()
+        return {key: (slot.rate_hz, self.achieved_rate(key, now)) for key, slot in self.slots.items()}
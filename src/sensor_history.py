@@ -0,0 +1,136 @@
+from collections import deque
+
+import numpy as np
+
+# Default depth: 10 minutes of samples at 20 Hz per sensor.
+HISTORY_SECONDS = 600
+HISTORY_RATE_HZ = 20
+
+
+class RingBuffer:
+    """
+    Fixed-capacity history of (timestamp, value) samples for one sensor.
+
+    Every sample is stored twice, at i and i + capacity, so the last `count`
+    samples are always one contiguous slice: values() and timestamps() return
+    ordered views without copying. append() is O(1); min()/max() over the
+    buffered samples are kept with monotonic queues, amortised O(1).
+    """
+
+    def __init__(self, capacity, dtype=np.float64):
+        self.capacity = int(capacity)
+        if self.capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self._values = np.full(2 * self.capacity, np.nan, dtype=dtype)
+        self._times = np.zeros(2 * self.capacity, dtype=np.float64)
+        self.head = 0           # slot the next sample goes into
+        self.count = 0
+        self.total = 0          # samples ever appended, used to expire min/max candidates
+        self._min = deque()
+        self._max = deque()
+
+    def __len__(self):
+        return self.count
+
+    def append(self, value, timestamp):
+        i = self.head
+        self._values[i] = self._values[i + self.capacity] = value
+        self._times[i] = self._times[i + self.capacity] = timestamp
+        self.head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+        n = self.total
+        self.total += 1
+        oldest = self.total - self.count
+        for candidates in (self._min, self._max):
+            while candidates and candidates[0][0] < oldest:
+                candidates.popleft()
+        if value == value:      # NaN (a missed reading) is kept but never becomes the min or max
+            while self._min and self._min[-1][1] >= value:
+                self._min.pop()
+            self._min.append((n, value))
+            while self._max and self._max[-1][1] <= value:
+                self._max.pop()
+            self._max.append((n, value))
+
+    def _window(self, array):
+        start = self.head if self.count == self.capacity else 0
+        return array[start:start + self.count]
+
+    def values(self):
+        """Oldest to newest; a read-only view, valid until the next append()."""
+        view = self._window(self._values)
+        view.flags.writeable = False
+        return view
+
+    def timestamps(self):
+        view = self._window(self._times)
+        view.flags.writeable = False
+        return view
+
+    def last(self, default=None):
+        if not self.count:
+            return default
+        return self._values[(self.head - 1) % self.capacity]
+
+    def min(self, default=None):
+        return self._min[0][1] if self._min else default
+
+    def max(self, default=None):
+        return self._max[0][1] if self._max else default
+
+    def clear(self):
+        self.head = self.count = self.total = 0
+        self._min.clear()
+        self._max.clear()
+
+
+class SensorHistory:
+    """
+    One RingBuffer per sensor, created on the first append(). Reading a sensor
+    that has no samples returns None (or empty arrays) instead of creating one.
+    """
+
+    def __init__(self, depth=HISTORY_SECONDS * HISTORY_RATE_HZ):
+        self.depth = int(depth)
+        self.buffers = {}
+
+    @classmethod
+    def from_config(cls, config):
+        """Depth from the "history_seconds" and "history_rate_hz" config keys."""
+        seconds = config.get("history_seconds", HISTORY_SECONDS)
+        rate = config.get("history_rate_hz", HISTORY_RATE_HZ)
+        return cls(max(1, int(seconds * rate)))
+
+    def append(self, key, value, timestamp):
+        buffer = self.buffers.get(key)
+        if buffer is None:
+            buffer = self.buffers[key] = RingBuffer(self.depth)
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            value = np.nan
+        buffer.append(value, timestamp)
+
+    def get(self, key):
+        return self.buffers.get(key)
+
+    def __contains__(self, key):
+        return key in self.buffers
+
+    def values(self, key):
+        buffer = self.buffers.get(key)
+        return buffer.values() if buffer is not None else np.zeros(0)
+
+    def timestamps(self, key):
+        buffer = self.buffers.get(key)
+        return buffer.timestamps() if buffer is not None else np.zeros(0)
+
+    def set_depth(self, depth):
+        """Changes the depth for every sensor; existing samples are dropped."""
+        self.depth = int(depth)
+        self.buffers.clear()
+
+    def clear(self):
+        self.buffers.clear()
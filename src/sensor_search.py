@@ -0,0 +1,59 @@
+import bisect
+import re
+
+
+class SensorIndex:
+    """
+    Search index over a sensor catalogue: [(key, name, source), ...].
+
+    Prefix search bisects a sorted list of words (the key and every word of
+    the name). Substring search scans one lower-cased string holding every
+    entry, which runs in C however large the catalogue. Both return
+    positions in catalogue order, optionally limited to one source (pack).
+    """
+
+    def __init__(self, entries):
+        self.entries = list(entries)
+        self.by_source = {}
+        words = []
+        parts = []
+        self.starts = []
+        offset = 0
+        for i, (key, name, source) in enumerate(self.entries):
+            self.by_source.setdefault(source, []).append(i)
+            text = f"{key}\x1f{name}".lower()
+            for word in {key.lower(), *name.lower().split()}:
+                words.append((word, i))
+            self.starts.append(offset)
+            parts.append(text)
+            offset += len(text) + 1
+        words.sort()
+        self.words = [word for word, _ in words]
+        self.word_owner = [i for _, i in words]
+        # Entries separated by "\x1e", so a match can't span two of them.
+        self.haystack = "\x1e".join(parts)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def keys(self, positions):
+        return [self.entries[i][0] for i in positions]
+
+    def search(self, query="", source=None, prefix=False):
+        query = query.strip().lower()
+        if not query:
+            matches = None
+        elif prefix:
+            lo = bisect.bisect_left(self.words, query)
+            hi = bisect.bisect_left(self.words, query + "￿")
+            matches = set(self.word_owner[lo:hi])
+        else:
+            matches = {bisect.bisect_right(self.starts, m.start()) - 1
+                       for m in re.finditer(re.escape(query), self.haystack)}
+
+        candidates = self.by_source.get(source, []) if source is not None else range(len(self.entries))
+        if matches is None:
+            return list(candidates)
+        if source is None:
+            return sorted(matches)
+        return [i for i in candidates if i in matches]
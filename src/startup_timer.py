@@ -0,0 +1,29 @@
+import time
+
+
+class StartupTimer:
+    """
+    Time spent in each phase of startup, from the moment the timer is created
+    up to the first frame. mark(name) closes the phase that ran since the
+    previous mark.
+    """
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.last = self.start
+        self.phases = []
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def total(self):
+        return self.last - self.start
+
+    def report(self):
+        lines = [f"Startup took {self.total() * 1000:.0f} ms:"]
+        width = max((len(name) for name, _ in self.phases), default=0)
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<{width}}  {seconds * 1000:8.1f} ms")
+        return "\n".join(lines)
@@ -1,23 +1,80 @@
-import polib
+import marshal
+import os
+
+from constants import LOCALE_DIR, TRANSLATION_CACHE_DIR
+
+# Catalogs parsed from .po files are cached per language as marshal dumps of
+# (format, po mtime, po size, {msgid: msgstr}); a changed .po rebuilds its
+# cache, and polib is only imported when that happens.
+CACHE_FORMAT = f"catalog-{marshal.version}"
+
+translations = {}
+_catalogs = {}
+
 
 def get_available_languages():
-    import os
     langs = []
-    for fname in os.listdir("src/locale"):
+    for fname in sorted(os.listdir(LOCALE_DIR)):
         if fname.endswith(".po"):
             lang_code = fname[:-3]
             langs.append(lang_code)
     return langs
 
+
+def _cache_path(lang_code):
+    return os.path.join(TRANSLATION_CACHE_DIR, f"{lang_code}.cache")
+
+
+def _read_cache(lang_code, stamp):
+    try:
+        with open(_cache_path(lang_code), 'rb') as f:
+            cache_format, mtime_ns, size, catalog = marshal.load(f)
+    except Exception:
+        return None
+    if (cache_format, mtime_ns, size) != (CACHE_FORMAT, *stamp):
+        return None
+    return catalog
+
+
+def _write_cache(lang_code, stamp, catalog):
+    try:
+        os.makedirs(TRANSLATION_CACHE_DIR, exist_ok=True)
+        path = _cache_path(lang_code)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            marshal.dump((CACHE_FORMAT, *stamp, catalog), f)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Error caching language '{lang_code}': {e}")
+
+
+def load_catalog(lang_code):
+    """{msgid: msgstr} for a language, from memory, the cache, or (if the .po changed) polib."""
+    po_path = os.path.join(LOCALE_DIR, f"{lang_code}.po")
+    st = os.stat(po_path)
+    stamp = (st.st_mtime_ns, st.st_size)
+
+    cached = _catalogs.get(lang_code)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    catalog = _read_cache(lang_code, stamp)
+    if catalog is None:
+        import polib
+        catalog = {e.msgid: e.msgstr for e in polib.pofile(po_path)}
+        _write_cache(lang_code, stamp, catalog)
+    _catalogs[lang_code] = (stamp, catalog)
+    return catalog
+
+
 def set_language(lang_code):
     global translations
     try:
-        po = polib.pofile(f"src/locale/{lang_code}.po")
-        translations = {e.msgid: e.msgstr for e in po}
+        translations = load_catalog(lang_code)
     except Exception as e:
         print(f"Error loading language '{lang_code}': {e}, defaulting to English.")
-        po = polib.pofile(f"src/locale/en.po")
-        translations = {e.msgid: e.msgstr for e in po}
+        translations = load_catalog("en")
+
 
 def translate(s):
-    return translations.get(s, s)
\ No newline at end of file
+    return translations.get(s, s)
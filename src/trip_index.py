@@ -0,0 +1,255 @@
+"""
+Sidecar time index for CSV trip logs (<log>.csv.idx).
+
+    magic      8 bytes   b"OBDIDX1\\0"
+    start      float64   wall-clock time the log was started
+    bucket     float64   bucket width in seconds
+    entries    fixed width, one per bucket that has rows:
+                 float64  wall-clock time of the first row in the bucket
+                 uint64   byte offset of that row in the CSV
+                 uint64   row number (0 = first data row)
+
+Both files only ever grow, so the index can be read while the log is still
+being written; entries pointing past the end of the CSV are ignored. A
+compressed segment keeps its uncompressed .csv.idx, with offsets into the
+decompressed stream.
+"""
+import csv
+import os
+import re
+import struct
+import time
+
+import numpy as np
+
+from log_rotation import is_compressed, open_segment, strip_compression
+
+INDEX_MAGIC = b"OBDIDX1\0"
+INDEX_SUFFIX = ".idx"
+INDEX_BUCKET_SECONDS = 1.0
+
+_HEADER = struct.Struct("<8sdd")
+_ENTRY = struct.Struct("<dQQ")
+ENTRY_DTYPE = np.dtype([("wall_time", "<f8"), ("offset", "<u8"), ("row", "<u8")])
+
+_LOG_EPOCH = re.compile(r"trip_log_(\d+)")
+
+
+class TripIndexWriter:
+    """Appends an entry whenever a row starts a new time bucket."""
+
+    def __init__(self, path, start_wall_time, bucket_seconds=INDEX_BUCKET_SECONDS):
+        self.file = open(path, "wb")
+        self.start_wall_time = start_wall_time
+        self.bucket_seconds = bucket_seconds
+        self.last_bucket = None
+        self.file.write(_HEADER.pack(INDEX_MAGIC, start_wall_time, bucket_seconds))
+
+    def add(self, wall_time, offset, row):
+        # Work in whole milliseconds, the resolution of the CSV stamps, so a rebuilt index matches.
+        bucket = round((wall_time - self.start_wall_time) * 1000) // round(self.bucket_seconds * 1000)
+        if self.last_bucket is not None and bucket <= self.last_bucket:
+            return
+        self.last_bucket = bucket
+        self.file.write(_ENTRY.pack(wall_time, offset, row))
+
+    def flush(self, sync=False):
+        self.file.flush()
+        if sync:
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+
+class TripIndex:
+    """Memory-mapped index; opening it costs the same whatever the log size."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, self.start_wall_time, self.bucket_seconds = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{path} is not a trip log index")
+        count = (os.path.getsize(path) - _HEADER.size) // _ENTRY.size
+        if count:
+            self.entries = np.memmap(path, dtype=ENTRY_DTYPE, mode="r", offset=_HEADER.size, shape=(count,))
+        else:
+            self.entries = np.zeros(0, dtype=ENTRY_DTYPE)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def locate(self, wall_time):
+        """The entry to start reading from to reach wall_time, or None if the index is empty."""
+        if not len(self.entries):
+            return None
+        i = int(np.searchsorted(self.entries["wall_time"], wall_time, side="right")) - 1
+        return self.entries[max(i, 0)]
+
+
+def format_timestamp(wall_time):
+    """Local time of day rounded to the millisecond, e.g. 14:03:27.418."""
+    ms = round(wall_time * 1000)
+    return time.strftime("%H:%M:%S", time.localtime(ms // 1000)) + f".{ms % 1000:03d}"
+
+
+def time_of_day(stamp):
+    """Seconds since midnight for "HH:MM:SS" or "HH:MM:SS.mmm"; None if it isn't one."""
+    try:
+        h, m, s = stamp.split(":")
+        return int(h) * 3600 + int(m) * 60 + float(s)
+    except ValueError:
+        return None
+
+
+def _local_time_of_day(wall_time):
+    t = time.localtime(wall_time)
+    return t.tm_hour * 3600 + t.tm_min * 60 + t.tm_sec + (wall_time % 1)
+
+
+def _elapsed(from_tod, to_tod):
+    """Seconds between two times of day, across midnight; stamps are rounded to ms, so allow a little backwards."""
+    delta = (to_tod - from_tod) % 86400
+    return delta - 86400 if delta > 86400 - 1 else delta
+
+
+def index_path_for(csv_path):
+    return strip_compression(csv_path) + INDEX_SUFFIX
+
+
+def build_index(csv_path, index_path=None, bucket_seconds=INDEX_BUCKET_SECONDS):
+    """
+    Indexes a CSV log written without one (e.g. by older versions). The start
+    time comes from the trip_log_<epoch> file name, or the file's date.
+    """
+    if index_path is None:
+        index_path = index_path_for(csv_path)
+
+    match = _LOG_EPOCH.search(os.path.basename(csv_path))
+    start = float(match.group(1)) if match else None
+
+    with open_segment(csv_path) as f:
+        offset = len(f.readline())
+        row = 0
+        writer = None
+        wall = None
+        last_tod = None
+        for line in f:
+            tod = time_of_day(line.split(b",", 1)[0].decode("utf-8", "ignore"))
+            if tod is not None:
+                if wall is None:
+                    if start is None:
+                        mtime = time.localtime(os.path.getmtime(csv_path))
+                        midnight = time.mktime((mtime.tm_year, mtime.tm_mon, mtime.tm_mday, 0, 0, 0, 0, 0, -1))
+                        start = midnight + tod
+                    wall = start + _elapsed(_local_time_of_day(start), tod)
+                else:
+                    wall += _elapsed(last_tod, tod)
+                last_tod = tod
+                if writer is None:
+                    writer = TripIndexWriter(index_path, start, bucket_seconds)
+                writer.add(wall, offset, row)
+            offset += len(line)
+            row += 1
+
+    if writer is None:
+        writer = TripIndexWriter(index_path, start or time.time(), bucket_seconds)
+    writer.close()
+    return index_path
+
+
+def _to_float(text):
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+
+class CSVTripLogReader:
+    """
+    Random access into a CSV trip log through its sidecar index.
+
+        log = CSVTripLogReader("logs/trip_log_1700000000.csv")
+        for t, (rpm, speed) in log.iter_rows(47 * 60, 48 * 60, ["RPM", "SPEED"]):
+            ...
+
+    Times are seconds since the log started. Only the bytes between the
+    requested times are read, and only the requested columns are converted.
+    """
+
+    def __init__(self, path, index_path=None):
+        self.path = path
+        with open_segment(path) as f:
+            header = next(csv.reader([f.readline().decode("utf-8").rstrip("\r\n")]))
+        self.keys = header[1:]
+        self.positions = {key: i + 1 for i, key in enumerate(self.keys)}
+
+        index_path = index_path or index_path_for(path)
+        if not os.path.exists(index_path):
+            build_index(path, index_path)
+        self.index = TripIndex(index_path)
+        self.start_wall_time = self.index.start_wall_time
+
+    def duration(self):
+        """Seconds from the start of the log to the last indexed bucket."""
+        if not len(self.index):
+            return 0.0
+        return float(self.index.entries["wall_time"][-1] - self.start_wall_time)
+
+    def first_time(self):
+        """Seconds from the start of the trip to this segment's first row, None if it has none."""
+        if not len(self.index):
+            return None
+        return float(self.index.entries["wall_time"][0] - self.start_wall_time)
+
+    def iter_rows(self, start=None, end=None, columns=None):
+        """Yields (seconds_since_start, [values of columns]) for start <= t <= end, values as read (strings)."""
+        columns = list(columns) if columns else self.keys
+        picks = [self.positions[key] for key in columns]
+
+        entry = self.index.locate(self.start_wall_time + (start or 0.0))
+        if entry is None:
+            return
+        # Compressed segments are complete; only a live file can be shorter than its index.
+        if not is_compressed(self.path) and entry["offset"] >= os.path.getsize(self.path):
+            return
+
+        wall = float(entry["wall_time"])
+        last_tod = None
+        with open_segment(self.path) as f:
+            # On a compressed segment this decompresses up to the offset, but nothing is parsed.
+            f.seek(int(entry["offset"]))
+            for line in f:
+                text = line.decode("utf-8", "ignore").rstrip("\r\n")
+                if not text:
+                    continue
+                fields = text.split(",")
+                tod = time_of_day(fields[0])
+                if tod is None:
+                    continue
+                if last_tod is None:
+                    last_tod = _local_time_of_day(wall)
+                wall += _elapsed(last_tod, tod)
+                last_tod = tod
+
+                # Stamps are whole milliseconds; round off the drift from summing them.
+                t = round(wall - self.start_wall_time, 3)
+                if start is not None and t < start:
+                    continue
+                if end is not None and t > end:
+                    break
+                if len(fields) <= max(picks, default=0):
+                    # A value with a comma was quoted; fall back to the csv module for this row.
+                    fields = next(csv.reader([text]))
+                yield t, [fields[p] if p < len(fields) else "" for p in picks]
+
+    def read_columns(self, start=None, end=None, columns=None):
+        """(times, {key: float array}) for the range, NaN where a value was missing."""
+        columns = list(columns) if columns else self.keys
+        times = []
+        values = [[] for _ in columns]
+        for t, row in self.iter_rows(start, end, columns):
+            times.append(t)
+            for target, text in zip(values, row):
+                target.append(_to_float(text) if text else np.nan)
+        return np.array(times), {key: np.array(v, dtype=np.float64) for key, v in zip(columns, values)}
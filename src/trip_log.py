@@ -0,0 +1,291 @@
+"""
+Binary trip-log format.
+
+    magic      8 bytes   b"OBDLOG1\\0"
+    length     uint32    size of the JSON header that follows
+    header     JSON      {"version", "keys", "units", "dtype", "start_wall_time", "start_monotonic_ns"}
+    padding    to a multiple of 8 bytes
+    records    fixed width, little endian:
+                 int64          monotonic timestamp in ns
+                 uint64 x W     presence bitmask, bit i set = keys[i] was read (W = ceil(len(keys) / 64))
+                 float32/64 x N one value per key, NaN when absent
+
+The reader memory-maps the records as a NumPy structured array, so columns
+come out without any parsing. Compressed segments (log_rotation.py) are
+decompressed into memory instead.
+"""
+import csv
+import json
+import math
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+from trip_index import CSVTripLogReader, format_timestamp
+from log_rotation import is_compressed, open_segment, segment_paths, strip_compression
+
+MAGIC = b"OBDLOG1\0"
+VERSION = 1
+BINARY_EXTENSION = ".obdlog"
+VALUE_TYPES = {"f4": "f", "f8": "d"}
+
+
+def _mask_words(count):
+    return max(1, (count + 63) // 64)
+
+
+def record_dtype(count, dtype="f4"):
+    return np.dtype([
+        ("t_ns", "<i8"),
+        ("mask", "<u8", (_mask_words(count),)),
+        ("values", "<" + dtype, (count,)),
+    ])
+
+
+class BinaryTripWriter:
+    """Appends fixed-width records to an open binary trip log."""
+
+    def __init__(self, file, keys, units=None, dtype="f4", start_wall_time=None, start_monotonic_ns=None):
+        if dtype not in VALUE_TYPES:
+            raise ValueError(f"Unsupported value type {dtype!r}, use one of {sorted(VALUE_TYPES)}")
+        self.file = file
+        self.keys = list(keys)
+        self.words = _mask_words(len(self.keys))
+        self.record = struct.Struct("<q" + "Q" * self.words + VALUE_TYPES[dtype] * len(self.keys))
+
+        header = json.dumps({
+            "version": VERSION,
+            "keys": self.keys,
+            "units": list(units) if units else [""] * len(self.keys),
+            "dtype": dtype,
+            "start_wall_time": start_wall_time if start_wall_time is not None else time.time(),
+            "start_monotonic_ns": start_monotonic_ns if start_monotonic_ns is not None else time.monotonic_ns(),
+        }).encode("utf-8")
+        prefix = MAGIC + struct.pack("<I", len(header)) + header
+        file.write(prefix + b"\0" * (-len(prefix) % 8))
+
+    def pack(self, t_ns, values):
+        """values: one entry per key, None (or anything non-numeric) when the sensor wasn't read."""
+        mask = [0] * self.words
+        floats = []
+        for i, value in enumerate(values):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                mask[i >> 6] |= 1 << (i & 63)
+                floats.append(value)
+            else:
+                floats.append(math.nan)
+        return self.record.pack(t_ns, *mask, *floats)
+
+    def write(self, t_ns, values):
+        self.file.write(self.pack(t_ns, values))
+
+    def write_many(self, rows):
+        self.file.write(b"".join(self.pack(t_ns, values) for t_ns, values in rows))
+
+
+def read_header(path):
+    with open_segment(path) as f:
+        return _read_header(f, path)
+
+
+def _read_header(f, path):
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{path} is not a binary trip log")
+    (length,) = struct.unpack("<I", f.read(4))
+    header = json.loads(f.read(length).decode("utf-8"))
+    offset = len(MAGIC) + 4 + length
+    header["data_offset"] = offset + (-offset % 8)
+    return header
+
+
+class TripLogReader:
+    """
+    Memory-mapped view of a binary trip log.
+
+        log = TripLogReader("trip_log_1700000000.obdlog")
+        t = log.timestamps()          # seconds since the log started
+        rpm = log.column("RPM")       # float array, NaN where RPM wasn't read
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if is_compressed(path):
+            with open_segment(path) as f:
+                self._load(_read_header(f, path))
+                f.read(self.header["data_offset"] - f.tell())
+                data = f.read()
+            count = len(data) // self.dtype.itemsize
+            self.records = np.frombuffer(data, dtype=self.dtype, count=count)
+            return
+
+        self._load(read_header(path))
+        size = os.path.getsize(path) - self.header["data_offset"]
+        # A record still being written when the file was copied is ignored.
+        count = max(0, size // self.dtype.itemsize)
+        if count:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r", offset=self.header["data_offset"],
+                                     shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+
+    def _load(self, header):
+        self.header = header
+        self.keys = header["keys"]
+        self.units = dict(zip(self.keys, header["units"]))
+        self.index = {key: i for i, key in enumerate(self.keys)}
+        self.dtype = record_dtype(len(self.keys), header["dtype"])
+
+    def __len__(self):
+        return len(self.records)
+
+    def timestamps_ns(self):
+        return self.records["t_ns"]
+
+    def timestamps(self):
+        """Seconds since the start of the log, float64."""
+        return (self.records["t_ns"] - self.header["start_monotonic_ns"]) / 1e9
+
+    def wall_times(self):
+        return self.header["start_wall_time"] + self.timestamps()
+
+    def present(self, key):
+        i = self.index[key]
+        return ((self.records["mask"][:, i >> 6] >> np.uint64(i & 63)) & np.uint64(1)) == 1
+
+    def column(self, key, raw=False):
+        """
+        Values of one sensor. raw=True returns the memory-mapped column as is
+        (absent samples are already NaN on disk); otherwise a float64 copy.
+        """
+        values = self.records["values"][:, self.index[key]]
+        return values if raw else values.astype(np.float64)
+
+    def columns(self, keys=None):
+        return {key: self.column(key) for key in (keys or self.keys)}
+
+    def duration(self):
+        return float(self.timestamps()[-1]) if len(self.records) else 0.0
+
+    def first_time(self):
+        return float(self.timestamps()[0]) if len(self.records) else None
+
+    def span(self, start=None, end=None):
+        """Record range [i, j) for start <= t <= end; records are in time order, so this is a binary search."""
+        t_ns = self.records["t_ns"]
+        base = self.header["start_monotonic_ns"]
+        i = int(np.searchsorted(t_ns, base + int(start * 1e9), side="left")) if start is not None else 0
+        j = int(np.searchsorted(t_ns, base + int(end * 1e9), side="right")) if end is not None else len(t_ns)
+        return i, max(i, j)
+
+    def read_columns(self, start=None, end=None, columns=None):
+        """(times, {key: float array}) for the range, same shape as CSVTripLogReader.read_columns."""
+        i, j = self.span(start, end)
+        times = self.timestamps()[i:j] if j > i else np.zeros(0)
+        values = self.records["values"][i:j]
+        return times, {key: values[:, self.index[key]].astype(np.float64) for key in (columns or self.keys)}
+
+    def iter_rows(self, start=None, end=None, columns=None):
+        times, cols = self.read_columns(start, end, columns)
+        rows = zip(*cols.values()) if cols else iter(())
+        for t, row in zip(times, rows):
+            yield float(t), list(row)
+
+    def close(self):
+        mm = getattr(self.records, "_mmap", None)
+        self.records = np.zeros(0, dtype=self.dtype)
+        if mm is not None:
+            mm.close()
+
+
+class SegmentedTripLog:
+    """Several segments of one rotated trip, read as if they were a single log."""
+
+    def __init__(self, readers):
+        self.readers = readers
+        self.keys = readers[0].keys
+
+    def duration(self):
+        return max(reader.duration() for reader in self.readers)
+
+    def _segments(self, start, end):
+        firsts = [reader.first_time() for reader in self.readers]
+        for i, reader in enumerate(self.readers):
+            if firsts[i] is None:
+                continue
+            if end is not None and firsts[i] > end:
+                break
+            # Skip segments that end before start without opening them.
+            following = [t for t in firsts[i + 1:] if t is not None]
+            if start is not None and following and following[0] <= start:
+                continue
+            yield reader
+
+    def iter_rows(self, start=None, end=None, columns=None):
+        for reader in self._segments(start, end):
+            yield from reader.iter_rows(start, end, columns)
+
+    def read_columns(self, start=None, end=None, columns=None):
+        columns = list(columns) if columns else self.keys
+        parts = [reader.read_columns(start, end, columns) for reader in self._segments(start, end)]
+        if not parts:
+            return np.zeros(0), {key: np.zeros(0) for key in columns}
+        return (np.concatenate([times for times, _ in parts]),
+                {key: np.concatenate([cols[key] for _, cols in parts]) for key in columns})
+
+    def close(self):
+        for reader in self.readers:
+            if hasattr(reader, "close"):
+                reader.close()
+
+
+def _open_segment_reader(path):
+    if strip_compression(path).endswith(BINARY_EXTENSION):
+        return TripLogReader(path)
+    return CSVTripLogReader(path)
+
+
+def open_trip_log(path):
+    """
+    A reader for either log format, joining rotated and compressed segments;
+    all offer keys, duration(), iter_rows() and read_columns().
+    """
+    readers = [_open_segment_reader(p) for p in segment_paths(path)]
+    return readers[0] if len(readers) == 1 else SegmentedTripLog(readers)
+
+
+def export_csv(path, csv_path=None):
+    """
+    Converts a binary trip log, all its segments if it was rotated, to the
+    same CSV layout DataLogger writes. Returns the CSV path.
+    """
+    segments = segment_paths(path)
+    if csv_path is None:
+        csv_path = os.path.splitext(strip_compression(segments[0]))[0] + ".csv"
+
+    with open(csv_path, mode="w", newline="") as f:
+        writer = csv.writer(f)
+        for number, segment in enumerate(segments):
+            log = TripLogReader(segment)
+            try:
+                if number == 0:
+                    writer.writerow(["Timestamp"] + log.keys)
+                wall = log.wall_times()
+                columns = [log.column(key) for key in log.keys]
+                present = [log.present(key) for key in log.keys]
+                for row in range(len(log)):
+                    writer.writerow([format_timestamp(float(wall[row]))] + [
+                        round(float(col[row]), 4) if has[row] else "" for col, has in zip(columns, present)
+                    ])
+            finally:
+                log.close()
+    return csv_path
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python trip_log.py <log.obdlog> [out.csv]")
+        sys.exit(1)
+    print(export_csv(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None))
@@ -0,0 +1,114 @@
+import time
+
+_NOTHING = object()
+
+
+class _Entry:
+    __slots__ = ("value", "apply", "group", "min_interval", "applied", "last_apply", "pending")
+
+    def __init__(self):
+        self.value = None
+        self.apply = None
+        self.group = None
+        self.min_interval = 0.0
+        self.applied = _NOTHING      # value the widget currently shows
+        self.last_apply = 0.0
+        self.pending = False
+
+
+class FrameScheduler:
+    """
+    Collects widget updates during a frame and applies them together in
+    flush(), once per UI frame.
+
+    - Only the latest value per key is kept, and it is only applied when it
+      differs from what the widget already shows.
+    - Each key can be throttled with min_interval (seconds); a throttled
+      update stays pending and goes out in a later frame.
+    - Keys belong to groups, usually one per tab. A group's visibility is
+      checked once per flush, and hidden groups are skipped entirely; their
+      latest values wait until the group is shown again, or are dropped for
+      groups registered with keep_hidden=False.
+    - At most max_per_frame updates are applied per flush. The rest wait
+      for the next frame, oldest first, so the cost of a frame stays bounded
+      whatever the number of sensors.
+    """
+
+    def __init__(self, max_per_frame=None):
+        self.max_per_frame = max_per_frame
+        self.entries = {}
+        self.groups = {}
+        self.applied_count = 0
+        self.skipped_count = 0
+
+    def add_group(self, name, visible, keep_hidden=True):
+        """visible: callable returning whether the group's widgets are on screen."""
+        self.groups[name] = (visible, keep_hidden)
+
+    def submit(self, key, value, apply, group=None, min_interval=0.0):
+        """Stages apply(value) for the next flush(), replacing anything staged for key this frame."""
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = _Entry()
+        entry.value = value
+        entry.apply = apply
+        entry.group = group
+        entry.min_interval = min_interval
+        if entry.applied is not _NOTHING and entry.applied == value:
+            entry.pending = False
+            self.skipped_count += 1
+            return
+        if not entry.pending:
+            # Re-inserted so pending keys are flushed oldest first.
+            del self.entries[key]
+            self.entries[key] = entry
+        entry.pending = True
+
+    def forget(self, group=None):
+        """
+        Drops staged updates and what is known to be on screen, for a group or
+        everything, e.g. after its widgets were rebound to other data.
+        """
+        for entry in self.entries.values():
+            if group is None or entry.group == group:
+                entry.applied = _NOTHING
+                entry.pending = False
+
+    def flush(self, now=None):
+        """Applies pending updates; returns how many were applied."""
+        now = time.monotonic() if now is None else now
+        visibility = {}
+        applied = []
+        budget = self.max_per_frame
+
+        for key, entry in list(self.entries.items()):
+            if not entry.pending:
+                continue
+            if entry.group is not None and entry.group in self.groups:
+                if entry.group not in visibility:
+                    visible, keep_hidden = self.groups[entry.group]
+                    visibility[entry.group] = (bool(visible()), keep_hidden)
+                shown, keep_hidden = visibility[entry.group]
+                if not shown:
+                    if not keep_hidden:
+                        entry.pending = False
+                    continue
+            if entry.min_interval and now - entry.last_apply < entry.min_interval:
+                continue
+            if budget is not None and len(applied) >= budget:
+                break
+
+            entry.pending = False
+            entry.applied = entry.value
+            entry.last_apply = now
+            applied.append(key)
+            try:
+                entry.apply(entry.value)
+            except Exception as e:
+                print(f"UI update {key!r} failed: {e}")
+
+        # Applied keys go to the back, so keys left over by the budget go first next frame.
+        for key in applied:
+            self.entries[key] = self.entries.pop(key)
+        self.applied_count += len(applied)
+        return len(applied)
@@ -6,22 +6,24 @@ import os
 import threading
 import sys
 import time
-from collections import deque, defaultdict
+from collections import deque
 import serial.tools.list_ports
-import matplotlib.pyplot as plt
-from cryptography.fernet import Fernet
 
 from data_logger import DataLogger
+from acquisition import AcquisitionEngine
+from sensor_history import SensorHistory, HISTORY_SECONDS, HISTORY_RATE_HZ
 from config_manager import ConfigManager
 from diagnostic_engine import DiagnosticEngine
-from constants import STANDARD_SENSORS, PRO_PACK_DIR
+from pack_loader import PackLoader
+from constants import STANDARD_SENSORS, UI_FRAME_INTERVAL_MS, UI_MAX_UPDATES_PER_FRAME
 from ui.theme import ThemeManager
+from ui.frame_scheduler import FrameScheduler
+from startup_timer import StartupTimer
 
+# Graph and Dyno (and with them matplotlib) are imported when their tab is first opened.
 from ui.tabs.dashboard_tab import DashboardTab
-from ui.tabs.graph_tab import GraphTab
 from ui.tabs.settings_tab import SettingsTab
 from ui.tabs.diagnostics_tab import DiagnosticsTab, DebugTab
-from ui.tabs.dyno_tab import DynoTab
 from ui.tabs.help_tab import HelpTab
 from translation import translate, set_language
 
@@ -39,23 +41,27 @@ def window_ensure_show_and_focus(root):
     root.after(0, lambda: root.attributes("-topmost", False))
 
 class DashboardApp(ctk.CTk):
-    def __init__(self, obd_handler):
+    def __init__(self, obd_handler, startup=None):
+        self.startup = startup or StartupTimer()
         super().__init__()
         self.obd = obd_handler
+        self.acquisition = AcquisitionEngine(self.obd)
         self.logger = DataLogger()
         self.obd.log_callback = self.append_debug_log
 
         self.config = ConfigManager.load_config()
+        self.pack_loader = PackLoader(key=_get_render_context())
         set_language(self.config.get("lang", "en"))
         self.sensor_state = {}
         self.available_sensors = {}
         self.sensor_sources = {}
         self.dashboard_dirty = False
         self.running = True
+        self.last_snapshot_seq = 0
 
         self.log_buffer = deque(maxlen=500)
         self.txt_debug = None
-        self.sensor_history = defaultdict(lambda: deque([0] * 60, maxlen=60))
+        self.sensor_history = SensorHistory.from_config(self.config)
 
         self.title(translate("ui_main_window_title"))
         self.geometry("1100x800")
@@ -68,7 +74,7 @@ class DashboardApp(ctk.CTk):
         self.configure(fg_color=ThemeManager.get("BACKGROUND"))
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
-        self.tabview = ctk.CTkTabview(self)
+        self.tabview = ctk.CTkTabview(self, command=self._on_tab_change)
         self.tabview.pack(fill="both", expand=True, padx=20, pady=20)
 
         self.tab_dash = self.tabview.add(translate("ui_main_window_tab_dashboard"))
@@ -78,32 +84,89 @@ class DashboardApp(ctk.CTk):
         self.tab_settings = self.tabview.add(translate("ui_main_window_tab_settings"))
         self.tab_help = self.tabview.add(translate("ui_main_window_tab_help"))
 
+        # Every tab but the dashboard is built the first time it is opened.
+        self._tab_builders = {
+            translate("ui_main_window_tab_live_graph"): self._build_graph_tab,
+            translate("ui_main_window_tab_dyno"): self._build_dyno_tab,
+            translate("ui_main_window_tab_diagnostics"): self._build_diagnostics_tab,
+            translate("ui_main_window_tab_settings"): self._build_settings_tab,
+            translate("ui_main_window_tab_help"): self._build_help_tab,
+        }
+
+        # Widget updates from a snapshot are staged here and applied once per frame in update_loop.
+        self.frame_scheduler = FrameScheduler(max_per_frame=UI_MAX_UPDATES_PER_FRAME)
+        for group, tab_key, keep_hidden in (("dashboard", "ui_main_window_tab_dashboard", True),
+                                            ("graph", "ui_main_window_tab_live_graph", True),
+                                            ("dyno", "ui_main_window_tab_dyno", False),
+                                            ("diagnostics", "ui_main_window_tab_diagnostics", True)):
+            tab_name = translate(tab_key)
+            self.frame_scheduler.add_group(group, lambda tab_name=tab_name: self.tabview.get() == tab_name, keep_hidden)
+
         self.var_dev_mode = ctk.BooleanVar(value=self.config.get("developer_mode", False))
         self.var_port = ctk.StringVar(value=self.config.get("port", "Auto"))
         self.var_baud = ctk.StringVar(value=self.config.get("baud_rate", "38400"))
-        self.var_graph_left = ctk.StringVar(value="RPM")
-        self.var_graph_right = ctk.StringVar(value="SPEED")
+
+        self.startup.mark("window")
 
         self.reload_sensor_definitions()
+        self.startup.mark("sensor definitions")
 
         self.ui_dashboard = DashboardTab(self.tab_dash, self)
-        self.ui_graph = GraphTab(self.tab_graph, self)
-        self.ui_dyno = DynoTab(self.tab_dyno, self)
-        self.ui_diagnostics = DiagnosticsTab(self.tab_diag, self)
-        self.ui_settings = SettingsTab(self.tab_settings, self)
-        self.ui_help = HelpTab(self.tab_help, self)
-
         self.refresh_dev_mode_visibility()
-        self.ui_graph.update()
-        self.ui_settings.update_filter_options()
 
+        self.logger.set_format(self.config.get("log_format", "csv"))
+        self.logger.set_rotation(
+            int(self.config.get("log_rotate_mb", 0) * 1024 * 1024),
+            self.config.get("log_rotate_minutes", 0) * 60,
+            self.config.get("log_compression", "none"),
+        )
         if "log_dir" in self.config:
             self.logger.set_directory(self.config["log_dir"])
             if hasattr(self, 'lbl_path'):
                 self.lbl_path.configure(text=translate("ui_main_window_settings_log_save_path").format(self.logger.log_dir))
 
         self.ui_dashboard.rebuild_grid()
+        self.startup.mark("dashboard")
+        # Log every polled sample from the acquisition thread, not just the ones that get drawn.
+        self.acquisition.add_listener(self.log_snapshot)
+        self.acquisition.start()
         self.update_loop()
+        self.after_idle(self._report_startup)
+
+    def _report_startup(self):
+        # Idle callbacks run once the window has been drawn, so this closes the first frame.
+        self.startup.mark("first frame")
+        report = self.startup.report()
+        print(report)
+        for line in report.splitlines():
+            self.append_debug_log(line)
+
+    def _on_tab_change(self):
+        builder = self._tab_builders.pop(self.tabview.get(), None)
+        if builder is not None:
+            start = time.perf_counter()
+            builder()
+            self.append_debug_log(f"Built tab '{self.tabview.get()}' in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def _build_graph_tab(self):
+        from ui.tabs.graph_tab import GraphTab
+        self.ui_graph = GraphTab(self.tab_graph, self)
+        self.update_graph_dropdowns()
+        self.ui_graph.update()
+
+    def _build_dyno_tab(self):
+        from ui.tabs.dyno_tab import DynoTab
+        self.ui_dyno = DynoTab(self.tab_dyno, self)
+
+    def _build_diagnostics_tab(self):
+        self.ui_diagnostics = DiagnosticsTab(self.tab_diag, self)
+
+    def _build_settings_tab(self):
+        self.ui_settings = SettingsTab(self.tab_settings, self)
+        self.ui_settings.update_filter_options()
+
+    def _build_help_tab(self):
+        self.ui_help = HelpTab(self.tab_help, self)
 
     def change_theme(self, new_theme):
         ThemeManager.set_theme(new_theme)
@@ -130,17 +193,8 @@ class DashboardApp(ctk.CTk):
                 self.ui_dashboard.btn_next.configure(fg_color=ThemeManager.get("CARD_BG"))
                 self.ui_dashboard.lbl_page.configure(text_color=ThemeManager.get("TEXT_MAIN"))
 
-        for cmd, state in self.sensor_state.items():
-            if state["card_widget"]:
-                state["card_widget"].configure(fg_color=ThemeManager.get("CARD_BG"))
-
-            gauge = state.get("widget_progress_bar")
-            if gauge and hasattr(gauge, 'redraw_colors'):
-                gauge.redraw_colors()
-
-            title_lbl = state.get("widget_title_label")
-            if title_lbl:
-                title_lbl.configure(text_color=ThemeManager.get("TEXT_MAIN"))
+            # Cards are pooled, so this covers the hidden ones too.
+            self.ui_dashboard.redraw_colors()
 
         self.config["theme"] = new_theme
         ConfigManager.save_config(self.config)
@@ -148,42 +202,18 @@ class DashboardApp(ctk.CTk):
     def reload_sensor_definitions(self):
         self.available_sensors = STANDARD_SENSORS.copy()
         self.sensor_sources = {k: "Standard" for k in STANDARD_SENSORS}
+        pro_definitions = {}
 
-        enabled_packs = self.config.get("enabled_packs", [])
-        cipher = Fernet(_get_render_context())
-
-        if os.path.exists(PRO_PACK_DIR):
-            for root, dirs, files in os.walk(PRO_PACK_DIR):
-                for f in files:
-                    if f.endswith(".json") or f.endswith(".obd"):
-                        full = os.path.join(root, f)
-                        rel = os.path.relpath(full, PRO_PACK_DIR)
-                        match = False
-                        for p in enabled_packs:
-                            if os.path.normpath(p) == os.path.normpath(rel):
-                                match = True
-                                break
-                        if match:
-                            try:
-                                pro_data = {}
-                                if f.endswith(".json"):
-                                    with open(full, 'r', encoding='utf-8') as json_file:
-                                        pro_data = json.load(json_file)
-                                elif f.endswith(".obd"):
-                                    with open(full, 'rb') as enc_file:
-                                        encrypted_data = enc_file.read()
-                                        decrypted_data = cipher.decrypt(encrypted_data)
-                                        pro_data = json.loads(decrypted_data.decode('utf-8'))
-
-                                for key, val in pro_data.items():
-                                    self.available_sensors[key] = tuple(val[:5])
-                                    self.sensor_sources[key] = rel
-                                print(f"Loaded Pack: {rel}")
-                            except Exception as e:
-                                print(f"Error loading {rel}: {e}")
-
-        self.obd.set_pro_definitions(self.available_sensors)
+        packs = self.pack_loader.load(self.config.get("enabled_packs", []))
+        for rel, bundle in packs:
+            for key, val in bundle["definitions"].items():
+                self.available_sensors[key] = tuple(val[:5])
+                self.sensor_sources[key] = rel
+                pro_definitions[key] = val
+
+        self.obd.set_pro_definitions(pro_definitions, [bundle for rel, bundle in packs])
         self._init_sensor_state()
+        self.update_graph_dropdowns()
 
     def _init_sensor_state(self):
         old_state = self.sensor_state if hasattr(self, 'sensor_state') else {}
@@ -203,26 +233,27 @@ class DashboardApp(ctk.CTk):
                 description = translate("ui_main_window_sensor_description").format(name)
 
             if cmd in old_state:
-                is_show = old_state[cmd]["show_var"].get()
-                is_log = old_state[cmd]["log_var"].get()
-                limit_val = old_state[cmd]["limit_var"].get()
+                # Sensors that stay loaded keep their variables; creating thousands of Tk variables is slow.
+                show_var = old_state[cmd]["show_var"]
+                log_var = old_state[cmd]["log_var"]
+                limit_var = old_state[cmd]["limit_var"]
                 card = old_state[cmd].get("card_widget", None)
                 val_lbl = old_state[cmd].get("widget_value_label", None)
                 bar = old_state[cmd].get("widget_progress_bar", None)
                 title = old_state[cmd].get("widget_title_label", None)
             else:
                 saved = saved_sensors.get(cmd, {})
-                is_show = saved.get("show", def_show)
-                is_log = saved.get("log", def_log)
-                limit_val = str(saved.get("limit", def_limit))
+                show_var = ctk.BooleanVar(value=saved.get("show", def_show))
+                log_var = ctk.BooleanVar(value=saved.get("log", def_log))
+                limit_var = ctk.StringVar(value=str(saved.get("limit", def_limit)))
                 card, val_lbl, bar, title = None, None, None, None
 
             self.sensor_state[cmd] = {
                 "name": name, "unit": unit,
                 "description": description,
-                "show_var": ctk.BooleanVar(value=is_show),
-                "log_var": ctk.BooleanVar(value=is_log),
-                "limit_var": ctk.StringVar(value=limit_val),
+                "show_var": show_var,
+                "log_var": log_var,
+                "limit_var": limit_var,
                 "card_widget": card,
                 "widget_value_label": val_lbl,
                 "widget_progress_bar": bar,
@@ -269,9 +300,7 @@ class DashboardApp(ctk.CTk):
 
     def update_graph_dropdowns(self):
         if hasattr(self, 'ui_graph'):
-            options = sorted(list(self.available_sensors.keys()))
-            self.ui_graph.app.menu_left.configure(values=options)
-            self.ui_graph.app.menu_right.configure(values=options)
+            self.ui_graph.set_sensor_options(sorted(self.available_sensors.keys()))
 
     def on_connect_click(self):
 
@@ -294,11 +323,12 @@ class DashboardApp(ctk.CTk):
         connected = False
 
         if self.obd.is_connected():
-            self.obd.disconnect()
+            self.acquisition.disconnect()
             connected = False
         else:
             self.obd.simulation = is_demo
-            connected = self.obd.connect(target_port, baudrate=target_baud_rate)
+            connected = self.acquisition.connect(target_port, baudrate=target_baud_rate,
+                                                transport=self.config.get("transport"))
         self.after(0, lambda: self.post_connection_update(connected))
 
     def post_connection_update(self, connected):
@@ -346,7 +376,7 @@ class DashboardApp(ctk.CTk):
                 self.ui_dashboard.rebuild_grid()
 
                 log_sensors = [k for k, v in self.sensor_state.items() if v["log_var"].get()]
-                self.logger.start_new_log(log_sensors)
+                self.logger.start_new_log(log_sensors, {k: self.sensor_state[k]["unit"] for k in log_sensors})
 
                 self.append_debug_log(f"Connected. Car supports {count_supported} PIDs.")
                 self.append_debug_log(f"Smart Filter enabled {count_enabled} relevant sensors.")
@@ -359,6 +389,7 @@ class DashboardApp(ctk.CTk):
                 bar = state.get('widget_progress_bar')
                 if bar and hasattr(bar, 'update_value'):
                     bar.update_value(0)
+            self.frame_scheduler.forget("dashboard")
 
     def change_log_folder(self):
         new_dir = filedialog.askdirectory()
@@ -390,9 +421,10 @@ class DashboardApp(ctk.CTk):
 
         snapshot = {}
         thresholds = {}
-        for cmd, state in self.sensor_state.items():
-            snapshot[cmd] = self.obd.query_sensor(cmd)
-            thresholds[cmd] = state["limit_var"].get()
+        with self.acquisition.exclusive():
+            for cmd, state in self.sensor_state.items():
+                snapshot[cmd] = self.obd.query_sensor(cmd)
+                thresholds[cmd] = state["limit_var"].get()
 
         issues = DiagnosticEngine.analyze(snapshot, thresholds)
 
@@ -416,7 +448,8 @@ class DashboardApp(ctk.CTk):
         self.ui_diagnostics.app.txt_dtc.insert("end", translate("ui_main_window_diagnostics_scanning"))
         self.update()
 
-        dtc_groups = self.obd.get_dtc()
+        with self.acquisition.exclusive():
+            dtc_groups = self.obd.get_dtc()
 
         self.ui_diagnostics.app.txt_dtc.delete("1.0", "end")
 
@@ -446,8 +479,9 @@ class DashboardApp(ctk.CTk):
             self.ui_diagnostics.app.txt_dtc.insert("end", translate("ui_main_window_backup_reading_system_data"))
         self.update()
 
-        codes = self.obd.get_dtc()
-        snapshot = self.obd.get_freeze_frame_snapshot(list(self.sensor_state.keys()))
+        with self.acquisition.exclusive():
+            codes = self.obd.get_dtc()
+            snapshot = self.obd.get_freeze_frame_snapshot(list(self.sensor_state.keys()))
         report = {"timestamp": time.strftime("%Y-%m-%d %H:%M:%S"), "fault_codes": codes, "freeze_frame_data": snapshot}
         filename = f"Backup_{int(time.time())}.json"
         filepath = os.path.join(self.logger.log_dir, filename)
@@ -475,7 +509,8 @@ class DashboardApp(ctk.CTk):
                 self.ui_diagnostics.app.txt_dtc.insert("end", translate("ui_main_window_clear_codes_clearing"))
             self.update()
 
-            success = self.obd.clear_dtc()
+            with self.acquisition.exclusive():
+                success = self.obd.clear_dtc()
 
             if success:
                 if hasattr(self.ui_diagnostics.app, 'txt_dtc'):
@@ -496,6 +531,15 @@ class DashboardApp(ctk.CTk):
 
     def on_close(self):
         self.running = False
+        self.acquisition.stop()
+        if self.obd.is_connected() and not self.obd.simulation:
+            # Lets the handler persist what it learned about the car.
+            self.acquisition.disconnect()
+        # Rows still queued for the log writer go to disk before we exit.
+        self.logger.close()
+        if hasattr(self, 'ui_graph'):
+            self.config.update(graph_series=self.ui_graph.series, graph_layout=self.ui_graph.layout,
+                               graph_window=self.ui_graph.window)
         data_to_save = {
             "log_dir": self.logger.log_dir,
             "enabled_packs": self.config.get("enabled_packs", []),
@@ -505,16 +549,31 @@ class DashboardApp(ctk.CTk):
             "port": self.var_port.get(),
             "baud_rate": self.var_baud.get(),
             "lang": self.config.get("lang", "en"),
+            "transport": self.config.get("transport", "python-obd"),
+            "log_format": self.logger.log_format,
+            "log_compression": self.logger.compression,
+            "log_rotate_mb": self.config.get("log_rotate_mb", 0),
+            "log_rotate_minutes": self.config.get("log_rotate_minutes", 0),
+            "history_seconds": self.config.get("history_seconds", HISTORY_SECONDS),
+            "history_rate_hz": self.config.get("history_rate_hz", HISTORY_RATE_HZ),
+            "graph_series": self.config.get("graph_series", ["RPM", "SPEED"]),
+            "graph_layout": self.config.get("graph_layout", "shared"),
+            "graph_window": self.config.get("graph_window", 60),
         }
         for cmd, state in self.sensor_state.items():
             data_to_save["sensors"][cmd] = {"show": state["show_var"].get(), "log": state["log_var"].get(),
                                             "limit": state["limit_var"].get()}
         ConfigManager.save_config(data_to_save)
+        # Saves are written in the background; this one has to be on disk before os._exit.
+        ConfigManager.flush()
 
-        try:
-            plt.close('all')
-        except:
-            pass
+        # Only loaded if a graph tab was opened.
+        pyplot = sys.modules.get("matplotlib.pyplot")
+        if pyplot is not None:
+            try:
+                pyplot.close('all')
+            except:
+                pass
         self.destroy()
         os._exit(0)
 
@@ -526,47 +585,64 @@ class DashboardApp(ctk.CTk):
             self.dashboard_dirty = False
 
         if self.obd.is_connected():
-            data_snapshot = {}
-            current_speed = 0
-
             needed_sensors = set(["SPEED", "RPM", "CONTROL_MODULE_VOLTAGE"])
-            needed_sensors.add(self.var_graph_left.get())
-            needed_sensors.add(self.var_graph_right.get())
+            needed_sensors.update(self.ui_graph.series if hasattr(self, 'ui_graph')
+                                  else self.config.get("graph_series", ["RPM", "SPEED"]))
 
             for cmd, state in self.sensor_state.items():
                 if state["show_var"].get() or state["log_var"].get():
                     needed_sensors.add(cmd)
 
-            for cmd in needed_sensors:
-                val = self.obd.query_sensor(cmd)
+            self.acquisition.set_sensors(needed_sensors)
 
-                if val is not None:
-                    data_snapshot[cmd] = val
-                    self.sensor_history[cmd].append(val)
-                    if cmd == "SPEED": current_speed = val
+            snapshot, updated = self.acquisition.updates_since(self.last_snapshot_seq)
+            if snapshot is not None and snapshot.seq != self.last_snapshot_seq:
+                self.last_snapshot_seq = snapshot.seq
+                self.apply_snapshot(snapshot, updated)
 
-                    state = self.sensor_state.get(cmd)
-                    if state and state["show_var"].get():
-                        gauge = state.get("widget_progress_bar")
+        # Also runs without a new snapshot, for throttled updates and tabs that just became visible.
+        self.frame_scheduler.flush()
 
-                        if gauge and hasattr(gauge, 'update_value'):
-                            if gauge.winfo_ismapped():
-                                gauge.update_value(val)
+        if self.running:
+            self.after(UI_FRAME_INTERVAL_MS, self.update_loop)
+
+    def log_snapshot(self, snapshot):
+        # Only what this cycle actually read; values carried forward from earlier cycles would be logged as new samples.
+        values = snapshot.values
+        self.logger.write_row({key: values[key] for key in snapshot.updated}, snapshot.timestamp_ns, snapshot.wall_time)
+
+    def apply_snapshot(self, snapshot, updated):
+        """updated: {key: timestamp} of every sensor read since the last applied snapshot."""
+        data_snapshot = snapshot.values
+        current_speed = data_snapshot.get("SPEED", 0)
+
+        for cmd, timestamp in updated.items():
+            if cmd not in data_snapshot:
+                continue
+            val = data_snapshot[cmd]
+            self.sensor_history.append(cmd, val, timestamp)
+
+            # Only sensors with a card on the current dashboard page have a gauge.
+            state = self.sensor_state.get(cmd)
+            gauge = state.get("widget_progress_bar") if state else None
+            if gauge and hasattr(gauge, 'update_value'):
+                self.frame_scheduler.submit(("gauge", cmd), val, gauge.update_value, group="dashboard")
 
-            if self.tabview.get() == translate("ui_main_window_tab_live_graph"):
-                self.ui_graph.update()
+        if hasattr(self, 'ui_graph'):
+            self.frame_scheduler.submit("graph", snapshot.seq, lambda seq: self.ui_graph.update(), group="graph")
 
-            if self.tabview.get() == translate("ui_main_window_tab_dyno") and hasattr(self, 'ui_dyno') and self.ui_dyno.is_recording:
-                current_rpm = data_snapshot.get("RPM", 0)
-                self.ui_dyno.update_dyno(current_speed, current_rpm)
+        if hasattr(self, 'ui_dyno') and self.ui_dyno.is_recording:
+            current_rpm = data_snapshot.get("RPM", 0)
+            self.frame_scheduler.submit("dyno", (snapshot.seq, current_speed, current_rpm),
+                                        lambda sample: self.ui_dyno.update_dyno(sample[1], sample[2]), group="dyno")
 
-            if hasattr(self.ui_diagnostics.app, 'btn_clear'):
-                if current_speed > 0:
-                    self.ui_diagnostics.app.btn_clear.configure(state="disabled", text=translate("ui_main_window_clear_codes_moving"))
-                else:
-                    self.ui_diagnostics.app.btn_clear.configure(state="normal", text=translate("ui_main_window_clear_codes_clear_button"))
+        if hasattr(self, 'btn_clear'):
+            # Submitted every snapshot, but the button is only reconfigured when moving/stopped flips.
+            self.frame_scheduler.submit("btn_clear", current_speed > 0, self._set_clear_button, group="diagnostics")
 
-            self.logger.write_row(data_snapshot)
+    def _set_clear_button(self, moving):
+        if moving:
+            self.btn_clear.configure(state="disabled", text=translate("ui_main_window_clear_codes_moving"))
+        else:
+            self.btn_clear.configure(state="normal", text=translate("ui_main_window_clear_codes_clear_button"))
 
-        if self.running:
-            self.after(100, self.update_loop)
\ No newline at end of file
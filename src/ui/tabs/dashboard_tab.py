@@ -5,6 +5,68 @@ from ui.theme import ThemeManager
 from ui.widgets.analog_gauge import AnalogGauge
 from translation import translate
 
+class GaugeCard:
+    """
+    One dashboard grid slot: frame, title, gauge and tooltip. bind() points
+    it at a sensor by updating those in place; unbind() hides it.
+    """
+
+    def __init__(self, parent, slot, columns):
+        self.key = None
+        self.binding = None
+        self.container = ctk.CTkFrame(parent, fg_color=ThemeManager.get("CARD_BG"))
+        self.lbl_title = ctk.CTkLabel(
+            self.container,
+            text="",
+            font=("Arial", 14, "bold"),
+            text_color=ThemeManager.get("TEXT_MAIN")
+        )
+        self.lbl_title.pack(pady=(10, 0))
+        self.gauge = AnalogGauge(self.container, width=180, height=180, min_val=0, max_val=100)
+        self.gauge.pack(pady=5)
+        self.tooltip = ToolTip(self.container, text="", delay=1000)
+        self.grid_args = dict(row=slot // columns, column=slot % columns, padx=10, pady=10, sticky="nsew")
+        self.visible = False
+
+    def bind(self, key, state):
+        try:
+            limit = float(state["limit_var"].get())
+        except:
+            limit = 100
+
+        display_name = state["name"]
+        if len(display_name) > 18:
+            display_name = display_name[:15] + "..."
+        if state["unit"]:
+            display_name += f" ({state['unit']})"
+
+        binding = (key, display_name, limit, state["unit"], state.get("description", state["name"]))
+        if binding != self.binding:
+            if key != self.key:
+                self.gauge.current_value = 0
+            self.lbl_title.configure(text=display_name)
+            self.gauge.set_range(0, limit, state["unit"])
+            self.tooltip.text = binding[4]
+            self.binding = binding
+            self.key = key
+
+        if not self.visible:
+            self.container.grid(**self.grid_args)
+            self.visible = True
+
+    def unbind(self):
+        self.key = None
+        self.binding = None
+        if self.visible:
+            self.container.grid_remove()
+            self.visible = False
+
+    def redraw_colors(self):
+        self.container.configure(fg_color=ThemeManager.get("CARD_BG"))
+        self.lbl_title.configure(text_color=ThemeManager.get("TEXT_MAIN"))
+        self.gauge.redraw_colors()
+
+
 class DashboardTab:
     def __init__(self, parent_frame, app_instance):
         self.frame = parent_frame
@@ -88,6 +150,11 @@ class DashboardTab:
         self.dash_scroll = ctk.CTkScrollableFrame(self.frame, fg_color=ThemeManager.get("BACKGROUND"))
         self.dash_scroll.pack(fill="both", expand=True, padx=0, pady=0)
 
+        self.columns = 3
+        for col in range(self.columns):
+            self.dash_scroll.grid_columnconfigure(col, weight=1)
+        self.cards = []
+
     def _get_ports_values(self):
         ports = []
         try:
@@ -150,13 +217,16 @@ class DashboardTab:
                 pass
 
     def rebuild_grid(self):
-        for widget in self.dash_scroll.winfo_children():
-            widget.destroy()
-
+        """
+        Shows the current page. Cards are pooled, one per grid slot: they are
+        created the first time a slot is needed and afterwards only rebound
+        to another sensor (or hidden), never destroyed.
+        """
         for cmd, state in self.app.sensor_state.items():
             state["card_widget"] = None
             state["widget_progress_bar"] = None
             state["widget_value_label"] = None
+            state["widget_title_label"] = None
 
         active_sensors = [k for k, v in self.app.sensor_state.items() if v["show_var"].get()]
 
@@ -176,54 +246,27 @@ class DashboardTab:
         end_idx = start_idx + self.items_per_page
         page_sensors = active_sensors[start_idx:end_idx]
 
-        cols = 3
-        for i, cmd in enumerate(page_sensors):
-            row = i // cols
-            col = i % cols
-            state = self.app.sensor_state[cmd]
+        while len(self.cards) < len(page_sensors):
+            self.cards.append(GaugeCard(self.dash_scroll, len(self.cards), self.columns))
 
-            try:
-                limit = float(state["limit_var"].get())
-            except:
-                limit = 100
-
-            container = ctk.CTkFrame(self.dash_scroll, fg_color=ThemeManager.get("CARD_BG"))
-
-            display_name = state["name"]
-            if len(display_name) > 18:
-                display_name = display_name[:15] + "..."
-            if state["unit"]:
-                display_name += f" ({state['unit']})"
-
-            lbl_title = ctk.CTkLabel(
-                container,
-                text=display_name,
-                font=("Arial", 14, "bold"),
-                text_color=ThemeManager.get("TEXT_MAIN")
-            )
-            lbl_title.pack(pady=(10, 0))
-
-            gauge = AnalogGauge(
-                container,
-                width=180,
-                height=180,
-                min_val=0,
-                max_val=limit,
-                unit=state["unit"]
-            )
-            gauge.pack(pady=5)
-
-            state["card_widget"] = container
-            state["widget_progress_bar"] = gauge
-
-            tooltip_text = state.get("description", state["name"])
-            ToolTip(container, text=tooltip_text, delay=1000)
-
-            container.grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
-
-        self.dash_scroll.grid_columnconfigure(0, weight=1)
-        self.dash_scroll.grid_columnconfigure(1, weight=1)
-        self.dash_scroll.grid_columnconfigure(2, weight=1)
+        for card, cmd in zip(self.cards, page_sensors):
+            state = self.app.sensor_state[cmd]
+            card.bind(cmd, state)
+            state["card_widget"] = card.container
+            state["widget_progress_bar"] = card.gauge
+            state["widget_title_label"] = card.lbl_title
+
+        for card in self.cards[len(page_sensors):]:
+            card.unbind()
+
+        # Gauges were rebound, so what the scheduler thinks they show is stale.
+        if hasattr(self.app, "frame_scheduler"):
+            self.app.frame_scheduler.forget("dashboard")
+
+    def redraw_colors(self):
+        """Re-themes every pooled card, including hidden ones."""
+        for card in self.cards:
+            card.redraw_colors()
 
     def next_page(self):
         if self.current_page < self.total_pages - 1:
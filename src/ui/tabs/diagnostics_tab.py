@@ -28,8 +28,48 @@ class DiagnosticsTab:
 
 
 class DebugTab:
+    REFRESH_MS = 1000
+    METRICS_ROWS = 30
+
     def __init__(self, parent_frame, app_instance):
         self.frame = parent_frame
         self.app = app_instance
+        self.lbl_pacing = ctk.CTkLabel(self.frame, text="", font=("Consolas", 12), anchor="w")
+        self.lbl_pacing.pack(fill="x", padx=10, pady=(10, 0))
+        self.lbl_totals = ctk.CTkLabel(self.frame, text="", font=("Consolas", 12), anchor="w")
+        self.lbl_totals.pack(fill="x", padx=10)
+        self.txt_metrics = ctk.CTkTextbox(self.frame, height=180, font=("Consolas", 12))
+        self.txt_metrics.pack(fill="x", padx=10, pady=(5, 0))
         self.app.txt_debug = ctk.CTkTextbox(self.frame, width=700, height=400, font=("Consolas", 12))
-        self.app.txt_debug.pack(pady=10, fill="both", expand=True)
\ No newline at end of file
+        self.app.txt_debug.pack(pady=10, fill="both", expand=True)
+        self.refresh_stats()
+
+    def refresh_stats(self):
+        if not self.frame.winfo_exists():
+            return
+        p = self.app.obd.pacing.report()
+        rtt = f"{p['rtt_ms']} ms" if p["rtt_ms"] is not None else "-"
+        self.lbl_pacing.configure(text=translate("ui_tab_debug_pacing").format(
+            gap=p["gap_ms"], timeout=p["timeout_ms"], rtt=rtt,
+            errors=f"{p['error_rate'] * 100:.1f}", backoffs=p["backoffs"]))
+
+        report = self.app.obd.metrics.report()
+        t = report["totals"]
+        self.lbl_totals.configure(text=translate("ui_tab_debug_totals").format(
+            rate=t["samples_per_sec"], sent=t["bytes_sent"], received=t["bytes_received"],
+            switches=t["header_switches"], switch_ms=f"{t['header_switch_time'] * 1000:.0f}"))
+        self.txt_metrics.delete("1.0", "end")
+        self.txt_metrics.insert("1.0", self.format_metrics(report["sensors"]))
+
+        self.frame.after(self.REFRESH_MS, self.refresh_stats)
+
+    def format_metrics(self, sensors):
+        """Fixed-width table of the slowest sensors first."""
+        def ms(v): return f"{v:.1f}" if v is not None else "-"
+
+        rows = sorted(sensors.items(), key=lambda kv: kv[1]["p95"] or 0, reverse=True)
+        lines = [f"{'SENSOR':<28}{'REQ':>7}{'OK':>7}{'FAIL':>6}{'P50':>8}{'P95':>8}{'P99':>8}  LAST ERROR"]
+        for key, m in rows[:self.METRICS_ROWS]:
+            lines.append(f"{key[:27]:<28}{m['requests']:>7}{m['successes']:>7}{m['failures']:>6}"
+                         f"{ms(m['p50']):>8}{ms(m['p95']):>8}{ms(m['p99']):>8}  {m['last_error'] or ''}")
+        return "\n".join(lines)
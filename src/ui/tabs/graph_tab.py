@@ -1,92 +1,264 @@
+import time
+
 import customtkinter as ctk
+import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from axis_scale import axis_range
+from constants import GRAPH_MAX_FPS
+from decimation import StreamingDecimator
 from translation import translate
 
+SERIES_COLORS = ["#3498db", "#e74c3c", "#2ecc71", "#f1c40f", "#9b59b6", "#1abc9c"]
+MAX_SERIES = len(SERIES_COLORS)
+GRAPH_LAYOUTS = ("shared", "stacked")
+# Seconds of history shown, offered in the window menu.
+GRAPH_WINDOWS = ("30", "60", "300", "600")
+# Plot width is rounded to this many pixels before it sets the decimation, so small resizes keep the cache.
+WIDTH_STEP_PX = 50
+
+
 class GraphTab:
+    """
+    Any number of sensors (up to MAX_SERIES) against time, on one shared set
+    of axes or stacked one above the other. Each series is decimated with a
+    StreamingDecimator to about one point per horizontal pixel before it
+    reaches matplotlib, so drawing costs the same for a 30 s and a 10 min window.
+
+    Frames are blitted: the figure with its axes, ticks and labels is rendered
+    once into a cached background, and each frame only restores it and redraws
+    the lines. The full render happens again only when a limit or label
+    changes (or the window is resized), and frames are capped at
+    GRAPH_MAX_FPS however fast samples arrive.
+    """
+
     def __init__(self, parent_frame, app_instance):
         self.frame = parent_frame
         self.app = app_instance
+        config = self.app.config
 
         self.paused = False
+        self.max_fps = config.get("graph_max_fps", GRAPH_MAX_FPS)
+        self.decimation = config.get("graph_decimation", "lttb")
+        self.series = list(config.get("graph_series", ["RPM", "SPEED"]))[:MAX_SERIES] or ["RPM"]
+        self.layout = config.get("graph_layout", "shared")
+        self.window = float(config.get("graph_window", 60))
+        self.sensor_options = list(self.series)
+
+        self._background = None
+        self._axes_state = None
+        self._last_frame = 0.0
+        self._frame_pending = False
+        self._decimators = {}
+        self._width = None
 
         controls = ctk.CTkFrame(self.frame)
         controls.pack(fill="x", padx=10, pady=5)
 
-        ctk.CTkLabel(
-            controls,
-            text=translate("ui_tab_graph_left_axis"),
-            text_color="#3498db",
-            font=("Arial", 12, "bold"),
-        ).pack(side="left", padx=5)
-        self.app.menu_left = ctk.CTkOptionMenu(controls, variable=self.app.var_graph_left, values=[translate("ui_tab_graph_left_axis_value_rpm")])
-        self.app.menu_left.pack(side="left", padx=5)
-
-        ctk.CTkLabel(
-            controls,
-            text=translate("ui_tab_graph_right_axis"),
-            text_color="#e74c3c",
-            font=("Arial", 12, "bold"),
-        ).pack(side="left", padx=5)
-        self.app.menu_right = ctk.CTkOptionMenu(controls, variable=self.app.var_graph_right, values=[translate("ui_tab_graph_right_axis_value_speed")])
-        self.app.menu_right.pack(side="left", padx=5)
+        ctk.CTkLabel(controls, text=translate("ui_tab_graph_series"), font=("Arial", 12, "bold")).pack(side="left", padx=5)
+        self.series_frame = ctk.CTkFrame(controls, fg_color="transparent")
+        self.series_frame.pack(side="left")
+        self.series_menus = []
+        ctk.CTkButton(controls, text="+", width=28, command=self.add_series).pack(side="left", padx=2)
+        ctk.CTkButton(controls, text="−", width=28, command=self.remove_series).pack(side="left", padx=2)
 
         self.btn_pause = ctk.CTkButton(controls, text=translate("ui_tab_graph_pause"), width=90, command=self.toggle_pause)
         self.btn_pause.pack(side="right", padx=5)
 
-        self.fig, self.ax1 = plt.subplots(figsize=(6, 4), dpi=100)
-        self.fig.patch.set_facecolor("#2b2b2b")
-        self.ax1.set_facecolor("#2b2b2b")
-        self.ax1.tick_params(axis="y", labelcolor="#3498db", colors="white")
-        self.ax1.tick_params(axis="x", colors="white")
-        self.ax1.grid(True, color="#404040", linestyle="--", alpha=0.5)
+        self.var_window = ctk.StringVar(value=f"{self.window:g}")
+        ctk.CTkOptionMenu(controls, variable=self.var_window, values=list(GRAPH_WINDOWS), width=70,
+                          command=self.set_window).pack(side="right", padx=5)
+        ctk.CTkLabel(controls, text=translate("ui_tab_graph_window")).pack(side="right", padx=2)
 
-        self.ax2 = self.ax1.twinx()
-        self.ax2.tick_params(axis="y", labelcolor="#e74c3c", colors="white")
-        self.ax2.spines["bottom"].set_color("white")
-        self.ax2.spines["top"].set_color("white")
-        self.ax2.spines["left"].set_color("white")
-        self.ax2.spines["right"].set_color("white")
+        layout_names = {layout: translate(f"ui_tab_graph_layout_{layout}") for layout in GRAPH_LAYOUTS}
+        self._layout_by_name = {name: layout for layout, name in layout_names.items()}
+        self.var_layout = ctk.StringVar(value=layout_names.get(self.layout, layout_names["shared"]))
+        ctk.CTkOptionMenu(controls, variable=self.var_layout, values=list(layout_names.values()), width=100,
+                          command=lambda name: self.set_layout(self._layout_by_name[name])).pack(side="right", padx=5)
 
-        self.line_rpm, = self.ax1.plot([], [], color="#3498db", linewidth=2)
-        self.line_speed, = self.ax2.plot([], [], color="#e74c3c", linewidth=2)
+        self.fig = plt.figure(figsize=(6, 4), dpi=100)
+        self.fig.patch.set_facecolor("#2b2b2b")
 
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.frame)
+        # Without blitting support (or with graph_blit off) fall back to full redraws.
+        self.blit = config.get("graph_blit", True) and getattr(self.canvas, "supports_blit", False)
+        if self.blit:
+            self.canvas.mpl_connect("draw_event", self._on_draw)
+
+        self._build_series_menus()
+        self._build_axes()
         self.canvas.draw()
         self.canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
 
+    # --- series and layout -------------------------------------------------
+
+    def _build_series_menus(self):
+        for menu in self.series_menus:
+            menu.destroy()
+        self.series_menus = []
+        for i, key in enumerate(self.series):
+            var = ctk.StringVar(value=key)
+            menu = ctk.CTkOptionMenu(
+                self.series_frame,
+                variable=var,
+                values=self.sensor_options,
+                width=120,
+                fg_color=SERIES_COLORS[i],
+                command=lambda value, i=i: self.set_series(i, value),
+            )
+            menu.pack(side="left", padx=3)
+            self.series_menus.append(menu)
+
+    def set_sensor_options(self, options):
+        self.sensor_options = list(options) or list(self.series)
+        for menu in self.series_menus:
+            menu.configure(values=self.sensor_options)
+
+    def set_series(self, index, key):
+        self.series[index] = key
+        self._changed()
+
+    def add_series(self):
+        if len(self.series) >= MAX_SERIES:
+            return
+        unused = [key for key in self.sensor_options if key not in self.series]
+        self.series.append(unused[0] if unused else self.series[-1])
+        self._build_series_menus()
+        self._changed()
+
+    def remove_series(self):
+        if len(self.series) <= 1:
+            return
+        self.series.pop()
+        self._build_series_menus()
+        self._changed()
+
+    def set_layout(self, layout):
+        self.layout = layout
+        self._changed()
+
+    def set_window(self, seconds):
+        self.window = float(seconds)
+        self._changed()
+
+    def _changed(self):
+        self._decimators.clear()
+        self._build_axes()
+        self.canvas.draw_idle()
+
+    def _build_axes(self):
+        self.fig.clear()
+        count = len(self.series)
+        if self.layout == "stacked":
+            self.axes = list(self.fig.subplots(count, 1, sharex=True, squeeze=False)[:, 0])
+            self.fig.subplots_adjust(left=0.1, right=0.97, bottom=0.08, top=0.97, hspace=0.08)
+        else:
+            host = self.fig.add_subplot(111)
+            self.axes = [host]
+            for i in range(1, count):
+                ax = host.twinx()
+                if i > 1:
+                    # Third and later y axes get their own spine, further right each time.
+                    ax.spines["right"].set_position(("axes", 1 + 0.12 * (i - 1)))
+                self.axes.append(ax)
+            self.fig.subplots_adjust(left=0.1, right=max(0.5, 0.9 - 0.1 * max(0, count - 2)), bottom=0.1, top=0.97)
+
+        for ax, color in zip(self.axes, SERIES_COLORS):
+            ax.set_facecolor("#2b2b2b")
+            ax.tick_params(axis="y", labelcolor=color, colors="white")
+            ax.tick_params(axis="x", colors="white")
+            for spine in ax.spines.values():
+                spine.set_color("white")
+            ax.set_xlim(-self.window, 0)
+        if self.layout != "stacked":
+            # Twin axes are transparent so the host's grid and the lines below them show through.
+            for ax in self.axes[1:]:
+                ax.patch.set_visible(False)
+        for ax in (self.axes if self.layout == "stacked" else self.axes[:1]):
+            ax.grid(True, color="#404040", linestyle="--", alpha=0.5)
+        self.axes[-1 if self.layout == "stacked" else 0].set_xlabel(translate("ui_tab_graph_time"), color="white")
+
+        self.lines = [ax.plot([], [], color=color, linewidth=1.5, animated=self.blit)[0]
+                      for ax, color in zip(self.axes, SERIES_COLORS)]
+        self._axes_state = None
+        self._background = None
+        self._width = None
+
     def toggle_pause(self):
         self.paused = not self.paused
         self.btn_pause.configure(text=(translate("ui_tab_graph_play") if self.paused else translate("ui_tab_graph_pause")))
 
+    # --- drawing -----------------------------------------------------------
+
     def update(self):
         if self.paused:
             return
 
-        left_key = self.app.var_graph_left.get()
-        right_key = self.app.var_graph_right.get()
+        wait = self._last_frame + 1.0 / self.max_fps - time.monotonic()
+        if wait > 0:
+            # Too soon; make sure the newest samples still get drawn once the cap allows.
+            if not self._frame_pending:
+                self._frame_pending = True
+                self.frame.after(max(1, int(wait * 1000)), self._deferred_frame)
+            return
+        self._last_frame = time.monotonic()
 
-        data_left = self.app.sensor_history[left_key]
-        data_right = self.app.sensor_history[right_key]
-        x_data = list(range(len(data_left)))
+        history = self.app.sensor_history
+        newest = [history.timestamps(key)[-1] for key in self.series if len(history.timestamps(key))]
+        if not newest:
+            return
+        # The right edge is the newest sample, so a stalled connection leaves the trace in view.
+        now = max(newest)
+        start = now - self.window
 
-        self.line_rpm.set_data(x_data, data_left)
-        self.line_speed.set_data(x_data, data_right)
+        width = max(WIDTH_STEP_PX, round(self.axes[0].bbox.width / WIDTH_STEP_PX) * WIDTH_STEP_PX)
+        if width != self._width:
+            self._width = width
+            self._decimators.clear()
+        points = width if self.decimation == "lttb" else width // 2
 
-        if data_left:
-            max_l = max(data_left) if max(data_left) > 0 else 100
-            self.ax1.set_ylim(0, max_l * 1.2)
-            self.ax1.set_xlim(0, len(data_left))
+        limits = []
+        for key, ax, line in zip(self.series, self.axes, self.lines):
+            times = history.timestamps(key)
+            values = history.values(key)
+            decimator = self._decimators.get(key)
+            if decimator is None:
+                decimator = self._decimators[key] = StreamingDecimator(self.window / points, self.decimation)
+            # Samples before the decimator's open buckets are already in its picks.
+            first = int(np.searchsorted(times, max(start, decimator.resume_time())))
+            x, y = decimator.update(times[first:], values[first:])
+            decimator.trim(start)
+            keep = x >= start
+            x, y = x[keep], y[keep]
+            line.set_data(x - now, y)
+            limits.append(axis_range(y, ax.get_ylim()))
 
-        if data_right:
-            max_r = max(data_right) if max(data_right) > 0 else 100
-            self.ax2.set_ylim(0, max_r * 1.2)
-            self.ax2.set_xlim(0, len(data_right))
+        names = tuple(self.app.sensor_state[key]["name"] if key in self.app.sensor_state else key for key in self.series)
+        axes_state = (tuple(limits), names)
+        if axes_state != self._axes_state:
+            self._axes_state = axes_state
+            for ax, (bottom, top), name, color in zip(self.axes, limits, names, SERIES_COLORS):
+                ax.set_ylim(bottom, top)
+                ax.set_ylabel(name, color=color, fontsize=10, fontweight="bold")
+            # Full render; _on_draw caches the new background and blits the lines onto it.
+            self.canvas.draw_idle()
+            return
 
-        name_left = self.app.sensor_state[left_key]["name"] if left_key in self.app.sensor_state else left_key
-        name_right = self.app.sensor_state[right_key]["name"] if right_key in self.app.sensor_state else right_key
+        if not self.blit:
+            self.canvas.draw_idle()
+        elif self._background is not None:
+            self._blit_lines()
 
-        self.ax1.set_ylabel(name_left, color="#3498db", fontsize=10, fontweight="bold")
-        self.ax2.set_ylabel(name_right, color="#e74c3c", fontsize=10, fontweight="bold")
+    def _deferred_frame(self):
+        self._frame_pending = False
+        self.update()
 
-        self.canvas.draw_idle()
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._blit_lines()
+
+    def _blit_lines(self):
+        self.canvas.restore_region(self._background)
+        for ax, line in zip(self.axes, self.lines):
+            ax.draw_artist(line)
+        self.canvas.blit(self.fig.bbox)
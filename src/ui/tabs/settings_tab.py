@@ -1,9 +1,15 @@
 import customtkinter as ctk
-import os
-import json
+from tkinter import filedialog, messagebox
 from config_manager import ConfigManager
 from constants import PRO_PACK_DIR
+from obd_handler import TRANSPORTS, TRANSPORT_PYTHON_OBD
+from data_logger import LOG_FORMATS
+from trip_log import export_csv, BINARY_EXTENSION
+from log_rotation import available_compressions, COMPRESSED_SUFFIXES
 from ui.theme import ThemeManager
+from ui.widgets.virtual_list import VirtualList
+from sensor_search import SensorIndex
+from pack_loader import pack_key
 from elm import Elm
 import threading
 import socket
@@ -38,10 +44,20 @@ def _next_free_port(host: str, start_port: int, max_tries: int = 200) -> int:
                     pass
     raise RuntimeError("no free port found")
 
+# Pack filter entry that lists every sensor.
+FILTER_ALL = "All"
+# Milliseconds of typing pause before the sensor list is filtered.
+SEARCH_DELAY_MS = 150
+
+
 class SettingsTab:
     def __init__(self, parent_frame, app_instance):
         self.frame = parent_frame
         self.app = app_instance
+        self.sensor_index = None
+        self._indexed_state = None
+        self._listed_keys = []
+        self._search_job = None
 
         frame_top = ctk.CTkFrame(self.frame, fg_color="transparent")
         frame_top.pack(fill="x", padx=20, pady=10)
@@ -60,6 +76,17 @@ class SettingsTab:
         combo_lang_label.pack(side="left", padx=5)
         self.combo_lang.pack(side="left", padx=5)
 
+        self.var_transport = ctk.StringVar(value=self.app.config.get("transport", TRANSPORT_PYTHON_OBD))
+        ctk.CTkLabel(frame_top, text=translate("ui_tab_settings_transport"), font=("Arial", 12)).pack(side="left", padx=5)
+        self.combo_transport = ctk.CTkOptionMenu(
+            frame_top,
+            variable=self.var_transport,
+            values=list(TRANSPORTS),
+            command=lambda t: (self.app.config.update({"transport": t}), ConfigManager.save_config(self.app.config)),
+            width=100,
+        )
+        self.combo_transport.pack(side="left", padx=5)
+
         self.filter_var = ctk.StringVar(value="Standard")
         ctk.CTkLabel(frame_top, text=translate("ui_tab_settings_show_pack"), font=("Arial", 12)).pack(side="left", padx=5)
         self.app.combo_filter = ctk.CTkOptionMenu(
@@ -141,13 +168,19 @@ class SettingsTab:
         ctk.CTkLabel(header_frame, text=translate("ui_tab_settings_sensors_limit"), width=80).pack(side="right", padx=5)
         ctk.CTkLabel(header_frame, text=translate("ui_tab_settings_sensors_name"), width=200, anchor="w").pack(side="left", padx=10)
 
-        self.settings_scroll = ctk.CTkScrollableFrame(self.frame)
-        self.settings_scroll.pack(fill="both", expand=True, padx=20, pady=5)
+        # No textvariable: CTkEntry doesn't draw its placeholder while one is set.
+        self.search_entry = ctk.CTkEntry(
+            header_frame,
+            placeholder_text=translate("ui_tab_settings_sensors_search"),
+            width=200,
+            height=24,
+        )
+        self.search_entry.pack(side="left", padx=5, pady=3)
+        self.search_entry.bind("<KeyRelease>", self._schedule_search)
 
-        self.settings_scroll.grid_columnconfigure(0, weight=1)
-        self.settings_scroll.grid_columnconfigure(1, minsize=80)
-        self.settings_scroll.grid_columnconfigure(2, minsize=60)
-        self.settings_scroll.grid_columnconfigure(3, minsize=60)
+        # Only the rows on screen exist as widgets; see VirtualList.
+        self.sensor_list = VirtualList(self.frame, self._make_sensor_row, self._bind_sensor_row)
+        self.sensor_list.pack(fill="both", expand=True, padx=20, pady=5)
 
         self.refresh_settings_list()
 
@@ -158,6 +191,27 @@ class SettingsTab:
         self.app.lbl_path = ctk.CTkLabel(frame_log, text=translate("ui_tab_settings_log_path").format(self.app.logger.log_dir))
         self.app.lbl_path.pack(side="left", padx=10)
         ctk.CTkButton(frame_log, text=translate("ui_tab_settings_log_change_folder"), command=self.app.change_log_folder).pack(side="right", padx=10)
+        ctk.CTkButton(frame_log, text=translate("ui_tab_settings_log_export_csv"), command=self.export_log_to_csv).pack(side="right", padx=10)
+
+        self.var_log_format = ctk.StringVar(value=self.app.logger.log_format)
+        ctk.CTkOptionMenu(
+            frame_log,
+            variable=self.var_log_format,
+            values=list(LOG_FORMATS),
+            command=self.change_log_format,
+            width=90,
+        ).pack(side="right", padx=5)
+        ctk.CTkLabel(frame_log, text=translate("ui_tab_settings_log_format")).pack(side="right", padx=5)
+
+        self.var_log_compression = ctk.StringVar(value=self.app.logger.compression)
+        ctk.CTkOptionMenu(
+            frame_log,
+            variable=self.var_log_compression,
+            values=available_compressions(),
+            command=self.change_log_compression,
+            width=80,
+        ).pack(side="right", padx=5)
+        ctk.CTkLabel(frame_log, text=translate("ui_tab_settings_log_compression")).pack(side="right", padx=5)
 
         ctk.CTkSwitch(
             frame_log,
@@ -166,6 +220,30 @@ class SettingsTab:
             command=self.app.refresh_dev_mode_visibility,
         ).pack(side="right", padx=20)
 
+    def change_log_format(self, log_format):
+        self.app.logger.set_format(log_format)
+        self.app.config["log_format"] = log_format
+        ConfigManager.save_config(self.app.config)
+
+    def change_log_compression(self, compression):
+        self.app.logger.set_rotation(self.app.logger.rotate_bytes, self.app.logger.rotate_seconds, compression)
+        self.app.config["log_compression"] = compression
+        ConfigManager.save_config(self.app.config)
+
+    def export_log_to_csv(self):
+        patterns = ["*" + BINARY_EXTENSION] + ["*" + BINARY_EXTENSION + suffix for suffix in COMPRESSED_SUFFIXES.values()]
+        path = filedialog.askopenfilename(
+            initialdir=self.app.logger.log_dir,
+            filetypes=[(translate("ui_tab_settings_log_binary_files"), " ".join(patterns))],
+        )
+        if not path:
+            return
+        try:
+            csv_path = export_csv(path)
+            messagebox.showinfo(translate("ui_tab_settings_log_export_csv"), csv_path)
+        except Exception as e:
+            messagebox.showerror(translate("ui_tab_settings_log_export_csv"), str(e))
+
     def _build_sim_section(self):
         sim = ctk.CTkFrame(self.frame)
         sim.pack(fill="x", padx=20, pady=(10, 0))
@@ -238,47 +316,61 @@ class SettingsTab:
         self.sim = None
         self._sync_sim_button()
 
-    def refresh_settings_list(self, choice=None):
-        for widget in self.settings_scroll.winfo_children():
-            widget.destroy()
-
-        target_pack = self.filter_var.get()
-        row_idx = 0
+    def _make_sensor_row(self, parent):
+        row = {"data": None}
+        row["show"] = ctk.CTkCheckBox(parent, text="", width=20, command=self.app.mark_dashboard_dirty)
+        row["show"].pack(side="right", padx=15)
+        row["log"] = ctk.CTkCheckBox(parent, text="", width=20)
+        row["log"].pack(side="right", padx=15)
+        row["limit"] = ctk.CTkEntry(parent, width=60)
+        row["limit"].pack(side="right", padx=5)
+        row["name"] = ctk.CTkLabel(parent, text="", anchor="w")
+        row["name"].pack(side="left", fill="x", expand=True, padx=10)
+        return row
+
+    def _bind_sensor_row(self, row, key):
+        data = self.app.sensor_state[key]
+        if row["data"] is data:
+            return
+        row["data"] = data
+        row["name"].configure(text=data["name"])
+        row["limit"].configure(textvariable=data["limit_var"])
+        row["log"].configure(variable=data["log_var"])
+        row["show"].configure(variable=data["show_var"])
+
+    def _ensure_index(self):
+        # sensor_state is replaced whenever sensor definitions are reloaded.
+        if self._indexed_state is not self.app.sensor_state:
+            self._indexed_state = self.app.sensor_state
+            self.sensor_index = SensorIndex(
+                (cmd, data["name"], self.app.sensor_sources.get(cmd, "Standard"))
+                for cmd, data in self.app.sensor_state.items()
+            )
 
-        items_to_show = []
-        for cmd, data in self.app.sensor_state.items():
-            src = self.app.sensor_sources.get(cmd, "Standard")
-            if target_pack == "All (Slow)" or src == target_pack:
-                items_to_show.append((cmd, data))
+    def _schedule_search(self, *args):
+        if self._search_job is not None:
+            self.frame.after_cancel(self._search_job)
+        self._search_job = self.frame.after(SEARCH_DELAY_MS, self.refresh_settings_list)
 
-        for cmd, data in items_to_show:
-            ctk.CTkLabel(self.settings_scroll, text=data["name"], anchor="w").grid(
-                row=row_idx, column=0, sticky="w", padx=10, pady=2
-            )
-            ctk.CTkEntry(self.settings_scroll, textvariable=data["limit_var"], width=60).grid(
-                row=row_idx, column=1, padx=5, pady=2
-            )
-            ctk.CTkCheckBox(self.settings_scroll, text="", variable=data["log_var"], width=20).grid(
-                row=row_idx, column=2, padx=15, pady=2
-            )
-            ctk.CTkCheckBox(
-                self.settings_scroll,
-                text="",
-                variable=data["show_var"],
-                command=self.app.mark_dashboard_dirty,
-                width=20,
-            ).grid(row=row_idx, column=3, padx=15, pady=2)
-            row_idx += 1
+    def refresh_settings_list(self, choice=None):
+        self._search_job = None
+        self._ensure_index()
+        target_pack = self.filter_var.get()
+        positions = self.sensor_index.search(self.search_entry.get(),
+                                             source=None if target_pack == FILTER_ALL else target_pack)
+        self._listed_keys = self.sensor_index.keys(positions)
+        self.sensor_list.set_items(self._listed_keys)
 
     def toggle_all(self, type_str, state):
-        target_pack = self.filter_var.get()
-        for cmd, data in self.app.sensor_state.items():
-            src = self.app.sensor_sources.get(cmd, "Standard")
-            if target_pack == "All (Slow)" or src == target_pack:
-                if type_str == "show":
-                    data["show_var"].set(state)
-                elif type_str == "log":
-                    data["log_var"].set(state)
+        """Applies to the sensors currently listed, i.e. the selected pack narrowed by the search."""
+        for cmd in self._listed_keys:
+            data = self.app.sensor_state.get(cmd)
+            if data is None:
+                continue
+            if type_str == "show":
+                data["show_var"].set(state)
+            elif type_str == "log":
+                data["log_var"].set(state)
 
         if type_str == "show":
             self.app.mark_dashboard_dirty()
@@ -296,16 +388,9 @@ class SettingsTab:
         footer = ctk.CTkFrame(window, height=50)
         footer.pack(fill="x", side="bottom")
 
-        enabled_packs = self.app.config.get("enabled_packs", [])
+        enabled_packs = {pack_key(rel) for rel in self.app.config.get("enabled_packs", [])}
 
-        available_files = []
-        if os.path.exists(PRO_PACK_DIR):
-            for root, dirs, files in os.walk(PRO_PACK_DIR):
-                for f in files:
-                    if f.endswith(".json") or f.endswith(".obd"):
-                        full = os.path.join(root, f)
-                        rel = os.path.relpath(full, PRO_PACK_DIR)
-                        available_files.append(rel)
+        available_files = self.app.pack_loader.available()
 
         if not available_files:
             ctk.CTkLabel(scroll, text=translate("ui_tab_settings_pack_manager_no_files_found")).pack()
@@ -330,14 +415,7 @@ class SettingsTab:
             row = ctk.CTkFrame(scroll)
             row.pack(fill="x", pady=2)
 
-            is_checked = False
-            norm_f = os.path.normpath(f)
-            for enabled in enabled_packs:
-                if os.path.normpath(enabled) == norm_f:
-                    is_checked = True
-                    break
-
-            var = ctk.BooleanVar(value=is_checked)
+            var = ctk.BooleanVar(value=pack_key(f) in enabled_packs)
             pack_vars[f] = var
             ctk.CTkCheckBox(row, text=f, variable=var).pack(side="left", padx=10, pady=5)
 
@@ -348,7 +426,7 @@ class SettingsTab:
         if "Standard" in packs:
             packs.remove("Standard")
             packs.insert(0, "Standard")
-        packs.insert(0, "All (Slow)")
+        packs.insert(0, FILTER_ALL)
         self.app.combo_filter.configure(values=packs)
         if self.filter_var.get() not in packs:
             self.filter_var.set("Standard")
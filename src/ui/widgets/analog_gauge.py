@@ -1,15 +1,33 @@
+import time
 import tkinter as tk
 import customtkinter as ctk
+from constants import GAUGE_MAX_FPS
 from ui.theme import ThemeManager
 
+# The arc moves in steps of this many degrees; smaller changes don't redraw it.
+ARC_STEP_DEGREES = 1.0
+
+
 class AnalogGauge(ctk.CTkFrame):
-    def __init__(self, parent, width=150, height=150, min_val=0, max_val=100, unit=""):
+    """
+    Arc gauge on a Tk canvas. update_value() works out what the gauge would
+    show (arc extent rounded to ARC_STEP_DEGREES, value text, colour) and
+    only talks to Tk when that differs from what is drawn. Redraws are also
+    limited to max_fps per gauge; values arriving faster are coalesced and the
+    latest one is drawn when the interval is up.
+    """
+
+    def __init__(self, parent, width=150, height=150, min_val=0, max_val=100, unit="", max_fps=GAUGE_MAX_FPS):
         super().__init__(parent, width=width, height=height, fg_color="transparent")
 
         self.min_val = min_val
         self.max_val = max_val
         self.unit = unit
         self.current_value = min_val
+        self.max_fps = max_fps
+        self._drawn = None          # (extent, text, color) currently on the canvas
+        self._last_draw = 0.0
+        self._pending = None        # after() id of a coalesced redraw
 
         self.canvas = tk.Canvas(
             self,
@@ -31,15 +49,18 @@ class AnalogGauge(ctk.CTkFrame):
         self.text_unit = self.canvas.create_text(0, 0, text=unit, font=("Arial", 10))
 
         self.redraw_colors()
-        self.update_value(self.min_val)
 
     def redraw_colors(self):
         try:
+            # Looked up here, once per theme change, rather than on every value.
+            self.color_normal = ThemeManager.get("ACCENT")
+            self.color_warning = ThemeManager.get("WARNING")
+
             self.canvas.configure(bg=ThemeManager.get("GAUGE_BG"))
 
             self.canvas.itemconfigure(self.bg_arc, outline=ThemeManager.get("ACCENT_DIM"))
-            self.canvas.itemconfigure(self.active_arc, outline=ThemeManager.get("ACCENT"))
-            self.canvas.itemconfigure(self.text_val, fill=ThemeManager.get("ACCENT"))
+            self.canvas.itemconfigure(self.active_arc, outline=self.color_normal)
+            self.canvas.itemconfigure(self.text_val, fill=self.color_normal)
             self.canvas.itemconfigure(self.text_unit, fill=ThemeManager.get("TEXT_DIM"))
 
             p = self.padding
@@ -53,33 +74,64 @@ class AnalogGauge(ctk.CTkFrame):
             self.canvas.itemconfigure(self.bg_arc, start=self.arc_start, extent=self.arc_extent)
             self.canvas.itemconfigure(self.active_arc, start=self.arc_start)
 
-            self.update_value(self.current_value)
+            self._drawn = None
+            self._draw()
         except Exception:
             pass
 
+    def set_range(self, min_val, max_val, unit=""):
+        """Rebinds the gauge to another scale, e.g. when its dashboard card shows a different sensor."""
+        self.min_val = min_val
+        self.max_val = max_val
+        self.unit = unit
+        self.canvas.itemconfigure(self.text_unit, text=unit)
+        self._draw()
+
     def update_value(self, value):
+        self.current_value = value
+        if self._pending is not None:
+            return
+        wait = self._last_draw + 1.0 / self.max_fps - time.monotonic() if self.max_fps else 0
+        if wait > 0:
+            self._pending = self.after(max(1, int(wait * 1000)), self._draw_pending)
+            return
+        self._draw()
+
+    def _draw_pending(self):
+        self._pending = None
+        self._draw()
+
+    def _face(self, value):
+        """(arc extent, text, color) the gauge shows for value."""
+        if self.max_val <= self.min_val: self.max_val = self.min_val + 1
+
+        if value < self.min_val: value = self.min_val
+        if value > self.max_val: value = self.max_val
+
+        pct = (value - self.min_val) / (self.max_val - self.min_val)
+        angle = -round(pct * self.arc_extent / ARC_STEP_DEGREES) * ARC_STEP_DEGREES
+
+        color = self.color_warning if pct > 0.90 else self.color_normal
+
+        if isinstance(value, float) and abs(value) < 10:
+            text_str = f"{value:.1f}"
+        else:
+            text_str = str(int(value))
+        return angle, text_str, color
+
+    def _draw(self):
         try:
-            self.current_value = value
-
-            if self.max_val <= self.min_val: self.max_val = self.min_val + 1
-
-            if value < self.min_val: value = self.min_val
-            if value > self.max_val: value = self.max_val
-
-            pct = (value - self.min_val) / (self.max_val - self.min_val)
-            angle = -1 * (pct * self.arc_extent)
-
-            color = ThemeManager.get("ACCENT")
-            if pct > 0.90:
-                color = ThemeManager.get("WARNING")
-
-            self.canvas.itemconfigure(self.active_arc, extent=angle, outline=color)
-
-            if isinstance(value, float) and abs(value) < 10:
-                text_str = f"{value:.1f}"
-            else:
-                text_str = str(int(value))
-
-            self.canvas.itemconfigure(self.text_val, text=text_str, fill=color)
+            face = self._face(self.current_value)
+            drawn = self._drawn or (None, None, None)
+            if face == drawn:
+                return
+            self._last_draw = time.monotonic()
+            angle, text_str, color = face
+
+            if angle != drawn[0] or color != drawn[2]:
+                self.canvas.itemconfigure(self.active_arc, extent=angle, outline=color)
+            if text_str != drawn[1] or color != drawn[2]:
+                self.canvas.itemconfigure(self.text_val, text=text_str, fill=color)
+            self._drawn = face
         except Exception:
             pass
\ No newline at end of file
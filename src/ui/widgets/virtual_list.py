@@ -0,0 +1,98 @@
+import math
+import customtkinter as ctk
+
+
+class VirtualList(ctk.CTkFrame):
+    """
+    Scrollable list that only has widgets for the rows on screen. Rows are
+    fixed height; make_row(parent) builds one row's widgets once and
+    bind_row(row, item) points them at an item. Scrolling rebinds the pooled
+    rows instead of moving or creating widgets, so the cost of showing the
+    list doesn't depend on how many items it has.
+    """
+
+    def __init__(self, parent, make_row, bind_row, row_height=32, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.make_row = make_row
+        self.bind_row = bind_row
+        self.row_height = row_height
+        self.items = []
+        self.top = 0
+        self.rows = []          # (frame, row widgets) in screen order
+
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True)
+        self.body.grid_columnconfigure(0, weight=1)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.body.bind("<Configure>", self._on_resize)
+        self._bind_wheel(self.body)
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel)
+        widget.bind("<Button-4>", lambda e: self.scroll_to(self.top - 3))
+        widget.bind("<Button-5>", lambda e: self.scroll_to(self.top + 3))
+
+    def _bind_wheel_tree(self, widget):
+        self._bind_wheel(widget)
+        for child in widget.winfo_children():
+            self._bind_wheel_tree(child)
+
+    def visible_rows(self):
+        return len(self.rows)
+
+    def set_items(self, items):
+        self.items = list(items)
+        self.scroll_to(min(self.top, self._max_top()))
+
+    def _max_top(self):
+        return max(0, len(self.items) - len(self.rows))
+
+    def scroll_to(self, top):
+        self.top = max(0, min(int(top), self._max_top()))
+        self._render()
+
+    def _render(self):
+        for i, (frame, row) in enumerate(self.rows):
+            index = self.top + i
+            if index < len(self.items):
+                self.bind_row(row, self.items[index])
+                frame.grid()
+            else:
+                frame.grid_remove()
+        total = len(self.items)
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + len(self.rows)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_resize(self, event):
+        wanted = max(1, math.ceil(event.height / self.row_height))
+        if wanted == len(self.rows):
+            return
+        while len(self.rows) < wanted:
+            frame = ctk.CTkFrame(self.body, fg_color="transparent", height=self.row_height)
+            frame.grid(row=len(self.rows), column=0, sticky="ew")
+            frame.grid_propagate(False)
+            row = self.make_row(frame)
+            self._bind_wheel_tree(frame)
+            self.rows.append((frame, row))
+        while len(self.rows) > wanted:
+            frame, _ = self.rows.pop()
+            frame.destroy()
+        self.scroll_to(self.top)
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(round(float(args[1]) * len(self.items)))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (len(self.rows) if args[2] == "pages" else 1)
+            self.scroll_to(self.top + step)
+
+    def _on_wheel(self, event):
+        if not event.delta:
+            return
+        # Windows reports multiples of 120 per notch, macOS small values.
+        steps = int(event.delta / 120) if abs(event.delta) >= 120 else (1 if event.delta > 0 else -1)
+        self.scroll_to(self.top - 3 * steps)
@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+import time
+
+from constants import VEHICLE_CACHE_FILE
+
+
+def encode_supported(commands):
+    """Packs supported OBD commands into {mode: hex bitmap of PIDs}."""
+    bitmaps = {}
+    for cmd in commands:
+        mode, pid = cmd.mode, cmd.pid
+        if mode is None or pid is None:
+            continue
+        bitmaps[mode] = bitmaps.get(mode, 0) | (1 << pid)
+    return {str(mode): format(bits, "x") for mode, bits in bitmaps.items()}
+
+
+def decode_supported(bitmaps, command_table):
+    """Inverse of encode_supported; command_table is obd.commands."""
+    supported = set(command_table.base_commands())
+    for mode_str, hex_bits in bitmaps.items():
+        mode = int(mode_str)
+        bits = int(hex_bits, 16)
+        pid = 0
+        while bits:
+            if bits & 1 and command_table.has_pid(mode, pid):
+                supported.add(command_table[mode][pid])
+            bits >>= 1
+            pid += 1
+    return supported
+
+
+class VehicleProfileCache:
+    """
+    Remembers what we learned about each car so a reconnect can skip protocol
+    detection and PID discovery. Profiles are keyed by VIN when the ECU gives
+    one, otherwise by adapter + protocol, and each adapter remembers the last
+    profile it was used with.
+    """
+
+    def __init__(self, path=VEHICLE_CACHE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self._data = None
+
+    def _load(self):
+        if self._data is not None:
+            return self._data
+        self._data = {"profiles": {}, "ports": {}}
+        try:
+            with open(self.path, 'r') as f:
+                loaded = json.load(f)
+            self._data["profiles"].update(loaded.get("profiles", {}))
+            self._data["ports"].update(loaded.get("ports", {}))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error loading vehicle cache: {e}")
+        return self._data
+
+    def _save(self):
+        try:
+            folder = os.path.dirname(self.path)
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Error saving vehicle cache: {e}")
+
+    @staticmethod
+    def make_key(vin, port_key, protocol_id):
+        if vin:
+            return f"VIN:{vin}"
+        return f"PORT:{port_key}|{protocol_id}"
+
+    def lookup_port(self, port_key):
+        """The profile last used on this adapter/port, or None."""
+        with self.lock:
+            data = self._load()
+            key = data["ports"].get(port_key)
+            if key is None:
+                return None
+            profile = data["profiles"].get(key)
+            return dict(profile) if profile else None
+
+    def get(self, key):
+        with self.lock:
+            profile = self._load()["profiles"].get(key)
+            return dict(profile) if profile else None
+
+    def store(self, port_key, profile):
+        with self.lock:
+            data = self._load()
+            profile = dict(profile)
+            profile["updated"] = time.time()
+            data["profiles"][profile["key"]] = profile
+            data["ports"][port_key] = profile["key"]
+            self._save()
+
+    def update_pro_support(self, key, pro_support):
+        """Merges the pack-PID support results of the session into a stored profile."""
+        with self.lock:
+            profile = self._load()["profiles"].get(key)
+            if profile is None:
+                return
+            merged = dict(profile.get("pro_support", {}))
+            merged.update(pro_support)
+            if merged == profile.get("pro_support"):
+                return
+            profile["pro_support"] = merged
+            self._save()
+
+    def forget(self, key):
+        with self.lock:
+            data = self._load()
+            data["profiles"].pop(key, None)
+            for port, mapped in list(data["ports"].items()):
+                if mapped == key:
+                    del data["ports"][port]
+            self._save()
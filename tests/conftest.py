@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The application is started from src/ and imports its own modules by bare
+# name (e.g. "from constants import ..."), so make them resolvable here too.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
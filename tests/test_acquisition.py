@@ -0,0 +1,107 @@
+import unittest
+import threading
+import time
+from src.obd_handler import OBDHandler
+from src.acquisition import AcquisitionEngine
+
+
+class TestAcquisitionEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = OBDHandler(simulation=True)
+        self.engine = AcquisitionEngine(self.handler, idle_interval=0.01)
+
+    def tearDown(self):
+        self.engine.stop()
+
+    def test_publishes_snapshots_for_requested_sensors(self):
+        self.assertTrue(self.engine.connect())
+        self.engine.set_sensors(["RPM", "SPEED"])
+        self.engine.start()
+
+        snap = self.engine.wait_for_snapshot(timeout=2)
+        self.assertIsNotNone(snap, "No snapshot published")
+        self.assertIn("RPM", snap.values)
+        self.assertIn("SPEED", snap.values)
+        self.assertGreater(snap.timestamp, 0)
+
+        newer = self.engine.wait_for_snapshot(after_seq=snap.seq, timeout=2)
+        self.assertIsNotNone(newer)
+        self.assertGreater(newer.seq, snap.seq)
+        self.assertGreaterEqual(newer.timestamp, snap.timestamp)
+
+    def test_listeners_see_every_snapshot(self):
+        seen = []
+        self.engine.add_listener(lambda snap: seen.append(snap.seq))
+        self.engine.add_listener(lambda snap: 1 / 0)  # a broken listener must not stop polling
+        self.engine.connect()
+        self.engine.set_sensors(["RPM"])
+        self.engine.start()
+
+        snap = self.engine.wait_for_snapshot(timeout=2)
+        snap = self.engine.wait_for_snapshot(after_seq=snap.seq, timeout=2)
+        self.assertIsNotNone(snap)
+        # Listeners run right after the snapshot is published, so only the older ones are certain.
+        self.assertEqual(seen[:snap.seq - 1], list(range(1, snap.seq)))
+        self.assertAlmostEqual(snap.timestamp_ns / 1e9, snap.timestamp, places=6)
+
+    def test_updates_since_covers_every_batch(self):
+        """Batches published between two UI frames must all reach the UI, not just the newest one."""
+        engine = AcquisitionEngine(self.handler, idle_interval=0.01, max_batch=1)
+        try:
+            engine.connect()
+            engine.set_sensors(["RPM", "SPEED", "COOLANT_TEMP"])
+            engine.start()
+            snap = engine.wait_for_snapshot(timeout=2)
+            while snap is not None and snap.seq < 3:
+                snap = engine.wait_for_snapshot(after_seq=snap.seq, timeout=2)
+            self.assertIsNotNone(snap)
+
+        finally:
+            engine.stop()
+
+        latest, updated = engine.updates_since(0)
+        self.assertEqual(len(latest.updated), 1)
+        self.assertEqual(set(updated), {"RPM", "SPEED", "COOLANT_TEMP"})
+        self.assertTrue(all(0 < ts <= latest.timestamp for ts in updated.values()))
+        # Nothing is reported twice once the UI has caught up.
+        self.assertEqual(engine.updates_since(latest.seq)[1], {})
+
+    def test_idle_when_disconnected(self):
+        self.engine.set_sensors(["RPM"])
+        self.engine.start()
+        self.assertIsNone(self.engine.wait_for_snapshot(timeout=0.1))
+
+    def test_exclusive_blocks_polling(self):
+        """While a caller holds exclusive(), the poll loop must not touch the adapter."""
+        self.engine.connect()
+        self.engine.set_sensors(["RPM"])
+        calls = []
+        original = self.handler.query_sensors
+
+        def tracking_query(keys):
+            calls.append(threading.current_thread().name)
+            return original(keys)
+
+        self.handler.query_sensors = tracking_query
+        with self.engine.exclusive():
+            self.engine.start()
+            time.sleep(0.1)
+            self.assertEqual(calls, [])
+
+        self.assertIsNotNone(self.engine.wait_for_snapshot(timeout=2))
+        self.assertIn("obd-acquisition", calls)
+
+    def test_disconnect_clears_latest(self):
+        self.engine.connect()
+        self.engine.set_sensors(["RPM"])
+        self.engine.start()
+        self.assertIsNotNone(self.engine.wait_for_snapshot(timeout=2))
+
+        self.engine.disconnect()
+        self.assertFalse(self.handler.is_connected())
+        self.assertIsNone(self.engine.latest())
+
+
+if __name__ == '__main__':
+    unittest.main()
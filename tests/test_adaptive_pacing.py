@@ -0,0 +1,74 @@
+import unittest
+from unittest.mock import MagicMock
+
+import obd
+from src.adaptive_pacing import PacingController, STABLE_STREAK, GAP_STEP, ERROR_BURST
+from src.obd_handler import OBDHandler
+
+
+class TestPacingController(unittest.TestCase):
+
+    def test_backs_off_on_error_burst(self):
+        pacing = PacingController(gap=0.01, timeout_ms=200)
+        changed = [pacing.record(0.02, "STOPPED") for _ in range(ERROR_BURST)]
+
+        self.assertEqual(changed, [False] * (ERROR_BURST - 1) + [True])
+        self.assertAlmostEqual(pacing.gap, 0.02)
+        self.assertEqual(pacing.timeout_ms, 300)
+        self.assertEqual(pacing.backoffs, 1)
+
+    def test_no_data_only_counts_when_expected(self):
+        pacing = PacingController()
+        for _ in range(ERROR_BURST * 2):
+            pacing.record(0.02, "NO DATA", expected=False)
+        self.assertEqual(pacing.backoffs, 0)
+
+        for _ in range(ERROR_BURST):
+            pacing.record(0.02, "NO DATA", expected=True)
+        self.assertEqual(pacing.backoffs, 1)
+
+    def test_converges_down_but_not_below_failed_gap(self):
+        pacing = PacingController(gap=0.004, timeout_ms=200)
+        for _ in range(ERROR_BURST):
+            pacing.record(0.01, "BUFFER FULL")
+        floor = pacing.min_gap
+        self.assertAlmostEqual(floor, 0.004 + GAP_STEP)
+
+        for _ in range(STABLE_STREAK * 20):
+            pacing.record(0.01)
+        self.assertAlmostEqual(pacing.gap, floor)
+        # 4x the 10 ms round trip, but never below the timeout that just failed.
+        self.assertEqual(pacing.timeout_ms, 200)
+
+    def test_timeout_follows_latency(self):
+        pacing = PacingController(gap=0.0, timeout_ms=200)
+        for _ in range(STABLE_STREAK):
+            pacing.record(0.02)
+        self.assertEqual(pacing.timeout_ms, 80)
+        self.assertEqual(pacing.at_st_command(), b"AT ST 14")
+
+    def test_fixed_pacing(self):
+        pacing = PacingController(gap=0.005, adaptive=False)
+        for _ in range(ERROR_BURST):
+            self.assertFalse(pacing.record(0.01, "STOPPED"))
+        self.assertEqual(pacing.gap, 0.005)
+
+    def test_handler_sends_at_st_after_backoff(self):
+        handler = OBDHandler(simulation=False)
+        handler.pacing = PacingController(gap=0.0)
+        handler.status = "Connected"
+        handler.active_header = "7DF"
+        handler.connection = MagicMock()
+        handler.connection.last_error = "STOPPED"
+        handler.connection.query.return_value.is_null.return_value = True
+        handler.supported_commands = {obd.commands.RPM}
+
+        for _ in range(ERROR_BURST):
+            self.assertIsNone(handler.query_sensor("RPM"))
+
+        sent = [c.args[0].command for c in handler.connection.query.call_args_list]
+        self.assertEqual(sent[-1], b"AT ST 4B")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+
+import numpy as np
+from src.axis_scale import axis_range, nice_ceiling
+
+
+class TestAxisScale(unittest.TestCase):
+
+    def test_nice_ceiling_rounds_to_1_2_5(self):
+        cases = {1: 1, 1.1: 2, 2: 2, 2.5: 5, 7: 10, 12: 20, 480: 500, 5001: 10000, 0.3: 0.5, 0.07: 0.1}
+        for value, expected in cases.items():
+            self.assertAlmostEqual(nice_ceiling(value), expected, msg=value)
+
+    def test_range_from_zero_with_headroom(self):
+        self.assertEqual(axis_range(np.array([0.0, 40.0, 90.0]), (0, 1)), (0, 200))
+        self.assertEqual(axis_range(np.array([10.0, 3000.0]), (0, 1)), (0, 5000))
+
+    def test_current_limits_kept_while_data_fits(self):
+        self.assertEqual(axis_range(np.array([5.0, 120.0]), (0, 200)), (0, 200))
+        self.assertEqual(axis_range(np.array([-30.0, 70.0]), (-50, 100)), (-50, 100))
+        # Too small for the current axis: shrinks.
+        self.assertEqual(axis_range(np.array([5.0, 40.0]), (0, 200)), (0, 50))
+        # Outgrows it: grows.
+        self.assertEqual(axis_range(np.array([5.0, 210.0]), (0, 200)), (0, 500))
+
+    def test_negative_values(self):
+        self.assertEqual(axis_range(np.array([-40.0, 90.0]), (0, 1)), (-50, 200))
+        self.assertEqual(axis_range(np.array([-400.0, 10.0]), (-50, 200)), (-500, 20))
+
+    def test_nothing_above_zero(self):
+        self.assertEqual(axis_range(np.array([-25.0, -3.0]), (0, 100)), (-50, 0))
+        self.assertEqual(axis_range(np.array([0.0, 0.0]), (0, 1)), (0, 100))
+
+    def test_no_data_keeps_limits(self):
+        self.assertEqual(axis_range(np.array([]), (-5, 5)), (-5, 5))
+
+
+if __name__ == '__main__':
+    unittest.main()
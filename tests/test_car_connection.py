@@ -134,6 +134,129 @@ class TestCarConnection(unittest.TestCase):
         self.assertTrue(mock_conn.query.call_count >= 1, "Query not called")
         self.assertEqual(result, 25.8)
 
+    def _batch_handler(self, protocol_id):
+        import obd
+        from obd.protocols.protocol import Message
+        mock_conn = MagicMock()
+        mock_conn.protocol_id.return_value = protocol_id
+        self.handler.connection = mock_conn
+        self.handler.status = "Connected"
+        self.handler.supported_commands = {obd.commands.RPM, obd.commands.SPEED, obd.commands.COOLANT_TEMP}
+
+        msg = Message([])
+        # RPM 0x1AF8 / 4 = 1726, SPEED 0x32 = 50, COOLANT 0x5A - 40 = 50
+        msg.data = bytearray([0x41, 0x0C, 0x1A, 0xF8, 0x0D, 0x32, 0x05, 0x5A])
+        response = MagicMock()
+        response.messages = [msg]
+        mock_conn.query.return_value = response
+        return mock_conn
+
+    def test_batched_mode01_query(self):
+        """On CAN, several Mode 01 PIDs go out in one request and are split back apart."""
+        mock_conn = self._batch_handler("6")
+
+        values = self.handler.query_sensors(["RPM", "SPEED", "COOLANT_TEMP"])
+
+        self.assertEqual(mock_conn.query.call_count, 1)
+        sent = mock_conn.query.call_args[0][0].command
+        self.assertTrue(sent.startswith(b"01"))
+        self.assertEqual(len(sent), 2 + 3 * 2)
+        self.assertEqual(values, {"RPM": 1726.0, "SPEED": 50, "COOLANT_TEMP": 50})
+
+    def test_rejected_batch_falls_back_to_single_queries(self):
+        """NO DATA and 7F replies, as python-obd really parses them, count as failed batches."""
+        import obd
+        from obd.OBDResponse import OBDResponse
+        from obd.protocols import ISO_15765_4_11bit_500k
+        from src.obd_handler import MAX_BATCH_FAILURES
+        mock_conn = self._batch_handler("6")
+        protocol = ISO_15765_4_11bit_500k([])
+        replies = {
+            b"010C0D": [["NO DATA"], ["7E8 03 7F 01 12"]],
+            b"010C": [["7E8 04 41 0C 1A F8"]],
+            b"010D": [["7E8 03 41 0D 32"]],
+        }
+        sent = []
+
+        def query(cmd, force=False):
+            sent.append(cmd.command)
+            options = replies[cmd.command]
+            messages = protocol(options[sum(c == cmd.command for c in sent) % len(options)])
+            return OBDResponse(cmd, messages) if cmd.command == b"010C0D" else cmd(messages)
+
+        mock_conn.query.side_effect = query
+        for _ in range(MAX_BATCH_FAILURES + 2):
+            self.assertEqual(self.handler.query_sensors(["RPM", "SPEED"]), {"RPM": 1726.0, "SPEED": 50})
+
+        self.assertEqual(self.handler.batch_failures, MAX_BATCH_FAILURES)
+        self.assertFalse(self.handler.supports_batching())
+        self.assertEqual(sent.count(b"010C0D"), MAX_BATCH_FAILURES)
+        self.assertEqual(sent[-2:], [b"010C", b"010D"])
+
+    def test_batching_skipped_on_non_can(self):
+        mock_conn = self._batch_handler("3")
+        single = MagicMock()
+        single.is_null.return_value = False
+        single.value.magnitude = 42
+        mock_conn.query.return_value = single
+
+        values = self.handler.query_sensors(["RPM", "SPEED"])
+
+        self.assertEqual(mock_conn.query.call_count, 2)
+        self.assertEqual(values, {"RPM": 42, "SPEED": 42})
+
+    def test_header_switches_grouped(self):
+        """Custom PIDs sharing a header are polled together and AT SH is only sent on change."""
+        mock_conn = MagicMock()
+        mock_conn.protocol_id.return_value = "6"
+        self.handler.connection = mock_conn
+        self.handler.status = "Connected"
+        self.handler.set_pro_definitions({
+            "ECU_A": ["A", "", True, True, 100, "221001", "7E0", "A"],
+            "TCU_B": ["B", "", True, True, 100, "221002", "7E1", "A"],
+            "ECU_C": ["C", "", True, True, 100, "221003", "7E0", "A"],
+        })
+        msg = MagicMock()
+        msg.data = b'\x10'
+        response = MagicMock()
+        response.is_null.return_value = False
+        response.messages = [msg]
+        mock_conn.query.return_value = response
+
+        def headers_sent():
+            return [c[0][0].command for c in mock_conn.query.call_args_list if c[0][0].command.startswith(b"AT SH")]
+
+        values = self.handler.query_sensors(["ECU_A", "TCU_B", "ECU_C"])
+        self.assertEqual(values, {"ECU_A": 16.0, "TCU_B": 16.0, "ECU_C": 16.0})
+        self.assertEqual(headers_sent(), [b"AT SH 7E0", b"AT SH 7E1"])
+        self.assertEqual(self.handler.stats["header_switches_skipped"], 1)
+
+        # Next cycle starts on the header the adapter is already using.
+        self.handler.query_sensors(["ECU_A", "TCU_B", "ECU_C"])
+        self.assertEqual(headers_sent(), [b"AT SH 7E0", b"AT SH 7E1", b"AT SH 7E0"])
+        self.assertEqual(self.handler.stats["header_switches"], 3)
+
+    def test_dtc_scan_restores_29bit_header(self):
+        """On 29-bit CAN the scan addresses 18DAxxF1 modules and then puts the adapter back on 18DB33F1."""
+        import obd
+        mock_conn = MagicMock()
+        mock_conn.is_connected.return_value = True
+        mock_conn.protocol_id.return_value = "7"
+        mock_conn.supported_commands = {obd.commands.RPM}
+        mock_conn.query.return_value.is_null.return_value = True
+        with patch('src.obd_handler.obd.OBD', return_value=mock_conn):
+            self.assertTrue(self.handler.connect("COM3"))
+
+        def headers_sent():
+            return [c[0][0].command for c in mock_conn.query.call_args_list if c[0][0].command.startswith(b"AT SH")]
+
+        self.handler.get_dtc()
+        self.assertEqual(headers_sent(), [b"AT SH 18DA10F1", b"AT SH 18DA18F1", b"AT SH 18DB33F1"])
+
+        self.handler.query_sensor("RPM")
+        self.assertEqual(len(headers_sent()), 3)
+        self.assertEqual(mock_conn.query.call_args[0][0], obd.commands.RPM)
+
     def test_formula_logic(self):
         self.assertEqual(self.handler._calculate_formula("signed(A)", b'\xFF'), -1)
         self.assertAlmostEqual(self.handler._calculate_formula("((A*256)+B)*0.1", b'\x01\xF4'), 50.0)
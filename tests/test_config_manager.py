@@ -0,0 +1,88 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from src.config_manager import ConfigStore
+
+
+class TestConfigStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "config.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _read(self):
+        with open(self.path) as f:
+            return json.load(f)
+
+    def test_saves_coalesced_in_background(self):
+        store = ConfigStore(self.path, delay=0.1)
+        config = {"theme": "Cyber"}
+        for theme in ("Standard", "Racing", "Cyber", "Standard"):
+            config["theme"] = theme
+            self.assertTrue(store.save(config))
+        # Later changes to the dict don't leak into the pending save.
+        config["theme"] = "changed after save"
+        self.assertFalse(os.path.exists(self.path))
+
+        deadline = time.monotonic() + 2
+        while store.write_count == 0 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        time.sleep(0.15)
+        self.assertEqual(store.write_count, 1)
+        self.assertEqual(self._read(), {"theme": "Standard"})
+        self.assertEqual(os.listdir(self.tmp_dir), ["config.json"])
+
+    def test_unchanged_save_is_free(self):
+        with open(self.path, 'w') as f:
+            json.dump({"lang": "en"}, f)
+        store = ConfigStore(self.path, delay=60)
+        config = store.load()
+        self.assertFalse(store.save(config))
+        self.assertTrue(store.save({"lang": "de"}))
+        self.assertFalse(store.save({"lang": "de"}))
+
+    def test_flush_writes_immediately(self):
+        store = ConfigStore(self.path, delay=60)
+        store.save({"port": "COM3"})
+        store.flush()
+        self.assertEqual(self._read(), {"port": "COM3"})
+        self.assertEqual(store.write_count, 1)
+        store.flush()
+        self.assertEqual(store.write_count, 1)
+        self.assertEqual(ConfigStore(self.path).load(), {"port": "COM3"})
+
+    def test_flush_waits_for_background_write(self):
+        store = ConfigStore(self.path, delay=0)
+        taken = threading.Event()
+        release = threading.Event()
+        write = store._write
+
+        def slow_write(seq, data):
+            taken.set()
+            release.wait(2)
+            write(seq, data)
+
+        store._write = slow_write
+        store.save({"port": "COM3"})
+        self.assertTrue(taken.wait(2))
+
+        flusher = threading.Thread(target=store.flush)
+        flusher.start()
+        flusher.join(0.1)
+        self.assertTrue(flusher.is_alive())
+        release.set()
+        flusher.join(2)
+        self.assertFalse(flusher.is_alive())
+        self.assertEqual(self._read(), {"port": "COM3"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.data_logger import DataLogger
+
+
+class TestDataLogger(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.logger = DataLogger(flush_rows=10, flush_interval=0.05, fsync_interval=None)
+        self.logger.set_directory(self.tmp_dir)
+
+    def tearDown(self):
+        self.logger.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _read(self, path):
+        with open(path, newline='') as f:
+            return list(csv.reader(f))
+
+    def test_rows_written_in_order(self):
+        self.logger.start_new_log(["RPM", "SPEED"])
+        for i in range(25):
+            self.logger.write_row({"RPM": 800 + i, "SPEED": i})
+        self.assertTrue(self.logger.flush())
+
+        rows = self._read(self.logger.current_filepath)
+        self.assertEqual(rows[0], ["Timestamp", "RPM", "SPEED"])
+        self.assertEqual(len(rows), 26)
+        self.assertEqual(rows[-1][1:], ["824", "24"])
+
+    def test_close_drains_queue_and_new_log_switches_file(self):
+        with patch("src.data_logger.time.time", return_value=1000):
+            self.logger.start_new_log(["RPM"])
+        first = self.logger.current_filepath
+        self.logger.write_row({"RPM": 1})
+
+        with patch("src.data_logger.time.time", return_value=1001):
+            self.logger.start_new_log(["SPEED"])
+        second = self.logger.current_filepath
+        self.logger.write_row({"SPEED": 7, "RPM": 2})
+        self.assertTrue(self.logger.close())
+
+        self.assertEqual([r[1:] for r in self._read(first)], [["RPM"], ["1"]])
+        self.assertEqual([r[1:] for r in self._read(second)], [["SPEED"], ["7"]])
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        logger = DataLogger(queue_size=2)
+        logger.current_filepath = os.path.join(self.tmp_dir, "unused.csv")
+        logger.active_headers = ["RPM"]
+        for i in range(5):
+            logger.write_row({"RPM": i})
+        self.assertEqual(logger.dropped_rows, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+from src.decimation import StreamingDecimator, lttb, minmax
+
+
+class TestDecimation(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.x = np.arange(20000) / 20.0
+        self.y = np.sin(self.x / 5) * 1000 + rng.normal(0, 20, len(self.x))
+        self.y[12345] = 5000     # a spike that must survive
+
+    def test_lttb_size_endpoints_and_spike(self):
+        x, y = lttb(self.x, self.y, 500)
+        self.assertEqual(len(x), 500)
+        self.assertEqual((x[0], x[-1]), (self.x[0], self.x[-1]))
+        self.assertTrue(np.all(np.diff(x) > 0))
+        self.assertIn(5000, y)
+
+    def test_minmax_keeps_extremes(self):
+        x, y = minmax(self.x, self.y, 500)
+        self.assertLessEqual(len(x), 500)
+        self.assertTrue(np.all(np.diff(x) > 0))
+        self.assertEqual(y.max(), self.y.max())
+        self.assertEqual(y.min(), self.y.min())
+
+    def test_small_input_and_nan(self):
+        x, y = lttb([0, 1, 2], [1, np.nan, 3], 100)
+        self.assertEqual(x.tolist(), [0, 2])
+        self.assertEqual(y.tolist(), [1, 3])
+
+    def test_streaming_matches_one_shot(self):
+        for method in ("lttb", "minmax"):
+            whole = StreamingDecimator(2.0, method)
+            x_all, y_all = whole.update(self.x, self.y)
+
+            chunked = StreamingDecimator(2.0, method)
+            for end in range(100, len(self.x) + 1, 137):
+                # Feed only what the decimator hasn't folded into its picks yet, as GraphTab does.
+                start = int(np.searchsorted(self.x[:end], chunked.resume_time()))
+                chunked.update(self.x[start:end], self.y[start:end])
+            start = int(np.searchsorted(self.x, chunked.resume_time()))
+            x_c, y_c = chunked.update(self.x[start:], self.y[start:])
+
+            np.testing.assert_array_equal(x_c, x_all)
+            np.testing.assert_array_equal(y_c, y_all)
+            self.assertLess(len(x_all), len(self.x) / 10)
+            self.assertIn(5000, y_all)
+
+    def test_streaming_trim(self):
+        decimator = StreamingDecimator(1.0)
+        decimator.update(self.x, self.y)
+        decimator.trim(500.0)
+        self.assertGreaterEqual(min(decimator.xs), 500.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
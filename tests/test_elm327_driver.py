@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import patch
+
+import obd
+from obd.protocols import ECU
+import src.elm327_driver as driver_module
+from src.elm327_driver import NativeELM327
+
+
+class FakePort:
+    """Answers ELM327 requests from a dict, like the adapter would."""
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.requests = []
+        self.pending = bytearray()
+
+    @property
+    def in_waiting(self):
+        return len(self.pending)
+
+    def write(self, data):
+        request = data.strip()
+        self.requests.append(request)
+        if request.startswith(b"AT") and request not in self.replies:
+            reply = b"OK"
+        else:
+            reply = self.replies.get(request, b"?")
+        self.pending += reply + b"\r\r>"
+
+    def readinto(self, view):
+        n = min(len(view), len(self.pending))
+        view[:n] = self.pending[:n]
+        del self.pending[:n]
+        return n
+
+    def reset_input_buffer(self):
+        self.pending.clear()
+
+    def close(self):
+        pass
+
+
+class TestNativeELM327(unittest.TestCase):
+
+    def _connect(self, replies):
+        replies = {b"ATZ": b"ELM327 v1.5", b"0100": b"7E8064100BE3FA813", b"ATDPN": b"A6", **replies}
+        port = FakePort(replies)
+        with patch.object(driver_module.serial, "serial_for_url", return_value=port):
+            conn = NativeELM327("socket://127.0.0.1:35000", timeout=0.2, supported={obd.commands.RPM})
+        return conn, port
+
+    def test_connect_and_single_frame(self):
+        conn, port = self._connect({b"010C": b"7E804410C1AF8\r7E904410C1AF8"})
+        self.assertTrue(conn.is_connected())
+        self.assertEqual(conn.protocol_id(), "6")
+
+        self.assertEqual(conn.query(obd.commands.RPM).value.magnitude, 1726.0)
+        messages, frame_count = conn._parse(conn._exchange(b"010C"))
+        self.assertEqual([m.ecu for m in messages], [ECU.ENGINE, ECU.TRANSMISSION])
+        self.assertEqual(frame_count, 2)
+
+    def test_response_count_hint(self):
+        conn, port = self._connect({b"010C": b"7E804410C1AF8", b"010C1": b"7E804410C1AF8"})
+        conn.query(obd.commands.RPM)
+        conn.query(obd.commands.RPM)
+        self.assertEqual(port.requests[-2:], [b"010C", b"010C1"])
+
+    def test_rejected_hint_is_dropped(self):
+        conn, port = self._connect({b"010C0D": b"7E806410C1AF80D32"})
+        batch = obd.OBDCommand("MULTI", "", b"010C0D", 0, lambda messages: messages)
+        for _ in range(3):
+            self.assertEqual(conn.query(batch, force=True).value[0].data, bytearray(b"\x41\x0c\x1a\xf8\x0d\x32"))
+        self.assertEqual(port.requests[-4:], [b"010C0D", b"010C0D1", b"010C0D", b"010C0D"])
+
+    def test_multi_frame_and_no_data(self):
+        conn, port = self._connect({
+            b"0902": b"7E81014490201575030\r7E8215A5A5A39395A54\r7E82253333930303031",
+            b"03": b"NO DATA",
+        })
+        messages, frame_count = conn._parse(conn._exchange(b"0902"))
+        self.assertEqual(bytes(messages[0].data), b"\x49\x02\x01WP0ZZZ99ZTS390001")
+        self.assertEqual(frame_count, 3)
+
+        self.assertTrue(conn.query(obd.commands.GET_DTC, force=True).is_null())
+        self.assertEqual(conn.last_error, "NO DATA")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from src.formula_engine import compile_formula, FormulaError
+from src.obd_handler import OBDHandler
+
+
+class TestFormulaEngine(unittest.TestCase):
+
+    def test_byte_bindings(self):
+        f = compile_formula("((A*256)+B)/100")
+        self.assertEqual(f.arity, 2)
+        self.assertEqual(f(b'\x0A\x14'), 25.8)
+
+    def test_unused_leading_bytes(self):
+        f = compile_formula("C - 40")
+        self.assertEqual(f.arity, 3)
+        self.assertEqual(f(b'\x00\x00\x5A'), 50.0)
+
+    def test_short_response_returns_none(self):
+        self.assertIsNone(compile_formula("(A*256)+B")(b'\x01'))
+
+    def test_helpers_and_runtime_errors(self):
+        self.assertEqual(compile_formula("signed(A)")(b'\xFF'), -1.0)
+        self.assertEqual(compile_formula("max(A, B) - min(A, B)")(b'\x05\x02'), 3.0)
+        self.assertIsNone(compile_formula("A / B")(b'\x01\x00'))
+
+    def test_compiled_once(self):
+        self.assertIs(compile_formula("A*2"), compile_formula("A*2"))
+
+    def test_rejects_unsafe_or_broken_formulas(self):
+        for bad in ["__import__('os')", "A.real", "open('x')", "(A*256", "AB + 1", "'x' * A", "[A, B]", "lambda: 1", ""]:
+            with self.assertRaises(FormulaError, msg=bad):
+                compile_formula(bad)
+
+    def test_invalid_formulas_reported_at_load(self):
+        messages = []
+        handler = OBDHandler(simulation=False, log_callback=messages.append)
+        handler.set_pro_definitions({
+            "GOOD": ["Good", "C", True, True, 150, "221234", "7E0", "A-40"],
+            "BAD": ["Bad", "C", True, True, 150, "221235", "7E0", "A +* 2"],
+        })
+
+        self.assertIn("GOOD", handler.pro_formulas)
+        self.assertNotIn("BAD", handler.pro_formulas)
+        self.assertIn("BAD", handler.formula_errors)
+        self.assertTrue(any("BAD" in m for m in messages))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+
+from src.ui.frame_scheduler import FrameScheduler
+
+
+class TestFrameScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+    def _apply(self, key):
+        return lambda value: self.calls.append((key, value))
+
+    def test_latest_value_wins_and_unchanged_is_skipped(self):
+        scheduler = FrameScheduler()
+        for value in (1, 2, 3):
+            scheduler.submit("rpm", value, self._apply("rpm"))
+        self.assertEqual(scheduler.flush(now=0), 1)
+        scheduler.submit("rpm", 3, self._apply("rpm"))
+        self.assertEqual(scheduler.flush(now=1), 0)
+        self.assertEqual(self.calls, [("rpm", 3)])
+
+    def test_hidden_groups(self):
+        shown = {"graph": False, "dyno": False}
+        scheduler = FrameScheduler()
+        scheduler.add_group("graph", lambda: shown["graph"])
+        scheduler.add_group("dyno", lambda: shown["dyno"], keep_hidden=False)
+        scheduler.submit("graph", 1, self._apply("graph"), group="graph")
+        scheduler.submit("dyno", 1, self._apply("dyno"), group="dyno")
+        self.assertEqual(scheduler.flush(now=0), 0)
+
+        shown.update(graph=True, dyno=True)
+        scheduler.flush(now=1)
+        # The graph catches up once shown; the dyno sample taken while hidden is gone.
+        self.assertEqual(self.calls, [("graph", 1)])
+
+    def test_throttle_keeps_latest_pending(self):
+        scheduler = FrameScheduler()
+        scheduler.submit("btn", "a", self._apply("btn"), min_interval=1.0)
+        scheduler.flush(now=10.0)
+        scheduler.submit("btn", "b", self._apply("btn"), min_interval=1.0)
+        scheduler.flush(now=10.5)
+        scheduler.flush(now=11.0)
+        self.assertEqual(self.calls, [("btn", "a"), ("btn", "b")])
+
+    def test_budget_carries_over_oldest_first(self):
+        scheduler = FrameScheduler(max_per_frame=2)
+        for key in "abcde":
+            scheduler.submit(key, 1, self._apply(key))
+        scheduler.flush(now=0)
+        scheduler.submit("a", 2, self._apply("a"))
+        scheduler.flush(now=0)
+        scheduler.flush(now=0)
+        self.assertEqual([key for key, _ in self.calls], ["a", "b", "c", "d", "e", "a"])
+
+    def test_forget_drops_pending_and_applied(self):
+        scheduler = FrameScheduler()
+        scheduler.submit("g", 5, self._apply("g"), group="dashboard")
+        scheduler.flush(now=0)
+        scheduler.submit("g", 6, self._apply("g"), group="dashboard")
+        scheduler.forget("dashboard")
+        self.assertEqual(scheduler.flush(now=1), 0)
+        scheduler.submit("g", 5, self._apply("g"), group="dashboard")
+        scheduler.flush(now=2)
+        self.assertEqual(self.calls, [("g", 5), ("g", 5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.data_logger import DataLogger
+from src.log_rotation import compress_file, segment_path, segment_paths
+from src.trip_log import open_trip_log, export_csv
+
+
+class TestLogRotation(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.start = 1700000000.0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _log(self, log_format, compression, rows=300):
+        logger = DataLogger(flush_rows=10, flush_interval=0.05, fsync_interval=None, log_format=log_format,
+                            rotate_bytes=2000, compression=compression)
+        logger.set_directory(self.tmp_dir)
+        with patch("src.data_logger.time.time", return_value=self.start), \
+                patch("src.data_logger.time.monotonic_ns", return_value=0):
+            logger.start_new_log(["RPM", "SPEED"])
+        for i in range(rows):
+            t = i / 10
+            logger.write_row({"RPM": 800 + i, "SPEED": 30}, timestamp_ns=int(t * 1e9), wall_time=self.start + t)
+            if i % 10 == 9:
+                logger.flush()
+        self.assertTrue(logger.close())
+        return logger.current_filepath
+
+    def test_segment_names(self):
+        first = os.path.join(self.tmp_dir, "trip_log_1700000000.csv")
+        self.assertEqual(segment_path(first, 1), first)
+        self.assertEqual(os.path.basename(segment_path(first, 12)), "trip_log_1700000000-012.csv")
+
+        for name in ["trip_log_1700000000.csv.gz", "trip_log_1700000000-002.csv.gz", "trip_log_1700000000-003.csv",
+                     "trip_log_1700000000-002.csv.idx", "trip_log_17000000001.csv", "trip_log_1700000000.obdlog"]:
+            open(os.path.join(self.tmp_dir, name), "w").close()
+        found = [os.path.basename(p) for p in segment_paths(segment_path(first, 3))]
+        self.assertEqual(found, ["trip_log_1700000000.csv.gz", "trip_log_1700000000-002.csv.gz",
+                                 "trip_log_1700000000-003.csv"])
+
+    def test_compress_file(self):
+        path = os.path.join(self.tmp_dir, "trip_log_1.csv")
+        with open(path, "wb") as f:
+            f.write(b"Timestamp,RPM\r\n" * 100)
+        target = compress_file(path, "gzip")
+        self.assertFalse(os.path.exists(path))
+        with gzip.open(target, "rb") as f:
+            self.assertEqual(f.read(), b"Timestamp,RPM\r\n" * 100)
+
+    def test_csv_segments_read_as_one_trip(self):
+        path = self._log("csv", "gzip")
+        segments = segment_paths(path)
+        self.assertGreater(len(segments), 2)
+        self.assertTrue(all(p.endswith(".csv.gz") for p in segments))
+        self.assertTrue(all(os.path.exists(p[:-3] + ".idx") for p in segments))
+
+        log = open_trip_log(path)
+        self.assertAlmostEqual(log.duration(), 29.0)
+        times, cols = log.read_columns(None, None, ["RPM"])
+        self.assertEqual(cols["RPM"].tolist(), list(range(800, 1100)))
+
+        rows = list(log.iter_rows(12.0, 12.25, ["RPM"]))
+        self.assertEqual([v for _, v in rows], [["920"], ["921"], ["922"]])
+
+    def test_binary_segments_and_export(self):
+        path = self._log("binary", "gzip")
+        self.assertGreater(len(segment_paths(path)), 2)
+
+        times, cols = open_trip_log(path).read_columns(5.0, 5.2, ["RPM"])
+        self.assertEqual(cols["RPM"].tolist(), [850, 851, 852])
+
+        with open(export_csv(path)) as f:
+            self.assertEqual(len(f.readlines()), 301)
+
+    def test_no_rotation_without_limits(self):
+        logger = DataLogger(flush_interval=0.05, fsync_interval=None)
+        logger.set_directory(self.tmp_dir)
+        logger.start_new_log(["RPM"])
+        for i in range(200):
+            logger.write_row({"RPM": i})
+        self.assertTrue(logger.close())
+        self.assertEqual(segment_paths(logger.current_filepath), [logger.current_filepath])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import marshal
+import unittest
+
+from src.pack_compiler import compile_pack, load_bundle
+
+
+class TestPackCompiler(unittest.TestCase):
+
+    def setUp(self):
+        self.defs = {
+            "OIL_T": ["Oil Temp", "°C", True, False, 150, "221234", "7e0", "((A*256)+B)/100"],
+            "BOOST": ["Boost", "kPa", True, True, 300, "22F1A0", None, "A - 40  # offset"],
+            "BAD": ["Bad", "", True, True, 100, "221235", "7E0", "A +* 2"],
+            "SHORT": ["No formula", "", True, True, 100],
+        }
+
+    def test_round_trip_through_marshal(self):
+        bundle = marshal.loads(marshal.dumps(compile_pack(self.defs)))
+        pids, errors = load_bundle(bundle)
+
+        self.assertEqual(sorted(pids), ["BOOST", "OIL_T"])
+        self.assertEqual(list(errors), ["BAD"])
+        self.assertEqual(bundle["definitions"], self.defs)
+
+        oil = pids["OIL_T"]
+        self.assertEqual(oil.command.command, b"221234")
+        self.assertEqual(oil.header, "7E0")
+        self.assertEqual(oil.response_length, 2)
+        self.assertEqual(oil.formula(b'\x0A\x14\xFF'), 25.8)
+        self.assertIsNone(oil.formula(b'\x0A'))
+
+        boost = pids["BOOST"]
+        self.assertIsNone(boost.header)
+        self.assertEqual(boost.formula(bytearray([140])), 100.0)
+
+    def test_bundle_formulas_validated_on_load(self):
+        """A tampered cache entry must not get past the formula checks."""
+        bundle = marshal.loads(marshal.dumps(compile_pack(self.defs)))
+        self.assertNotIn("code", bundle)
+        bundle["formulas"][bundle["keys"].index("OIL_T")] = "[].__class__.__base__.__subclasses__()"
+        pids, errors = load_bundle(bundle)
+        self.assertNotIn("OIL_T", pids)
+        self.assertIn("OIL_T", errors)
+        self.assertIn("BOOST", pids)
+
+    def test_shared_formulas(self):
+        defs = {f"P{i}": ["P", "", True, True, 100, f"22{i:04X}", "7E0", "A - 40"] for i in range(50)}
+        pids, errors = load_bundle(compile_pack(defs))
+        self.assertEqual(len(pids), 50)
+        self.assertIs(pids["P0"].formula, pids["P49"].formula)
+        self.assertEqual(pids["P7"].command.command, b"220007")
+
+    def test_empty_pack(self):
+        pids, errors = load_bundle(compile_pack({}))
+        self.assertEqual((pids, errors), ({}, {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import json
+import marshal
+import os
+import shutil
+import tempfile
+import unittest
+
+from cryptography.fernet import Fernet
+from src.pack_compiler import load_bundle
+from src.pack_loader import PackLoader
+
+
+class TestPackLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.pack_dir = os.path.join(self.tmp_dir, "pro_packs")
+        self.cache_dir = os.path.join(self.tmp_dir, "cache", "packs")
+        os.makedirs(os.path.join(self.pack_dir, "vag"))
+        self.key = Fernet.generate_key()
+        self.cipher = Fernet(self.key)
+        self._write("vag/golf.json", {"VAG_OIL_T": ["Oil Temp", "°C", True, False, 150, "222202"]})
+        self._write("bmw.obd", {"BMW_BOOST": ["Boost", "kPa", True, True, 300, "22F1A0"]})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _write(self, rel, definitions):
+        data = json.dumps(definitions).encode('utf-8')
+        if rel.endswith(".obd"):
+            data = self.cipher.encrypt(data)
+        with open(os.path.join(self.pack_dir, rel), 'wb') as f:
+            f.write(data)
+
+    def _loader(self):
+        return PackLoader(self.pack_dir, self.cache_dir, cipher=self.cipher, max_workers=4)
+
+    def test_available_and_load(self):
+        loader = self._loader()
+        self.assertEqual(loader.available(), ["bmw.obd", os.path.join("vag", "golf.json")])
+        loaded = dict(loader.load(["bmw.obd", "vag/golf.json", "missing.json"]))
+        self.assertEqual(loaded["bmw.obd"]["definitions"]["BMW_BOOST"][0], "Boost")
+        self.assertEqual(loaded[os.path.join("vag", "golf.json")]["definitions"]["VAG_OIL_T"][4], 150)
+        self.assertEqual(loader.parsed_count, 2)
+
+    def test_cache_reused_across_instances(self):
+        self._loader().load(["bmw.obd", "vag/golf.json"])
+        loader = self._loader()
+        first = loader.load(["bmw.obd", "vag/golf.json"])
+        self.assertEqual(loader.parsed_count, 0)
+        self.assertEqual(loader.cached_count, 2)
+
+        # Toggling packs afterwards is served from memory.
+        self.assertEqual(loader.load(["bmw.obd"]), first[:1])
+        self.assertEqual(loader.cached_count, 2)
+
+        # The encrypted pack's cache isn't a plaintext copy.
+        for name in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, name), 'rb') as f:
+                self.assertNotIn(b"22F1A0", f.read())
+
+    def test_only_changed_packs_reparsed(self):
+        self._loader().load(["bmw.obd", "vag/golf.json"])
+        path = os.path.join(self.pack_dir, "vag", "golf.json")
+        stat = os.stat(path)
+        # Same bytes, new mtime: recognised by hash.
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        loader = self._loader()
+        loader.load(["bmw.obd", "vag/golf.json"])
+        self.assertEqual(loader.parsed_count, 0)
+
+        self._write("vag/golf.json", {"VAG_OIL_T": ["Oil Temperature", "°C", True, False, 160, "222202"]})
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+        loaded = dict(loader.load(["bmw.obd", "vag/golf.json"]))
+        self.assertEqual(loader.parsed_count, 1)
+        self.assertEqual(loaded[os.path.join("vag", "golf.json")]["definitions"]["VAG_OIL_T"][0], "Oil Temperature")
+        # The old version's blob is gone.
+        self.assertEqual(len([n for n in os.listdir(self.cache_dir) if n.endswith(".bin")]), 2)
+
+    def test_cipher_from_key(self):
+        loader = PackLoader(self.pack_dir, self.cache_dir, key=self.key)
+        self.assertIsNone(loader.cipher)
+        loaded = dict(loader.load(["bmw.obd"]))
+        self.assertIn("BMW_BOOST", loaded["bmw.obd"]["definitions"])
+
+    def test_tampered_cache_not_executed(self):
+        self._write("vag/golf.json", {"VAG_OIL_T": ["Oil Temp", "°C", True, False, 150, "222202", "7E0", "A - 40"]})
+        self._loader().load(["vag/golf.json"])
+        blob = [n for n in os.listdir(self.cache_dir) if n.endswith(".bin")][0]
+        path = os.path.join(self.cache_dir, blob)
+        with open(path, 'rb') as f:
+            cache_format, bundle = marshal.loads(f.read())
+        bundle["formulas"] = ["[].__class__.__base__.__subclasses__()"]
+        with open(path, 'wb') as f:
+            f.write(marshal.dumps((cache_format, bundle)))
+
+        (rel, loaded), = self._loader().load(["vag/golf.json"])
+        pids, errors = load_bundle(loaded)
+        self.assertEqual(pids, {})
+        self.assertIn("VAG_OIL_T", errors)
+
+    def test_bad_pack_skipped(self):
+        with open(os.path.join(self.pack_dir, "broken.obd"), 'wb') as f:
+            f.write(b"not a fernet token")
+        loaded = dict(self._loader().load(["broken.obd", "bmw.obd"]))
+        self.assertEqual(list(loaded), ["bmw.obd"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from unittest.mock import MagicMock
+
+import obd
+from obd.protocols.protocol import Message
+from src.pid_metrics import PIDMetrics, LatencyHistogram
+from src.obd_handler import OBDHandler
+
+
+class TestPIDMetrics(unittest.TestCase):
+
+    def test_histogram_percentiles(self):
+        hist = LatencyHistogram()
+        self.assertIsNone(hist.percentile(50))
+        for _ in range(90):
+            hist.add(10.0)
+        for _ in range(10):
+            hist.add(200.0)
+
+        # Bucket bounds are within 20% of the real value.
+        self.assertTrue(10.0 <= hist.percentile(50) < 12.0)
+        self.assertTrue(200.0 <= hist.percentile(95) < 240.0)
+        self.assertTrue(200.0 <= hist.percentile(99) < 240.0)
+
+    def test_counts_and_rate(self):
+        metrics = PIDMetrics(window=2.0)
+        metrics.started = 100.0
+        metrics.record("RPM", 0.01, True, now=100.5)
+        metrics.record("RPM", 0.02, False, "NO DATA", now=101.0)
+        metrics.record("SPEED", 0.01, True, now=101.5)
+
+        rpm = metrics.get("RPM")
+        self.assertEqual((rpm["requests"], rpm["successes"], rpm["failures"]), (2, 1, 1))
+        self.assertEqual(rpm["errors"], {"NO DATA": 1})
+        self.assertIsNone(metrics.get("MAF"))
+        self.assertEqual(metrics.samples_per_second(now=102.0), 1.0)
+        # Samples older than the window drop out.
+        self.assertEqual(metrics.samples_per_second(now=103.4), 0.5)
+
+    def test_query_path_is_instrumented(self):
+        handler = OBDHandler(simulation=False)
+        handler.status = "Connected"
+        handler.connection = MagicMock()
+        handler.connection.protocol_id.return_value = "6"
+        handler.supported_commands = {obd.commands.RPM, obd.commands.SPEED, obd.commands.COOLANT_TEMP}
+
+        # The ECU only answers two of the three PIDs in the combined request.
+        batch = Message([])
+        batch.data = bytearray([0x41, 0x0C, 0x1A, 0xF8, 0x0D, 0x32])
+        batch_response = MagicMock()
+        batch_response.messages = [batch]
+        single_response = MagicMock()
+        single_response.messages = []
+        single_response.is_null.return_value = True
+        handler.connection.query.side_effect = [batch_response, single_response]
+
+        values = handler.query_sensors(["RPM", "SPEED", "COOLANT_TEMP"])
+
+        self.assertEqual(values, {"RPM": 1726.0, "SPEED": 50})
+        report = handler.metrics.report()
+        self.assertEqual(report["sensors"]["RPM"]["successes"], 1)
+        self.assertEqual(report["sensors"]["COOLANT_TEMP"]["failures"], 1)
+        self.assertEqual(report["sensors"]["COOLANT_TEMP"]["last_error"], "NO DATA")
+        self.assertGreater(report["totals"]["bytes_sent"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from src.pid_scheduler import PIDScheduler
+
+
+class TestPIDScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.sched = PIDScheduler(rates={"RPM": 20, "BAROMETRIC_PRESSURE": 0.1, "COOLANT_TEMP": 1})
+        self.sched.set_sensors(["RPM", "BAROMETRIC_PRESSURE", "COOLANT_TEMP"], now=0.0)
+
+    def simulate(self, duration, cost):
+        """Runs a saturated bus where each query takes `cost` seconds."""
+        counts = {k: 0 for k in self.sched.slots}
+        now = 0.0
+        while now < duration:
+            due = self.sched.due(now, limit=1)
+            if not due:
+                now = self.sched.next_deadline()
+                continue
+            now += cost
+            self.sched.record(due[0], now)
+            counts[due[0]] += 1
+        return counts
+
+    def test_everything_due_at_start(self):
+        self.assertEqual(set(self.sched.due(0.0)), {"RPM", "BAROMETRIC_PRESSURE", "COOLANT_TEMP"})
+
+    def test_high_priority_defaults(self):
+        sched = PIDScheduler()
+        self.assertGreater(sched.target_rate("RPM"), sched.target_rate("FUEL_LEVEL"))
+        self.assertGreater(sched.target_rate("SPEED"), sched.target_rate("BAROMETRIC_PRESSURE"))
+
+    def test_rates_respected_on_idle_bus(self):
+        counts = self.simulate(10.0, 0.001)
+        self.assertAlmostEqual(counts["RPM"], 200, delta=5)
+        self.assertAlmostEqual(counts["COOLANT_TEMP"], 10, delta=1)
+        self.assertEqual(counts["BAROMETRIC_PRESSURE"], 1)
+
+    def test_slow_sensors_do_not_starve_on_saturated_bus(self):
+        """Adapter slower than the requested total rate: RPM dominates but nobody starves."""
+        counts = self.simulate(20.0, 0.1)
+        self.assertGreater(counts["RPM"], counts["COOLANT_TEMP"])
+        self.assertGreater(counts["COOLANT_TEMP"], 0)
+        self.assertGreater(counts["BAROMETRIC_PRESSURE"], 0)
+
+    def test_rate_report(self):
+        for i in range(11):
+            self.sched.record("RPM", now=i * 0.05)
+        report = self.sched.get_rate_report(now=0.5)
+        target, achieved = report["RPM"]
+        self.assertEqual(target, 20)
+        self.assertAlmostEqual(achieved, 20.0, places=3)
+
+    def test_removed_sensors_are_dropped(self):
+        self.sched.set_sensors(["RPM"])
+        self.assertEqual(list(self.sched.slots), ["RPM"])
+
+    def test_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            self.sched.set_rate("RPM", 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import math
+import unittest
+
+import numpy as np
+from src.sensor_history import RingBuffer, SensorHistory
+
+
+class TestRingBuffer(unittest.TestCase):
+
+    def test_ordered_views_after_wrap(self):
+        ring = RingBuffer(4)
+        for i in range(10):
+            ring.append(i * 10, 100.0 + i)
+        self.assertEqual(len(ring), 4)
+        self.assertEqual(ring.values().tolist(), [60, 70, 80, 90])
+        self.assertEqual(ring.timestamps().tolist(), [106, 107, 108, 109])
+        self.assertEqual(ring.last(), 90)
+
+    def test_views_are_not_copies(self):
+        ring = RingBuffer(3)
+        for i in range(5):
+            ring.append(i, i)
+        self.assertTrue(np.shares_memory(ring.values(), ring._values))
+        with self.assertRaises(ValueError):
+            ring.values()[0] = 1
+
+    def test_running_min_max_follows_the_window(self):
+        ring = RingBuffer(3)
+        values = [5, 1, 9, 3, 2, 2, 7, float("nan"), 4]
+        for i, value in enumerate(values):
+            ring.append(value, i)
+            window = [v for v in values[max(0, i - 2):i + 1] if not math.isnan(v)]
+            self.assertEqual(ring.min(), min(window))
+            self.assertEqual(ring.max(), max(window))
+
+    def test_all_nan_has_no_min(self):
+        ring = RingBuffer(2)
+        ring.append(float("nan"), 0)
+        self.assertIsNone(ring.min())
+        self.assertEqual(ring.max(0), 0)
+
+
+class TestSensorHistory(unittest.TestCase):
+
+    def test_reading_unknown_key_creates_nothing(self):
+        history = SensorHistory(depth=10)
+        self.assertEqual(len(history.values("RPM")), 0)
+        self.assertIsNone(history.get("RPM"))
+        self.assertNotIn("RPM", history)
+
+    def test_append_and_depth_from_config(self):
+        history = SensorHistory.from_config({"history_seconds": 2, "history_rate_hz": 5})
+        self.assertEqual(history.depth, 10)
+        for i in range(15):
+            history.append("RPM", 800 + i, i * 0.2)
+        history.append("SPEED", "n/a", 0.0)
+        self.assertEqual(history.values("RPM").tolist(), list(range(805, 815)))
+        self.assertTrue(math.isnan(history.values("SPEED")[0]))
+        self.assertEqual(history.get("RPM").max(), 814)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import time
+import unittest
+
+from src.sensor_search import SensorIndex
+
+
+class TestSensorIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = SensorIndex([
+            ("RPM", "Engine RPM", "Standard"),
+            ("SPEED", "Vehicle Speed", "Standard"),
+            ("VAG_BOOST", "Boost Pressure Actual", "VAG"),
+            ("VAG_OIL_T", "Oil Temperature", "VAG"),
+            ("FORD_OIL_P", "Oil Pressure", "Ford"),
+        ])
+
+    def test_empty_query_lists_catalogue(self):
+        self.assertEqual(self.index.search(), [0, 1, 2, 3, 4])
+        self.assertEqual(self.index.keys(self.index.search(source="VAG")), ["VAG_BOOST", "VAG_OIL_T"])
+
+    def test_substring(self):
+        self.assertEqual(self.index.keys(self.index.search("pressure")), ["VAG_BOOST", "FORD_OIL_P"])
+        self.assertEqual(self.index.keys(self.index.search("oil_")), ["VAG_OIL_T", "FORD_OIL_P"])
+        self.assertEqual(self.index.keys(self.index.search("  SPEED ")), ["SPEED"])
+        self.assertEqual(self.index.search("p\x1fb"), [])
+
+    def test_prefix(self):
+        self.assertEqual(self.index.keys(self.index.search("pre", prefix=True)), ["VAG_BOOST", "FORD_OIL_P"])
+        # "ssure" is inside words but starts none of them.
+        self.assertEqual(self.index.search("ssure", prefix=True), [])
+        self.assertEqual(self.index.keys(self.index.search("vag", prefix=True)), ["VAG_BOOST", "VAG_OIL_T"])
+
+    def test_source_filter(self):
+        self.assertEqual(self.index.keys(self.index.search("oil", source="Ford")), ["FORD_OIL_P"])
+        self.assertEqual(self.index.search("oil", source="Missing"), [])
+
+    def test_large_catalogue(self):
+        entries = [(f"PID_{i:04X}", f"Sensor {i} Pressure" if i % 7 else f"Sensor {i} Temp", f"Pack{i % 5}")
+                   for i in range(5000)]
+        start = time.perf_counter()
+        index = SensorIndex(entries)
+        hits = index.search("temp", source="Pack0")
+        elapsed = time.perf_counter() - start
+        self.assertEqual(hits, [i for i in range(5000) if i % 35 == 0])
+        self.assertLess(elapsed, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
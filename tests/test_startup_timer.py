@@ -0,0 +1,25 @@
+import unittest
+from unittest.mock import patch
+
+from src.startup_timer import StartupTimer
+
+
+class TestStartupTimer(unittest.TestCase):
+
+    def test_phases_and_report(self):
+        with patch("src.startup_timer.time.perf_counter", side_effect=[1.0, 1.25, 1.3]):
+            timer = StartupTimer()
+            timer.mark("imports")
+            timer.mark("window")
+
+        self.assertEqual([name for name, _ in timer.phases], ["imports", "window"])
+        self.assertAlmostEqual(timer.phases[0][1], 0.25)
+        self.assertAlmostEqual(timer.total(), 0.3)
+        report = timer.report().splitlines()
+        self.assertEqual(report[0], "Startup took 300 ms:")
+        self.assertEqual(report[1], "  imports     250.0 ms")
+        self.assertEqual(report[2], "  window       50.0 ms")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import src.translation as translation
+
+PO_TEMPLATE = '''msgid ""
+msgstr ""
+"Content-Type: text/plain; charset=UTF-8\\n"
+
+msgid "greeting"
+msgstr "{}"
+'''
+
+
+class TestTranslationCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.locale_dir = os.path.join(self.tmp_dir, "locale")
+        os.makedirs(self.locale_dir)
+        self._write_po("en", "Hello")
+        self._write_po("de", "Hallo")
+        self.patches = [
+            patch.object(translation, "LOCALE_DIR", self.locale_dir),
+            patch.object(translation, "TRANSLATION_CACHE_DIR", os.path.join(self.tmp_dir, "cache")),
+            patch.object(translation, "_catalogs", {}),
+            patch.object(translation, "translations", {}),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _write_po(self, lang, text):
+        with open(os.path.join(self.locale_dir, f"{lang}.po"), 'w', encoding='utf-8') as f:
+            f.write(PO_TEMPLATE.format(text))
+
+    def test_languages_and_fallback(self):
+        self.assertEqual(translation.get_available_languages(), ["de", "en"])
+        translation.set_language("de")
+        self.assertEqual(translation.translate("greeting"), "Hallo")
+        self.assertEqual(translation.translate("missing"), "missing")
+        translation.set_language("xx")
+        self.assertEqual(translation.translate("greeting"), "Hello")
+
+    def test_cache_skips_polib(self):
+        translation.load_catalog("de")
+        translation._catalogs.clear()
+        with patch("polib.pofile", side_effect=AssertionError("parsed again")):
+            self.assertEqual(translation.load_catalog("de")["greeting"], "Hallo")
+
+    def test_changed_po_rebuilds(self):
+        translation.load_catalog("de")
+        path = os.path.join(self.locale_dir, "de.po")
+        stat = os.stat(path)
+        self._write_po("de", "Guten Tag")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(translation.load_catalog("de")["greeting"], "Guten Tag")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from src.data_logger import DataLogger, format_timestamp
+from src.trip_index import CSVTripLogReader, TripIndex, build_index, INDEX_SUFFIX
+from src.trip_log import open_trip_log
+
+
+class TestTripIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.start = 1700000000.0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _log(self, log_format, seconds=10, hz=10):
+        logger = DataLogger(flush_interval=0.05, fsync_interval=None, log_format=log_format)
+        logger.set_directory(self.tmp_dir)
+        with patch("src.data_logger.time.time", return_value=self.start), \
+                patch("src.data_logger.time.monotonic_ns", return_value=0):
+            logger.start_new_log(["RPM", "SPEED"])
+        for i in range(seconds * hz):
+            t = i / hz
+            logger.write_row({"RPM": 800 + i, "SPEED": i % 7 or ""},
+                             timestamp_ns=int(t * 1e9), wall_time=self.start + t)
+        self.assertTrue(logger.close())
+        return logger.current_filepath
+
+    def test_logger_writes_index(self):
+        path = self._log("csv")
+        index = TripIndex(path + INDEX_SUFFIX)
+        self.assertEqual(len(index), 10)
+        # Each entry points at the start of a row for that second.
+        with open(path, "rb") as f:
+            f.seek(int(index.locate(self.start + 4.5)["offset"]))
+            self.assertTrue(f.readline().startswith(format_timestamp(self.start + 4).encode()))
+
+    def test_csv_range_read(self):
+        log = open_trip_log(self._log("csv"))
+        self.assertEqual(type(log).__name__, "CSVTripLogReader")
+        self.assertAlmostEqual(log.duration(), 9.0)
+
+        rows = list(log.iter_rows(3.0, 3.45, ["SPEED"]))
+        self.assertEqual([round(t, 2) for t, _ in rows], [3.0, 3.1, 3.2, 3.3, 3.4])
+        self.assertEqual([v for _, v in rows], [["2"], ["3"], ["4"], ["5"], ["6"]])
+
+        times, cols = log.read_columns(9.5, None, ["RPM", "SPEED"])
+        self.assertEqual(cols["RPM"].tolist(), [895, 896, 897, 898, 899])
+        self.assertTrue(np.isnan(cols["SPEED"][3]))
+
+    def test_binary_range_read(self):
+        log = open_trip_log(self._log("binary"))
+        self.assertEqual(type(log).__name__, "TripLogReader")
+        times, cols = log.read_columns(3.0, 3.45, ["RPM"])
+        np.testing.assert_allclose(times, [3.0, 3.1, 3.2, 3.3, 3.4])
+        self.assertEqual(cols["RPM"].tolist(), [830, 831, 832, 833, 834])
+        log.close()
+
+    def test_index_built_for_old_logs(self):
+        """Logs from before the index existed have whole-second stamps and no sidecar."""
+        start = time.mktime((2024, 3, 1, 23, 59, 58, 0, 0, -1))
+        path = os.path.join(self.tmp_dir, f"trip_log_{int(start)}.csv")
+        with open(path, "w", newline="") as f:
+            f.write("Timestamp,RPM\r\n")
+            for i, stamp in enumerate(["23:59:58", "23:59:59", "00:00:00", "00:00:01"]):
+                f.write(f"{stamp},{900 + i}\r\n")
+
+        log = CSVTripLogReader(path)
+        self.assertTrue(os.path.exists(path + INDEX_SUFFIX))
+        self.assertAlmostEqual(log.duration(), 3.0)
+        self.assertEqual([(round(t), v) for t, v in log.iter_rows(2.0, None)], [(2, ["902"]), (3, ["903"])])
+
+    def test_rebuilt_index_matches_live_one(self):
+        path = self._log("csv", seconds=3)
+        live = TripIndex(path + INDEX_SUFFIX).entries.copy()
+        rebuilt = TripIndex(build_index(path, path + ".rebuilt")).entries
+        self.assertEqual(live["offset"].tolist(), rebuilt["offset"].tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import csv
+import math
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from src.trip_log import BinaryTripWriter, TripLogReader, export_csv, record_dtype
+from src.data_logger import DataLogger
+
+
+class TestTripLog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "trip.obdlog")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _write(self, keys, rows, dtype="f4"):
+        with open(self.path, "wb") as f:
+            writer = BinaryTripWriter(f, keys, ["rpm", "kph", "C"][:len(keys)], dtype=dtype,
+                                      start_wall_time=1700000000.0, start_monotonic_ns=5_000_000_000)
+            writer.write_many(rows)
+
+    def test_round_trip_columns(self):
+        self._write(["RPM", "SPEED", "COOLANT_TEMP"], [
+            (5_000_000_000, [800, 0, 85]),
+            (5_050_000_000, [1200.5, None, 85]),
+            (5_100_000_000, [1800, 12, "n/a"]),
+        ])
+
+        log = TripLogReader(self.path)
+        self.assertEqual(len(log), 3)
+        self.assertEqual(log.units["SPEED"], "kph")
+        np.testing.assert_allclose(log.timestamps(), [0.0, 0.05, 0.1])
+        np.testing.assert_allclose(log.column("RPM"), [800, 1200.5, 1800])
+        self.assertEqual(log.present("SPEED").tolist(), [True, False, True])
+        self.assertTrue(math.isnan(log.column("COOLANT_TEMP")[2]))
+        # The raw column is a view on the mapped file, not a copy.
+        self.assertIsInstance(log.column("RPM", raw=True).base, np.ndarray)
+        log.close()
+
+    def test_many_keys_and_float64(self):
+        keys = [f"K{i}" for i in range(70)]
+        values = [None] * 70
+        values[0], values[65] = 1.0, 123456.789
+        self._write(keys, [(5_000_000_000, values)], dtype="f8")
+
+        log = TripLogReader(self.path)
+        self.assertEqual(log.dtype, record_dtype(70, "f8"))
+        self.assertTrue(log.present("K65")[0])
+        self.assertFalse(log.present("K64")[0])
+        self.assertEqual(log.column("K65")[0], 123456.789)
+        log.close()
+
+    def test_truncated_record_is_ignored(self):
+        self._write(["RPM"], [(5_000_000_000, [800]), (5_100_000_000, [900])])
+        with open(self.path, "ab") as f:
+            f.write(b"\x01\x02\x03")
+        log = TripLogReader(self.path)
+        self.assertEqual(len(log), 2)
+        log.close()
+
+    def test_export_csv(self):
+        self._write(["RPM", "SPEED"], [(5_000_000_000, [800, None]), (5_250_000_000, [900, 3])])
+        csv_path = export_csv(self.path)
+
+        with open(csv_path, newline="") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ["Timestamp", "RPM", "SPEED"])
+        self.assertEqual(rows[1][1:], ["800.0", ""])
+        self.assertTrue(rows[2][0].endswith(".250"))
+
+    def test_data_logger_binary_mode(self):
+        logger = DataLogger(flush_interval=0.05, fsync_interval=None, log_format="binary")
+        logger.set_directory(self.tmp_dir)
+        logger.start_new_log(["RPM", "SPEED"], {"RPM": "rpm"})
+        for i in range(5):
+            logger.write_row({"RPM": 1000 + i}, timestamp_ns=1_000_000 * i)
+        self.assertTrue(logger.close())
+
+        self.assertTrue(logger.current_filepath.endswith(".obdlog"))
+        log = TripLogReader(logger.current_filepath)
+        self.assertEqual(log.timestamps_ns().tolist(), [0, 1_000_000, 2_000_000, 3_000_000, 4_000_000])
+        self.assertEqual(log.column("RPM").tolist(), [1000, 1001, 1002, 1003, 1004])
+        self.assertFalse(log.present("SPEED").any())
+        self.assertEqual(log.units, {"RPM": "rpm", "SPEED": ""})
+        log.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
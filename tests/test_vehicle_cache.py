@@ -0,0 +1,211 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import obd
+import src.obd_handler as obd_handler_module
+from src.obd_handler import OBDHandler
+from src.vehicle_cache import VehicleProfileCache, encode_supported, decode_supported
+
+
+class TestVehicleCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "cache", "vehicle_profiles.json")
+        self.supported = {obd.commands.RPM, obd.commands.SPEED, obd.commands.COOLANT_TEMP, obd.commands.PIDS_A}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _profile(self):
+        return {
+            "key": VehicleProfileCache.make_key("WVWZZZ7MZ6V000001", "COM3", "6"),
+            "vin": "WVWZZZ7MZ6V000001", "port": "COM3",
+            "protocol_id": "6", "protocol_name": "ISO 15765-4 (CAN 11/500)",
+            "baudrate": 38400, "supported": encode_supported(self.supported),
+            "pro_support": {"VAG_OIL_TEMP": obd_handler_module.PRO_MISSED_SESSIONS, "VAG_BOOST": 1},
+        }
+
+    def _car(self, vin="WVWZZZ7MZ6V000001", pids_b=()):
+        """A connection to a car answering PIDS_A like the profile, with the given VIN and PIDS_B bits."""
+        replies = {
+            obd.commands.PIDS_A: [(i + 1) in (0x05, 0x0C, 0x0D) or (i + 1 == 0x20 and bool(pids_b)) for i in range(32)],
+            obd.commands.PIDS_B: [(i + 0x21) in pids_b for i in range(32)],
+            obd.commands.VIN: vin,
+        }
+
+        def query(cmd, force=False):
+            response = MagicMock()
+            response.is_null.return_value = replies.get(cmd) is None
+            response.value = replies.get(cmd)
+            return response
+
+        conn = MagicMock()
+        conn.is_connected.return_value = True
+        conn.supported_commands = self.supported
+        conn.protocol_id.return_value = "6"
+        conn.protocol_name.return_value = "ISO 15765-4 (CAN 11/500)"
+        conn.port.baudrate = 38400
+        conn.query.side_effect = query
+        return conn
+
+    def test_bitmap_round_trip(self):
+        bitmaps = encode_supported(self.supported)
+        self.assertEqual(list(bitmaps), ["1"])
+        restored = decode_supported(bitmaps, obd.commands)
+        self.assertTrue(self.supported <= restored)
+
+    def test_store_and_lookup_persist(self):
+        VehicleProfileCache(self.path).store("COM3", self._profile())
+
+        reloaded = VehicleProfileCache(self.path)
+        profile = reloaded.lookup_port("COM3")
+        self.assertEqual(profile["key"], "VIN:WVWZZZ7MZ6V000001")
+        self.assertIsNone(reloaded.lookup_port("COM4"))
+
+        reloaded.update_pro_support(profile["key"], {"VAG_OIL_TEMP": True})
+        self.assertTrue(VehicleProfileCache(self.path).get(profile["key"])["pro_support"]["VAG_OIL_TEMP"])
+
+    def test_key_without_vin(self):
+        self.assertEqual(VehicleProfileCache.make_key(None, "socket://127.0.0.1:35000", "6"),
+                         "PORT:socket://127.0.0.1:35000|6")
+
+    def test_reconnect_uses_cached_profile(self):
+        """A matching profile skips python-obd's discovery and restores pack support results."""
+        cache = VehicleProfileCache(self.path)
+        cache.store("COM3", self._profile())
+
+        handler = OBDHandler(simulation=False, profile_cache=cache)
+        handler.pro_formulas = {"VAG_OIL_TEMP": MagicMock()}
+        with patch.object(obd_handler_module, "_ProfiledOBD", return_value=self._car()) as profiled, \
+                patch.object(obd_handler_module.obd, "OBD") as full_discovery:
+            self.assertTrue(handler.connect("COM3"))
+
+        self.assertEqual(profiled.call_args.kwargs["protocol"], "6")
+        self.assertEqual(profiled.call_args.kwargs["baudrate"], 38400)
+        full_discovery.assert_not_called()
+        self.assertFalse(handler.check_supported("VAG_OIL_TEMP"))
+
+    def test_pack_pid_disabled_only_after_repeated_sessions(self):
+        cache = VehicleProfileCache(self.path)
+        profile = self._profile()
+        cache.store("COM3", profile)
+
+        def session(answers):
+            handler = OBDHandler(simulation=False, profile_cache=cache)
+            handler.pro_formulas = {"VAG_BOOST": MagicMock()}
+            handler.status = "Connected"
+            handler.vehicle_profile = cache.get(profile["key"])
+            handler.pro_support = dict(handler.vehicle_profile["pro_support"])
+            for answered in answers:
+                if handler.check_supported("VAG_BOOST"):
+                    handler._note_pro_support("VAG_BOOST", answered)
+            handler.disconnect()
+            return cache.get(profile["key"])["pro_support"]["VAG_BOOST"]
+
+        # One miss is not a bad session; a session of misses only counts once.
+        self.assertEqual(session([False]), 1)
+        self.assertEqual(session([False] * 10), 2)
+        # An answer clears the count for good.
+        self.assertIs(session([False, True, False, False, False]), True)
+
+        cache.update_pro_support(profile["key"], {"VAG_BOOST": 2})
+        self.assertEqual(session([False] * 3), obd_handler_module.PRO_MISSED_SESSIONS)
+        handler = OBDHandler(simulation=False, profile_cache=cache)
+        handler.pro_formulas = {"VAG_BOOST": MagicMock()}
+        handler.status = "Connected"
+        handler.pro_support = cache.get(profile["key"])["pro_support"]
+        self.assertFalse(handler.check_supported("VAG_BOOST"))
+
+    def test_pack_pid_support_from_parsed_replies(self):
+        """Only a real answer marks a pack PID supported; NO DATA and negative replies don't."""
+        from obd.protocols import ISO_15765_4_11bit_500k
+        protocol = ISO_15765_4_11bit_500k([])
+        handler = OBDHandler(simulation=False)
+        handler.connection = MagicMock()
+        handler.status = "Connected"
+        handler.set_pro_definitions({"VAG_BOOST": ["Boost", "kPa", True, True, 300, "221234", "7E0", "A"]})
+
+        replies = [["NO DATA"], ["7E8 03 7F 22 31"]]
+
+        def query(cmd, force=False):
+            if cmd.command.startswith(b"AT"):
+                return MagicMock()
+            return cmd(protocol(replies.pop(0)))
+
+        handler.connection.query.side_effect = query
+        self.assertIsNone(handler.query_sensor("VAG_BOOST"))
+        self.assertIsNone(handler.query_sensor("VAG_BOOST"))
+        self.assertNotIn("VAG_BOOST", handler.pro_support)
+        self.assertEqual(handler.pro_misses["VAG_BOOST"], 2)
+
+        handler.connection.query.side_effect = lambda cmd, force=False: cmd(protocol(["7E8 04 62 12 34 64"]))
+        self.assertIsNotNone(handler.query_sensor("VAG_BOOST"))
+        self.assertIs(handler.pro_support["VAG_BOOST"], True)
+
+    def test_other_car_with_same_pids_a_falls_back(self):
+        """Matching PIDS_A isn't enough: a different VIN, or without one other PID bitmaps, must match too."""
+        cache = VehicleProfileCache(self.path)
+        cache.store("COM3", self._profile())
+        other_car = self._car(vin="WVWZZZ1KZ8W000002")
+        with patch.object(obd_handler_module, "_ProfiledOBD", return_value=other_car), \
+                patch.object(obd_handler_module.obd, "OBD", return_value=self._car(vin="WVWZZZ1KZ8W000002")) as full:
+            self.assertTrue(OBDHandler(simulation=False, profile_cache=cache).connect("COM3"))
+        full.assert_called_once()
+        other_car.close.assert_called_once()
+        self.assertEqual(cache.lookup_port("COM3")["key"], "VIN:WVWZZZ1KZ8W000002")
+
+        profile = self._profile()
+        profile.update(key="PORT:COM4|6", vin=None, port="COM4")
+        profile["supported"] = encode_supported(self.supported | {obd.commands.PIDS_B, obd.commands.FUEL_RAIL_PRESSURE_DIRECT})
+        cache.store("COM4", profile)
+        same = self._car(vin=None, pids_b=(0x23,))
+        with patch.object(obd_handler_module, "_ProfiledOBD", return_value=same), \
+                patch.object(obd_handler_module.obd, "OBD") as full:
+            self.assertTrue(OBDHandler(simulation=False, profile_cache=cache).connect("COM4"))
+        full.assert_not_called()
+
+        other_car = self._car(vin=None, pids_b=(0x23, 0x2F))
+        with patch.object(obd_handler_module, "_ProfiledOBD", return_value=other_car), \
+                patch.object(obd_handler_module.obd, "OBD", return_value=self._car(vin=None)) as full:
+            self.assertTrue(OBDHandler(simulation=False, profile_cache=cache).connect("COM4"))
+        full.assert_called_once()
+
+    def test_mismatched_profile_falls_back(self):
+        cache = VehicleProfileCache(self.path)
+        cache.store("COM3", self._profile())
+
+        stale_conn = MagicMock()
+        stale_conn.is_connected.return_value = True
+        pids_a = MagicMock()
+        pids_a.is_null.return_value = False
+        pids_a.value = [False] * 32
+        stale_conn.query.return_value = pids_a
+
+        fresh_conn = MagicMock()
+        fresh_conn.is_connected.return_value = True
+        fresh_conn.supported_commands = self.supported
+        fresh_conn.protocol_id.return_value = "6"
+        fresh_conn.protocol_name.return_value = "ISO 15765-4 (CAN 11/500)"
+        # python-obd settled on a different rate than the one asked for.
+        del fresh_conn.port
+        fresh_conn.interface._ELM327__port.baudrate = 38400
+        fresh_conn.query.return_value.is_null.return_value = True
+
+        handler = OBDHandler(simulation=False, profile_cache=cache)
+        with patch.object(obd_handler_module, "_ProfiledOBD", return_value=stale_conn), \
+                patch.object(obd_handler_module.obd, "OBD", return_value=fresh_conn) as full_discovery:
+            self.assertTrue(handler.connect("COM3"))
+
+        full_discovery.assert_called_once()
+        stale_conn.close.assert_called_once()
+        # Without a VIN the profile is re-keyed by adapter + protocol.
+        self.assertEqual(cache.lookup_port("COM3")["key"], "PORT:COM3|6")
+        self.assertEqual(cache.lookup_port("COM3")["baudrate"], 38400)
+
+
+if __name__ == '__main__':
+    unittest.main()